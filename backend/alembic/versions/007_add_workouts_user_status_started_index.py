@@ -0,0 +1,33 @@
+"""Add composite index on workouts projection for weekly range scans
+
+Revision ID: 007_add_workouts_user_status_started_index
+Revises: 006_add_body_measurements
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007_add_workouts_user_status_started_index"
+down_revision: Union[str, None] = "006_add_body_measurements"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Covers the weekly metrics filter: user_id = ? AND status = ? AND started_at in range
+    op.create_index(
+        "idx_workouts_projection_user_status_started",
+        "workouts_projection",
+        ["user_id", "status", "started_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_workouts_projection_user_status_started",
+        table_name="workouts_projection",
+    )
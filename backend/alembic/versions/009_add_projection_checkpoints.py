@@ -0,0 +1,32 @@
+"""Add projection checkpoints table
+
+Revision ID: 009_add_projection_checkpoints
+Revises: 007_add_workouts_user_status_started_index
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "009_add_projection_checkpoints"
+down_revision: Union[str, None] = "007_add_workouts_user_status_started_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Last applied sequence_number per device (incremental projection catch-up)
+    op.create_table(
+        "projection_checkpoints",
+        sa.Column("device_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("last_sequence_number", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("device_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("projection_checkpoints")
@@ -0,0 +1,35 @@
+"""Add events.content_hash with a unique (user_id, device_id, content_hash) index
+
+Revision ID: 010_add_events_content_hash
+Revises: 009_add_projection_checkpoints
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "010_add_events_content_hash"
+down_revision: Union[str, None] = "009_add_projection_checkpoints"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows keep NULL (NULLs never conflict), new syncs fill it in
+    op.add_column(
+        "events", sa.Column("content_hash", sa.LargeBinary(length=16), nullable=True)
+    )
+    op.create_index(
+        "uq_events_user_device_content_hash",
+        "events",
+        ["user_id", "device_id", "content_hash"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_events_user_device_content_hash", table_name="events")
+    op.drop_column("events", "content_hash")
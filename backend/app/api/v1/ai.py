@@ -125,7 +125,7 @@ async def workout_exercise_chat(
 
     try:
         workout_exercise_service = WorkoutExerciseService(db)
-        answer = workout_exercise_service.answer_exercise_question(
+        answer = await workout_exercise_service.answer_exercise_question(
             current_user_id,
             request.exercise_id,
             request.exercise_name.strip(),
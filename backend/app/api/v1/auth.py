@@ -11,7 +11,11 @@ from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.models.user import User
 from app.utils.jwt import create_access_token
-from app.utils.password import hash_password, verify_password
+from app.utils.password import (
+    dummy_verify_password,
+    hash_password,
+    verify_password,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -99,7 +103,9 @@ async def login(
     """
     # Find user by email
     user = db.query(User).filter(User.email == request.email).first()
-    if not user:
+    if not user or not user.password_hash:
+        # Run a throwaway bcrypt check so unknown emails aren't answered faster
+        dummy_verify_password()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
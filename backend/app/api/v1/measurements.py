@@ -8,6 +8,7 @@ from uuid import UUID
 from datetime import datetime
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
@@ -354,8 +355,10 @@ async def get_measurement_report(
     ai_service = BodyMeasurementAIService(db)
 
     try:
-        report_text = ai_service.generate_measurement_report(
-            current_user_id, measurement_id
+        # The LLM call blocks for seconds; run it in the threadpool so the
+        # event loop keeps serving other requests while the report is generated
+        report_text = await run_in_threadpool(
+            ai_service.generate_measurement_report, current_user_id, measurement_id
         )
 
         return MeasurementReportResponse(
@@ -2,7 +2,7 @@
 Projection rebuild endpoint.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
@@ -14,17 +14,27 @@ router = APIRouter()
 
 @router.post("/projections/rebuild", status_code=status.HTTP_200_OK)
 async def rebuild_projections(
+    force: bool = Query(
+        True, description="Replay full event log instead of catching up from checkpoints"
+    ),
+    keep_completed: bool = Query(
+        False,
+        description="Keep completed workouts as snapshots and skip their events on a full replay",
+    ),
     db: Session = Depends(get_db),
 ):
     """
     Rebuild all projections from events.
     
     Drops existing projections and replays full event log
-    to produce identical projection state.
+    to produce identical projection state. With force=false, only
+    applies events newer than each device's checkpoint. With
+    keep_completed=true, a full replay keeps completed workouts (and
+    their sets) and only rebuilds open ones.
     """
     try:
         builder = WorkoutProjectionBuilder(db)
-        builder.rebuild_projections()
+        builder.rebuild_projections(force=force, keep_completed=keep_completed)
         return {"message": "Projections rebuilt successfully"}
     except Exception as e:
         raise HTTPException(
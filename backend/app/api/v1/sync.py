@@ -54,6 +54,7 @@ class SyncResponse(BaseModel):
     accepted_count: int
     rejected_count: int
     rejected_event_ids: List[UUID] = Field(default_factory=list)
+    duplicate_event_ids: List[UUID] = Field(default_factory=list)
 
 
 @router.post("/sync", response_model=SyncResponse, status_code=status.HTTP_200_OK)
@@ -158,4 +159,5 @@ async def sync_events(
         accepted_count=result.accepted_count,
         rejected_count=result.rejected_count,
         rejected_event_ids=result.rejected_event_ids,
+        duplicate_event_ids=result.duplicate_event_ids,
     )
@@ -101,7 +101,7 @@ async def get_workout_history(
 
     # Get all unique exercise IDs from all sets
     # Used to batch fetch exercise names in a single query
-    exercise_ids = list(set(s.exercise_id for s in all_sets))
+    exercise_ids = list(dict.fromkeys(s.exercise_id for s in all_sets))
 
     # Get exercise names in batch (fixes potential N+1 for exercise lookups)
     # Maps exercise_id -> exercise name for quick lookup when building response
@@ -121,7 +121,7 @@ async def get_workout_history(
         total_volume = sum((s.reps or 0) * (s.weight or 0) for s in sets)
 
         # Get unique exercises for this workout
-        workout_exercise_ids = list(set(s.exercise_id for s in sets))
+        workout_exercise_ids = list(dict.fromkeys(s.exercise_id for s in sets))
         exercises = [
             ExerciseInfo(
                 exercise_id=ex_id,
@@ -246,7 +246,8 @@ async def get_workout_sets_batch(
 
     # Verify all workouts belong to the user (batch check)
     # Ensures no unauthorized access even if some workout_ids are valid
-    workouts = (
+    # Only the number of matches is needed, so COUNT instead of loading the rows
+    owned_workouts_count = (
         db.query(WorkoutProjection)
         .filter(
             and_(
@@ -254,11 +255,11 @@ async def get_workout_sets_batch(
                 WorkoutProjection.user_id == user_id,
             )
         )
-        .all()
+        .count()
     )
 
     # Security check: all requested workouts must belong to the user
-    if len(workouts) != len(workout_ids):
+    if owned_workouts_count != len(workout_ids):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="One or more workouts do not belong to the user",
@@ -1,3 +1,7 @@
+import json
+import re
+
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -15,7 +19,37 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-engine = create_engine(settings.database_url, echo=True)
+
+def json_serializer(value) -> str:
+    """
+    Encode JSON columns (event payloads) with orjson instead of stdlib json.
+
+    orjson only handles 64-bit integers; payloads are free-form, so values
+    carrying larger ones fall back to stdlib json.
+    """
+    try:
+        return orjson.dumps(value).decode()
+    except TypeError:
+        return json.dumps(value)
+
+
+# orjson decodes integers beyond 64 bits as floats; a 19-digit run is the
+# shortest text that can hold one, so only those payloads pay for stdlib json
+_LONG_DIGIT_RUN = re.compile(r"\d{19}")
+
+
+def json_deserializer(value):
+    """Decode JSON columns with orjson; projection replays parse every stored payload."""
+    if _LONG_DIGIT_RUN.search(value):
+        return json.loads(value)
+    return orjson.loads(value)
+
+engine = create_engine(
+    settings.database_url,
+    echo=True,
+    json_serializer=json_serializer,
+    json_deserializer=json_deserializer,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -72,6 +72,14 @@ EVENT_PAYLOAD_SCHEMAS = {
 }
 
 
+# Bound model_validate per raw event_type string, resolved once at import time
+# (pydantic v2 schemas are already compiled; this removes the per-call dispatch)
+_PAYLOAD_VALIDATORS = {
+    event_type.value: schema_class.model_validate
+    for event_type, schema_class in EVENT_PAYLOAD_SCHEMAS.items()
+}
+
+
 # This function validates the event payload against its schema
 def validate_event_payload(event_type: str, payload: dict) -> BaseModel:
     """
@@ -87,13 +95,9 @@ def validate_event_payload(event_type: str, payload: dict) -> BaseModel:
     Raises:
         ValueError: If event_type is unknown or payload is invalid
     """
-    try:
-        event_type_enum = EventType(event_type)
-    except ValueError:
+    # Single dict lookup on the raw string: no Enum construction per event
+    validator = _PAYLOAD_VALIDATORS.get(event_type)
+    if validator is None:
         raise ValueError(f"Unknown event type: {event_type}")
 
-    schema_class = EVENT_PAYLOAD_SCHEMAS.get(event_type_enum)
-    if not schema_class:
-        raise ValueError(f"No schema defined for event type: {event_type}")
-
-    return schema_class(**payload)
+    return validator(payload)
@@ -6,6 +6,7 @@ from .projections import (
     SetProjection,
     WeeklyMetrics,
     WeeklyReport,
+    ProjectionCheckpoint,
 )
 from .body_measurement import BodyMeasurement
 
@@ -17,5 +18,6 @@ __all__ = [
     "SetProjection",
     "WeeklyMetrics",
     "WeeklyReport",
+    "ProjectionCheckpoint",
     "BodyMeasurement",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Index
+from sqlalchemy import Column, String, Integer, DateTime, Index, LargeBinary
 from sqlalchemy.sql import func
 import uuid
 from app.db.database import Base
@@ -15,12 +15,23 @@ class Event(Base):
     device_id = Column(GUID(), nullable=False, index=True)
     sequence_number = Column(Integer, nullable=False)
     correlation_id = Column(GUID(), nullable=True)
+    # Truncated SHA-256 of (event_type, payload); dedupes a device's retries that
+    # regenerate event_id
+    content_hash = Column(LargeBinary(16), nullable=True)
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
     # Composite index for efficient querying by device and sequence
+    # Also serves the (device_id, sequence_number) ORDER BY of projection replays
     __table_args__ = (
         Index("idx_events_device_sequence", "device_id", "sequence_number"),
         Index("idx_events_user_created", "user_id", "created_at"),
+        Index(
+            "uq_events_user_device_content_hash",
+            "user_id",
+            "device_id",
+            "content_hash",
+            unique=True,
+        ),
     )
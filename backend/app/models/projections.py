@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 import uuid
 from app.db.database import Base
@@ -27,6 +27,16 @@ class WorkoutProjection(Base):
     ended_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(String, nullable=False)  # 'in_progress', 'completed', 'cancelled'
 
+    # Composite index for weekly metrics range scans (user + status + start time)
+    __table_args__ = (
+        Index(
+            "idx_workouts_projection_user_status_started",
+            "user_id",
+            "status",
+            "started_at",
+        ),
+    )
+
 
 class SetProjection(Base):
     __tablename__ = "sets_projection"
@@ -67,3 +77,11 @@ class WeeklyReport(Base):
     generated_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+
+class ProjectionCheckpoint(Base):
+    __tablename__ = "projection_checkpoints"
+
+    # Highest sequence_number per device already applied to the projections
+    device_id = Column(GUID(), primary_key=True)
+    last_sequence_number = Column(Integer, nullable=False)
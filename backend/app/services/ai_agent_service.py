@@ -7,9 +7,11 @@ and exercise name lookups.
 
 import os
 from pathlib import Path
+from threading import Lock
+from time import monotonic
 from uuid import UUID
-from datetime import date, datetime, timedelta
-from typing import Dict, Optional, List
+from datetime import date
+from typing import Dict, Optional, List, Tuple
 from sqlalchemy.orm import Session
 
 from upsonic import Agent
@@ -17,6 +19,7 @@ from upsonic.storage.providers.sqlite import SqliteStorage
 from upsonic.storage import Memory
 
 from app.models.projections import Exercise, WorkoutProjection, SetProjection
+from app.services.metrics_service import get_week_start
 
 
 # Get storage path from environment or use default
@@ -50,13 +53,6 @@ def get_storage() -> SqliteStorage:
     return _storage
 
 
-def get_week_start(dt: datetime) -> date:
-    """Get the Monday of the week for a given date."""
-    days_since_monday = dt.weekday()
-    monday = dt.date() - timedelta(days=days_since_monday)
-    return monday
-
-
 def get_exercise_name_map(db: Session, exercise_ids: List[UUID]) -> Dict[UUID, str]:
     """
     Get exercise name mapping for given exercise IDs.
@@ -107,7 +103,7 @@ def format_workout_data_for_ai(
     )
 
     # Get exercise names
-    exercise_ids = list(set(s.exercise_id for s in sets))
+    exercise_ids = list(dict.fromkeys(s.exercise_id for s in sets))
     exercise_map = get_exercise_name_map(db, exercise_ids)
 
     # Group sets by workout and exercise
@@ -233,11 +229,74 @@ def get_qa_agent(user_id: UUID) -> Agent:
     return agent
 
 
+# Agents cached per (user, exercise, name) for an hour: a live workout sends several
+# questions about the same exercise, and the agent's memory is keyed by that session anyway.
+# Agents are stateful, so each one is paired with a lock callers must hold while using it.
+# Entries are kept in insertion order, which is also expiry order (fixed TTL)
+WORKOUT_EXERCISE_AGENT_TTL_SECONDS = 3600
+WORKOUT_EXERCISE_AGENT_CACHE_SIZE = 512
+_workout_exercise_agents: Dict[Tuple[UUID, UUID, str], Tuple[float, Agent, Lock]] = {}
+_workout_exercise_agents_lock = Lock()
+
+
 def get_workout_exercise_agent(
     user_id: UUID, exercise_id: UUID, exercise_name: str
+) -> Tuple[Agent, Lock]:
+    """
+    Get a cached Real-time Workout Exercise Agent, creating it if missing or expired.
+
+    At most WORKOUT_EXERCISE_AGENT_CACHE_SIZE agents are kept; the oldest go first.
+
+    Args:
+        user_id: User ID
+        exercise_id: Exercise ID
+        exercise_name: Exercise name
+
+    Returns:
+        Tuple of (agent, lock); hold the lock while running the agent
+    """
+    key = (user_id, exercise_id, exercise_name)
+    with _workout_exercise_agents_lock:
+        cached = _workout_exercise_agents.get(key)
+        if cached is not None and cached[0] > monotonic():
+            return cached[1], cached[2]
+
+    # Built outside the lock so one slow agent setup doesn't block every other key
+    agent = _create_workout_exercise_agent(user_id, exercise_id, exercise_name)
+
+    with _workout_exercise_agents_lock:
+        now = monotonic()
+        cached = _workout_exercise_agents.get(key)
+        if cached is not None and cached[0] > now:
+            # Another request built it first; share that one so its lock stays the only lock
+            return cached[1], cached[2]
+
+        # A stale entry for this key is dropped so the fresh one goes to the back
+        _workout_exercise_agents.pop(key, None)
+        # Evict from the front: expired entries, then the oldest ones past the size cap
+        while _workout_exercise_agents:
+            oldest_key = next(iter(_workout_exercise_agents))
+            if (
+                _workout_exercise_agents[oldest_key][0] > now
+                and len(_workout_exercise_agents) < WORKOUT_EXERCISE_AGENT_CACHE_SIZE
+            ):
+                break
+            del _workout_exercise_agents[oldest_key]
+
+        agent_lock = Lock()
+        _workout_exercise_agents[key] = (
+            now + WORKOUT_EXERCISE_AGENT_TTL_SECONDS,
+            agent,
+            agent_lock,
+        )
+        return agent, agent_lock
+
+
+def _create_workout_exercise_agent(
+    user_id: UUID, exercise_id: UUID, exercise_name: str
 ) -> Agent:
     """
-    Get or create Real-time Workout Exercise Agent.
+    Create Real-time Workout Exercise Agent.
 
     This agent is optimized for immediate feedback during active workouts,
     providing quick, actionable advice about specific exercises.
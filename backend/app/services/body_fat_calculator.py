@@ -5,7 +5,7 @@ Implements U.S. Navy body fat percentage formulas and BMI-based estimates.
 All calculations use metric units (cm, kg).
 """
 
-import math
+from math import log10
 from typing import Optional
 
 
@@ -61,8 +61,8 @@ class BodyFatCalculator:
         if gender == "male":
             # Navy formula for men: BFP = 86.010×log10(waist - neck) - 70.041×log10(height) + 36.76
             bfp = (
-                86.010 * math.log10(waist_in - neck_in)
-                - 70.041 * math.log10(height_in)
+                86.010 * log10(waist_in - neck_in)
+                - 70.041 * log10(height_in)
                 + 36.76
             )
         else:  # female
@@ -70,8 +70,8 @@ class BodyFatCalculator:
             hip_in = hip_cm / 2.54
             # Navy formula for women: BFP = 163.205×log10(waist + hip - neck) - 97.684×log10(height) - 78.387
             bfp = (
-                163.205 * math.log10(waist_in + hip_in - neck_in)
-                - 97.684 * math.log10(height_in)
+                163.205 * log10(waist_in + hip_in - neck_in)
+                - 97.684 * log10(height_in)
                 - 78.387
             )
 
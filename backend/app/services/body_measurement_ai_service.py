@@ -15,6 +15,18 @@ from app.services.ai_agent_service import get_body_measurement_agent
 from upsonic import Task
 
 
+# Report served for a user's first measurement. There is nothing to compare
+# against yet, so a template avoids a full LLM round-trip on the cold-start case.
+FIRST_MEASUREMENT_TEMPLATE = (
+    "This is your first body measurement, so there is no previous data to compare against yet.\n\n"
+    "Your starting point ({measured_at}):\n"
+    "{measurement_lines}\n\n"
+    "Use this measurement as your baseline. Record your next measurement in 2-4 weeks, "
+    "at the same time of day and under the same conditions, so changes in body fat, "
+    "lean mass and individual body parts can be compared accurately."
+)
+
+
 class BodyMeasurementAIService:
     """Service for generating AI reports for body measurements."""
 
@@ -53,6 +65,15 @@ class BodyMeasurementAIService:
             m for m in all_measurements if m.measurement_id != measurement_id
         ]
 
+        # First measurement: nothing to compare, skip the LLM call
+        if not previous_measurements:
+            return FIRST_MEASUREMENT_TEMPLATE.format(
+                measured_at=current_measurement.measured_at.strftime("%Y-%m-%d"),
+                measurement_lines=self._format_first_measurement_lines(
+                    current_measurement
+                ),
+            )
+
         # Format measurement data for AI
         measurement_data = self._format_measurement_data_for_ai(
             current_measurement, previous_measurements, user
@@ -86,6 +107,30 @@ class BodyMeasurementAIService:
 
         return str(result)
 
+    def _format_first_measurement_lines(self, current: BodyMeasurement) -> str:
+        """
+        Format the starting-point lines of the first-measurement report.
+
+        Values are rounded to one decimal; body composition fields that
+        could not be calculated are left out.
+
+        Args:
+            current: The user's first measurement
+
+        Returns:
+            Newline-separated measurement lines
+        """
+        lines = [f"  Weight: {current.weight_kg:.1f} kg"]
+        if current.body_fat_percentage is not None:
+            lines.append(f"  Body Fat %: {current.body_fat_percentage:.1f}%")
+        if current.fat_mass_kg is not None:
+            lines.append(f"  Fat Mass: {current.fat_mass_kg:.1f} kg")
+        if current.lean_mass_kg is not None:
+            lines.append(f"  Lean Mass: {current.lean_mass_kg:.1f} kg")
+        lines.append(f"  Waist: {current.waist_cm:.1f} cm")
+        lines.append(f"  Neck: {current.neck_cm:.1f} cm")
+        return "\n".join(lines)
+
     def _format_measurement_data_for_ai(
         self,
         current: BodyMeasurement,
@@ -6,7 +6,7 @@ Handles CRUD operations for body measurements and automatic body fat calculation
 
 from uuid import UUID
 from datetime import datetime
-from typing import Optional, List
+from typing import Iterator, Optional, List
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
 
@@ -143,6 +143,28 @@ class BodyMeasurementService:
         Returns:
             List of BodyMeasurement objects
         """
+        return self._measurements_query(user_id, limit).all()
+
+    def iter_measurements(
+        self, user_id: UUID, limit: Optional[int] = None
+    ) -> Iterator[BodyMeasurement]:
+        """
+        Stream user's measurement history, ordered by date (newest first).
+
+        Rows are fetched in batches of 500 so long histories can be iterated
+        without materializing every measurement at once.
+
+        Args:
+            user_id: User ID
+            limit: Optional limit on number of results
+
+        Yields:
+            BodyMeasurement objects
+        """
+        yield from self._measurements_query(user_id, limit).yield_per(500)
+
+    def _measurements_query(self, user_id: UUID, limit: Optional[int]):
+        """Build the newest-first measurement history query for a user."""
         query = (
             self.db.query(BodyMeasurement)
             .filter(BodyMeasurement.user_id == user_id)
@@ -152,7 +174,7 @@ class BodyMeasurementService:
         if limit:
             query = query.limit(limit)
 
-        return query.all()
+        return query
 
     def get_latest_measurement(self, user_id: UUID) -> Optional[BodyMeasurement]:
         """
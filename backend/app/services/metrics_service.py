@@ -5,20 +5,26 @@ Aggregates workout data into weekly summaries.
 """
 
 from uuid import UUID
-from datetime import date, datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, or_
 
 from app.models.projections import WorkoutProjection, SetProjection, WeeklyMetrics
 
 
+@lru_cache(maxsize=8192)
+def _week_start_from_ordinal(ordinal: int) -> date:
+    """Get the Monday for a proleptic Gregorian ordinal."""
+    # Ordinal 1 (0001-01-01) is a Monday, so (ordinal - 1) % 7 is days since Monday
+    return date.fromordinal(ordinal - (ordinal - 1) % 7)
+
+
 def get_week_start(dt: datetime) -> date:
     """Get the Monday of the week for a given date."""
-    # Get Monday of the week (weekday() returns 0=Monday, 6=Sunday)
-    days_since_monday = dt.weekday()
-    monday = dt.date() - timedelta(days=days_since_monday)
-    return monday
+    # Called once per workout during rebuilds; ordinal lookup avoids timedelta math
+    return _week_start_from_ordinal(dt.toordinal())
 
 
 class MetricsService:
@@ -40,8 +46,12 @@ class MetricsService:
         Returns:
             WeeklyMetrics object (created or updated)
         """
-        week_end = week_start + timedelta(days=6)
-        
+        # Half-open range [Monday 00:00, next Monday 00:00) on the raw column
+        # Comparing started_at directly (instead of func.date(started_at)) keeps the
+        # filter sargable so idx_workouts_projection_user_status_started is used
+        range_start = datetime.combine(week_start, time.min)
+        range_end = range_start + timedelta(days=7)
+
         # Get all completed workouts for this week
         workouts = (
             self.db.query(WorkoutProjection)
@@ -49,8 +59,8 @@ class MetricsService:
                 and_(
                     WorkoutProjection.user_id == user_id,
                     WorkoutProjection.status == "completed",
-                    func.date(WorkoutProjection.started_at) >= week_start,
-                    func.date(WorkoutProjection.started_at) <= week_end,
+                    WorkoutProjection.started_at >= range_start,
+                    WorkoutProjection.started_at < range_end,
                 )
             )
             .all()
@@ -111,76 +121,142 @@ class MetricsService:
         self.db.commit()
         return metrics
 
-    def rebuild_weekly_metrics(self, user_id: UUID) -> None:
+    def rebuild_weekly_metrics(self, user_id: UUID, commit: bool = True) -> None:
         """
         Rebuild all weekly metrics for a user.
         
         This scans all workouts and recalculates metrics for each week.
         """
-        # Get all completed workouts for the user
-        workouts = (
-            self.db.query(WorkoutProjection)
-            .filter(
-                and_(
-                    WorkoutProjection.user_id == user_id,
-                    WorkoutProjection.status == "completed",
-                )
+        self.rebuild_weekly_metrics_bulk([user_id], commit=commit)
+
+    def rebuild_weekly_metrics_bulk(
+        self,
+        user_ids: Optional[List[UUID]] = None,
+        commit: bool = True,
+        week_starts: Optional[Set[date]] = None,
+    ) -> None:
+        """
+        Rebuild weekly metrics for many users at once.
+
+        Uses one aggregate query over completed workouts and their sets instead
+        of one rebuild (and its queries) per user.
+
+        Args:
+            user_ids: Users to rebuild (defaults to every user with workouts)
+            commit: Commit when done; pass False to only flush into the caller's transaction
+            week_starts: Only recompute these weeks (Monday dates); defaults to all weeks
+        """
+        # Aggregate volume per (workout, exercise) in SQL; outer join keeps workouts without sets
+        query = (
+            self.db.query(
+                WorkoutProjection.user_id,
+                WorkoutProjection.workout_id,
+                WorkoutProjection.started_at,
+                SetProjection.exercise_id,
+                func.sum(
+                    func.coalesce(SetProjection.reps, 0)
+                    * func.coalesce(SetProjection.weight, 0)
+                ),
+            )
+            .outerjoin(
+                SetProjection, SetProjection.workout_id == WorkoutProjection.workout_id
+            )
+            .filter(WorkoutProjection.status == "completed")
+            .group_by(
+                WorkoutProjection.user_id,
+                WorkoutProjection.workout_id,
+                WorkoutProjection.started_at,
+                SetProjection.exercise_id,
             )
-            .order_by(WorkoutProjection.started_at)
-            .all()
         )
+        if user_ids is not None:
+            query = query.filter(WorkoutProjection.user_id.in_(user_ids))
+        if week_starts is not None:
+            if not week_starts:
+                return
+            # Same half-open [Monday, next Monday) ranges as calculate_weekly_metrics
+            query = query.filter(
+                or_(
+                    *[
+                        and_(
+                            WorkoutProjection.started_at
+                            >= datetime.combine(week_start, time.min),
+                            WorkoutProjection.started_at
+                            < datetime.combine(week_start, time.min) + timedelta(days=7),
+                        )
+                        for week_start in week_starts
+                    ]
+                )
+            )
 
-        # Group workouts by week
-        weeks_data = {}
-        for workout in workouts:
-            week_start = get_week_start(workout.started_at)
-            if week_start not in weeks_data:
-                weeks_data[week_start] = []
-            weeks_data[week_start].append(workout)
-
-        # Calculate metrics for each week
-        # Process each week independently to build separate weekly metrics records
-        for week_start, week_workouts in weeks_data.items():
-            # Get all sets for workouts in this week (batch query - no N+1)
-            # Groups sets by week to calculate per-week aggregates
-            workout_ids = [w.workout_id for w in week_workouts]
-            sets = (
-                self.db.query(SetProjection)
-                .filter(SetProjection.workout_id.in_(workout_ids))
-                .all()
+        # Group by (user, week) - volume, distinct workouts and distinct exercises
+        weeks_data: Dict[tuple, Dict] = {}
+        for user_id, workout_id, started_at, exercise_id, volume in query.all():
+            week = weeks_data.setdefault(
+                (user_id, get_week_start(started_at)),
+                {"workouts": set(), "exercises": set(), "volume": 0.0},
             )
+            week["workouts"].add(workout_id)
+            if exercise_id is not None:
+                week["exercises"].add(exercise_id)
+                week["volume"] += volume or 0
 
-            # Calculate aggregates: total volume and unique exercise count
-            total_volume = sum((s.reps or 0) * (s.weight or 0) for s in sets)
-            unique_exercises = set(s.exercise_id for s in sets)
-
-            # Find or create metrics
-            metrics = (
-                self.db.query(WeeklyMetrics)
-                .filter(
-                    and_(
-                        WeeklyMetrics.user_id == user_id,
-                        WeeklyMetrics.week_start == week_start,
-                    )
-                )
-                .first()
+        # Preload all existing metrics ids in one query (fixes N+1)
+        # Instead of querying WeeklyMetrics per week, look them up by (user_id, week_start)
+        existing_query = self.db.query(
+            WeeklyMetrics.user_id, WeeklyMetrics.week_start, WeeklyMetrics.id
+        )
+        if user_ids is not None:
+            existing_query = existing_query.filter(WeeklyMetrics.user_id.in_(user_ids))
+        if week_starts is not None:
+            existing_query = existing_query.filter(
+                WeeklyMetrics.week_start.in_(week_starts)
             )
+        existing_metric_ids = {
+            (user_id, week_start): metrics_id
+            for user_id, week_start, metrics_id in existing_query.all()
+        }
 
-            if metrics:
-                metrics.total_workouts = len(week_workouts)
-                metrics.total_volume = total_volume
-                metrics.exercises_count = len(unique_exercises)
+        # Collect rows and write them with bulk mappings (one INSERT/UPDATE batch each)
+        # instead of adding ORM objects one by one through the unit of work
+        to_insert = []
+        to_update = []
+
+        for (user_id, week_start), week in weeks_data.items():
+            row = {
+                "total_workouts": len(week["workouts"]),
+                "total_volume": week["volume"],
+                "exercises_count": len(week["exercises"]),
+            }
+
+            # Update existing metrics or create new ones
+            metrics_id = existing_metric_ids.get((user_id, week_start))
+            if metrics_id:
+                to_update.append({"id": metrics_id, **row})
             else:
-                metrics = WeeklyMetrics(
-                    user_id=user_id,
-                    week_start=week_start,
-                    total_workouts=len(week_workouts),
-                    total_volume=total_volume,
-                    exercises_count=len(unique_exercises),
-                )
-                self.db.add(metrics)
+                to_insert.append({"user_id": user_id, "week_start": week_start, **row})
 
-        self.db.commit()
+        # Weeks in scope that no longer have completed workouts (e.g. a workout whose
+        # started_at moved to another week) would otherwise keep their old counts
+        stale_ids = [
+            metrics_id
+            for key, metrics_id in existing_metric_ids.items()
+            if key not in weeks_data
+        ]
+
+        if to_insert:
+            self.db.bulk_insert_mappings(WeeklyMetrics, to_insert)
+        if to_update:
+            self.db.bulk_update_mappings(WeeklyMetrics, to_update)
+        if stale_ids:
+            self.db.query(WeeklyMetrics).filter(
+                WeeklyMetrics.id.in_(stale_ids)
+            ).delete(synchronize_session=False)
+
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
 
     def get_weekly_metrics(
         self, user_id: UUID, week_start: Optional[date] = None
@@ -5,16 +5,62 @@ Replays events in (device_id, sequence_number) order to build
 deterministic projections: workouts_projection and sets_projection.
 """
 
-from typing import Dict
+import logging
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Set
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import distinct
+from sqlalchemy import case, insert, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.models.events import Event
-from app.models.projections import WorkoutProjection, SetProjection
+from app.models.projections import (
+    ProjectionCheckpoint,
+    SetProjection,
+    WorkoutProjection,
+)
 from app.domain.events import EventType
-from app.services.metrics_service import MetricsService
+from app.services.metrics_service import MetricsService, get_week_start
+
+
+logger = logging.getLogger(__name__)
+
+# Max rows per multi-row INSERT ... ON CONFLICT statement
+UPSERT_CHUNK_SIZE = 1000
+
+# Events fetched and applied per step of a checkpoint catch-up
+CATCH_UP_CHUNK_SIZE = 1000
+
+
+def _parse_timestamp(value):
+    """Parse an event payload timestamp (ISO 8601 string or datetime)."""
+    # Python 3.11+ fromisoformat accepts a trailing "Z", so no string rewrite is needed
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _cached_uuid(cache: Dict[str, UUID], value: str) -> UUID:
+    """Convert a payload id to UUID, reusing conversions of the same string."""
+    # UUID() parsing is pure Python; workout/exercise ids repeat across many events
+    result = cache.get(value)
+    if result is None:
+        result = cache[value] = UUID(value)
+    return result
+
+
+def _set_row(payload: Dict, workout_id: UUID, uuids: Dict[str, UUID]) -> Dict:
+    """Build a sets_projection row from a SET_COMPLETED payload."""
+    return {
+        "set_id": UUID(payload["set_id"]),
+        "workout_id": workout_id,
+        "exercise_id": _cached_uuid(uuids, payload["exercise_id"]),
+        "reps": payload["reps"],
+        "weight": payload["weight"],
+        "completed_at": _parse_timestamp(payload["completed_at"]),
+    }
 
 
 class WorkoutProjectionBuilder:
@@ -22,326 +68,479 @@ class WorkoutProjectionBuilder:
 
     def __init__(self, db: Session):
         self.db = db
+        self.metrics_service = MetricsService(db)
 
-    def rebuild_projections(self) -> None:
+    def rebuild_projections(
+        self, force: bool = True, keep_completed: bool = False
+    ) -> None:
         """
         Rebuild all projections from events.
 
-        Drops existing projections and replays full event log
-        to produce identical projection state.
+        With force (default), drops existing projections and replays full event
+        log to produce identical projection state. Without force, only applies
+        events newer than each device's checkpoint (idempotent catch-up).
+
+        Args:
+            force: Truncate and replay everything instead of catching up
+            keep_completed: Treat completed workouts as snapshots - keep their
+                projections (and sets) and skip their events during replay
         """
-        # Drop existing projections - delete sets first (they have foreign key to workouts)
-        self.db.query(SetProjection).delete()
-        self.db.query(WorkoutProjection).delete()
+        if not force:
+            self._catch_up_events()
+            return
+
+        frozen_workout_ids: Set[UUID] = set()
+        if keep_completed:
+            # Completed workouts never change again, so their rows are reused as-is
+            frozen_workout_ids = {
+                workout_id
+                for (workout_id,) in self.db.query(WorkoutProjection.workout_id)
+                .filter(WorkoutProjection.status == "completed")
+                .all()
+            }
+            open_workouts = self.db.query(WorkoutProjection.workout_id).filter(
+                WorkoutProjection.status != "completed"
+            )
+            self.db.query(SetProjection).filter(
+                SetProjection.workout_id.in_(open_workouts.scalar_subquery())
+            ).delete(synchronize_session=False)
+            self.db.query(WorkoutProjection).filter(
+                WorkoutProjection.status != "completed"
+            ).delete(synchronize_session=False)
+        else:
+            # Drop existing projections - delete sets first (they have foreign key to workouts)
+            self.db.query(SetProjection).delete()
+            self.db.query(WorkoutProjection).delete()
+        self.db.query(ProjectionCheckpoint).delete()
         self.db.commit()
 
         # Replay all events in order
-        self._replay_events()
+        self._replay_events(frozen_workout_ids)
 
         # Rebuild weekly metrics for all users who have workouts
         self._rebuild_metrics_for_all_users()
 
-    def _replay_events(self) -> None:
-        """Replay events in (device_id, sequence_number) order."""
-        # Query all events ordered by device_id and sequence_number
+    def _catch_up_events(self) -> None:
+        """Apply events with sequence_number above each device's checkpoint."""
+        # Devices without a checkpoint have never been applied - take all their events
+        # yield_per streams the backlog, so a long outage never loads it all at once
         events = (
-            self.db.query(Event).order_by(Event.device_id, Event.sequence_number).all()
+            self.db.query(Event)
+            .outerjoin(
+                ProjectionCheckpoint,
+                ProjectionCheckpoint.device_id == Event.device_id,
+            )
+            .filter(
+                or_(
+                    ProjectionCheckpoint.last_sequence_number.is_(None),
+                    Event.sequence_number > ProjectionCheckpoint.last_sequence_number,
+                )
+            )
+            .order_by(Event.device_id, Event.sequence_number)
+            .yield_per(CATCH_UP_CHUNK_SIZE)
+        )
+
+        # Apply in ordered chunks; _apply_events upserts against what earlier chunks
+        # already wrote, so chunking does not change the result
+        user_ids: Set[UUID] = set()
+        chunk: List[Event] = []
+        for event in events:
+            chunk.append(event)
+            if len(chunk) >= CATCH_UP_CHUNK_SIZE:
+                self._apply_events(chunk)
+                user_ids.update(e.user_id for e in chunk)
+                chunk = []
+        if chunk:
+            self._apply_events(chunk)
+            user_ids.update(e.user_id for e in chunk)
+
+        if not user_ids:
+            return
+
+        # Rebuild metrics only for users touched by the new events (same transaction)
+        self._rebuild_metrics_and_commit(list(user_ids))
+
+    def _replay_events(self, frozen_workout_ids: Optional[Set[UUID]] = None) -> None:
+        """
+        Replay events in (device_id, sequence_number) order.
+
+        Args:
+            frozen_workout_ids: Workouts whose projections are kept; their events are skipped
+        """
+        frozen_workout_ids = frozen_workout_ids or set()
+        # Stream events ordered by device_id and sequence_number
+        # yield_per fetches in batches so the full event log is never materialized at once
+        # Only the needed columns are selected: plain rows, no ORM instances or identity map
+        events = (
+            self.db.query(
+                Event.device_id,
+                Event.sequence_number,
+                Event.event_type,
+                Event.user_id,
+                Event.payload,
+            )
+            .order_by(Event.device_id, Event.sequence_number)
+            .yield_per(5000)
         )
 
         # Track workout state per workout_id
         workouts: Dict[UUID, Dict] = {}
+        uuids: Dict[str, UUID] = {}
+        # Events are ordered, so the last sequence_number seen per device is its max
+        checkpoints: Dict[UUID, int] = {}
+        # Set payloads are routed here in the same pass and resolved after workouts are inserted
+        pending_sets: List[Dict] = []
+        # Orphan events are counted and logged once instead of printed per event
+        skipped: Counter = Counter()
+
+        def on_workout_started(event, payload: Dict, workout_id: UUID) -> None:
+            workouts[workout_id] = {
+                "workout_id": workout_id,
+                "user_id": event.user_id,
+                "started_at": _parse_timestamp(payload["started_at"]),
+                "ended_at": None,
+                "status": "in_progress",
+            }
+
+        def on_workout_ended(event, payload: Dict, workout_id: UUID) -> None:
+            if workout_id in workouts:
+                workouts[workout_id]["ended_at"] = _parse_timestamp(payload["ended_at"])
+                workouts[workout_id]["status"] = "completed"
+            else:
+                skipped["workout_ended_unknown_workout"] += 1
+
+        def on_set_completed(event, payload: Dict, workout_id: UUID) -> None:
+            pending_sets.append(payload)
+
+        # Dispatch by event type (one dict lookup per event instead of an if/elif chain)
+        handlers = {
+            EventType.WORKOUT_STARTED: on_workout_started,
+            EventType.WORKOUT_ENDED: on_workout_ended,
+            EventType.SET_COMPLETED: on_set_completed,
+        }
 
         for event in events:
-            if event.event_type == EventType.WORKOUT_STARTED:
-                payload = event.payload
-                workout_id = UUID(payload["workout_id"])
-                started_at = payload["started_at"]
-                if isinstance(started_at, str):
-                    started_at = datetime.fromisoformat(
-                        started_at.replace("Z", "+00:00")
-                    )
-
-                workouts[workout_id] = {
-                    "workout_id": workout_id,
-                    "user_id": event.user_id,
-                    "started_at": started_at,
-                    "ended_at": None,
-                    "status": "in_progress",
-                }
-
-            elif event.event_type == EventType.WORKOUT_ENDED:
-                payload = event.payload
-                workout_id = UUID(payload["workout_id"])
-                if workout_id in workouts:
-                    ended_at = payload["ended_at"]
-                    if isinstance(ended_at, str):
-                        ended_at = datetime.fromisoformat(
-                            ended_at.replace("Z", "+00:00")
-                        )
-                    workouts[workout_id]["ended_at"] = ended_at
-                    workouts[workout_id]["status"] = "completed"
-                else:
-                    print(
-                        f"[PROJECTION] WARNING: WORKOUT_ENDED for unknown workout_id={workout_id}"
-                    )
+            checkpoints[event.device_id] = event.sequence_number
+
+            handler = handlers.get(event.event_type)
+            if handler is None:
+                continue
+
+            payload = event.payload
+            workout_id = _cached_uuid(uuids, payload["workout_id"])
+            if workout_id in frozen_workout_ids:
+                continue
+
+            handler(event, payload, workout_id)
 
         # Insert workout projections first (sets have foreign key dependency)
-        for workout_data in workouts.values():
-            workout = WorkoutProjection(
-                workout_id=workout_data["workout_id"],
-                user_id=workout_data["user_id"],
-                started_at=workout_data["started_at"],
-                ended_at=workout_data["ended_at"],
-                status=workout_data["status"],
-            )
-            self.db.add(workout)
+        # Single executemany INSERT instead of one ORM add per workout
+        if workouts:
+            self.db.execute(insert(WorkoutProjection), list(workouts.values()))
 
         # Commit workouts first so foreign key constraint is satisfied
         self.db.commit()
 
         # Process sets - only include sets for workouts that exist
         sets: Dict[UUID, Dict] = {}
-        skipped_sets = 0
 
-        for event in events:
-            if event.event_type == EventType.SET_COMPLETED:
-                payload = event.payload
-                workout_id = UUID(payload["workout_id"])
-
-                # Only process sets for workouts that exist
-                if workout_id not in workouts:
-                    skipped_sets += 1
-                    continue
-
-                set_id = UUID(payload["set_id"])
-                completed_at = payload["completed_at"]
-                if isinstance(completed_at, str):
-                    completed_at = datetime.fromisoformat(
-                        completed_at.replace("Z", "+00:00")
-                    )
-
-                sets[set_id] = {
-                    "set_id": set_id,
-                    "workout_id": workout_id,
-                    "exercise_id": UUID(payload["exercise_id"]),
-                    "reps": payload["reps"],
-                    "weight": payload["weight"],
-                    "completed_at": completed_at,
-                }
-
-        # Insert set projections
-        for set_data in sets.values():
-            set_proj = SetProjection(
-                set_id=set_data["set_id"],
-                workout_id=set_data["workout_id"],
-                exercise_id=set_data["exercise_id"],
-                reps=set_data["reps"],
-                weight=set_data["weight"],
-                completed_at=set_data["completed_at"],
+        for payload in pending_sets:
+            workout_id = _cached_uuid(uuids, payload["workout_id"])
+
+            # Only process sets for workouts that exist
+            if workout_id not in workouts:
+                skipped["set_completed_unknown_workout"] += 1
+                continue
+
+            set_row = _set_row(payload, workout_id, uuids)
+            sets[set_row["set_id"]] = set_row
+
+        # Insert set projections (single executemany INSERT)
+        if sets:
+            self.db.execute(insert(SetProjection), list(sets.values()))
+
+        # Record how far each device has been applied for later catch-ups
+        if checkpoints:
+            self.db.execute(
+                insert(ProjectionCheckpoint),
+                [
+                    {"device_id": device_id, "last_sequence_number": sequence_number}
+                    for device_id, sequence_number in checkpoints.items()
+                ],
             )
-            self.db.add(set_proj)
 
         self.db.commit()
 
+        if skipped:
+            logger.warning("[PROJECTION] Replay skipped orphan events: %s", dict(skipped))
+
     def update_projections(self, new_events: list[Event], user_id: UUID) -> None:
         """
         Update projections incrementally from new events.
         Only processes new events and updates affected projections.
 
+        Workouts and sets are written with INSERT ... ON CONFLICT DO UPDATE,
+        so conflicts are resolved server-side instead of SELECT-then-write.
+
         Args:
             new_events: List of new events to process (already ordered)
             user_id: User ID whose projections are being updated
         """
-        # Track workouts created in this transaction to avoid duplicate inserts
-        # SQLAlchemy queries don't see objects added to session until flushed
-        # This dictionary tracks workouts added in the current transaction
-        workouts_in_transaction: Dict[UUID, WorkoutProjection] = {}
-
-        # Separate workout events from set events to ensure workouts are committed before sets
-        # Sets have a foreign key constraint to workouts, so workouts must exist first
-        # This separation ensures proper ordering and avoids foreign key violations
-        workout_events = []
+        # Weeks touched by this batch: where affected workouts were before and after
+        # the update (started_at may move a workout to another week)
+        workout_ids = {
+            UUID(event.payload["workout_id"])
+            for event in new_events
+            if event.event_type
+            in (
+                EventType.WORKOUT_STARTED,
+                EventType.WORKOUT_ENDED,
+                EventType.SET_COMPLETED,
+            )
+        }
+        affected_weeks = self._workout_weeks(workout_ids)
+
+        self._apply_events(new_events)
+        affected_weeks |= self._workout_weeks(workout_ids)
+
+        # Recompute only the affected weeks for this user (same transaction as the projections)
+        self._rebuild_metrics_and_commit([user_id], affected_weeks)
+
+    def _workout_weeks(self, workout_ids: Set[UUID]) -> Set[date]:
+        """Get the week starts of the given workouts' current started_at."""
+        if not workout_ids:
+            return set()
+        return {
+            get_week_start(started_at)
+            for (started_at,) in self.db.query(WorkoutProjection.started_at)
+            .filter(WorkoutProjection.workout_id.in_(workout_ids))
+            .all()
+        }
+
+    def _apply_events(self, new_events: List[Event]) -> None:
+        """
+        Upsert projections for a batch of ordered events (without committing).
+
+        Also advances each device's checkpoint to the highest applied sequence.
+        """
+        # Fold workout events into one change per workout_id
+        # A single INSERT ... ON CONFLICT cannot affect the same row twice, so a
+        # WorkoutStarted + WorkoutEnded pair in one batch must become one row
+        workout_changes: Dict[UUID, Dict] = {}
         set_events = []
+        uuids: Dict[str, UUID] = {}
 
         for event in new_events:
-            if event.event_type in (EventType.WORKOUT_STARTED, EventType.WORKOUT_ENDED):
-                workout_events.append(event)
-            elif event.event_type == EventType.SET_COMPLETED:
+            if event.event_type == EventType.SET_COMPLETED:
                 set_events.append(event)
-
-        # Process workout events first
-        for event in workout_events:
-            if event.event_type == EventType.WORKOUT_STARTED:
-                payload = event.payload
-                workout_id = UUID(payload["workout_id"])
-                started_at = payload["started_at"]
-                if isinstance(started_at, str):
-                    started_at = datetime.fromisoformat(
-                        started_at.replace("Z", "+00:00")
-                    )
-
-                # Check if workout was created in this transaction first
-                if workout_id in workouts_in_transaction:
-                    workout = workouts_in_transaction[workout_id]
-                    # Update started_at but preserve completed status if already completed
-                    workout.started_at = started_at
-                    if workout.status != "completed":
-                        workout.status = "in_progress"
-                        workout.ended_at = None
-                else:
-                    # Upsert workout projection
-                    existing = (
-                        self.db.query(WorkoutProjection)
-                        .filter(WorkoutProjection.workout_id == workout_id)
-                        .first()
-                    )
-
-                    if existing:
-                        # Update started_at but preserve completed status if already completed
-                        # This prevents resetting completed workouts to in_progress
-                        existing.started_at = started_at
-                        if existing.status != "completed":
-                            existing.status = "in_progress"
-                            existing.ended_at = None
-                    else:
-                        workout = WorkoutProjection(
-                            workout_id=workout_id,
-                            user_id=event.user_id,
-                            started_at=started_at,
-                            ended_at=None,
-                            status="in_progress",
-                        )
-                        self.db.add(workout)
-                        workouts_in_transaction[workout_id] = workout
-
-            elif event.event_type == EventType.WORKOUT_ENDED:
+            elif event.event_type in (EventType.WORKOUT_STARTED, EventType.WORKOUT_ENDED):
                 payload = event.payload
-                workout_id = UUID(payload["workout_id"])
-                ended_at = payload["ended_at"]
-                if isinstance(ended_at, str):
-                    ended_at = datetime.fromisoformat(ended_at.replace("Z", "+00:00"))
-
-                # Check if workout was created in this transaction first
-                if workout_id in workouts_in_transaction:
-                    workout = workouts_in_transaction[workout_id]
-                    workout.ended_at = ended_at
-                    workout.status = "completed"
+                workout_id = _cached_uuid(uuids, payload["workout_id"])
+                change = workout_changes.setdefault(
+                    workout_id,
+                    {"user_id": event.user_id, "started_at": None, "ended_at": None},
+                )
+
+                if event.event_type == EventType.WORKOUT_STARTED:
+                    started_at = _parse_timestamp(payload["started_at"])
+                    change["started_at"] = started_at
                 else:
-                    # Update existing workout projection
-                    workout = (
-                        self.db.query(WorkoutProjection)
-                        .filter(WorkoutProjection.workout_id == workout_id)
-                        .first()
-                    )
-
-                    if workout:
-                        workout.ended_at = ended_at
-                        workout.status = "completed"
-                    else:
-                        # Create workout if it doesn't exist (handles edge case where WorkoutEnded comes before WorkoutStarted)
-                        # This can happen if events are processed out of order or if WorkoutStarted failed
-                        print(
-                            f"[PROJECTION] WARNING: WORKOUT_ENDED for unknown workout_id={workout_id}, creating workout"
-                        )
-                        # Try to get user_id from the event
-                        workout = WorkoutProjection(
-                            workout_id=workout_id,
-                            user_id=event.user_id,
-                            started_at=ended_at,  # Use ended_at as fallback if started_at not available
-                            ended_at=ended_at,
-                            status="completed",
-                        )
-                        self.db.add(workout)
-                        workouts_in_transaction[workout_id] = workout
-
-        # Flush workouts to database before processing sets (required for foreign key constraint)
-        # flush() writes to DB without committing, making workouts visible to subsequent queries
-        # This is necessary because sets have a foreign key to workouts
-        if workouts_in_transaction:
-            self.db.flush()
-
-        # Process set events after workouts are flushed
-        # Now we can safely create sets that reference the workouts
+                    ended_at = _parse_timestamp(payload["ended_at"])
+                    change["ended_at"] = ended_at
+
+        # Group workouts by which events the batch contained
+        # Each group has its own conflict rule, so each is written with one statement
+        started_rows = []
+        ended_rows = []
+        started_and_ended_rows = []
+
+        for workout_id, change in workout_changes.items():
+            row = {
+                "workout_id": workout_id,
+                "user_id": change["user_id"],
+                # Use ended_at as fallback if started_at not available (WorkoutEnded
+                # arrived before WorkoutStarted, e.g. out of order or a failed start)
+                "started_at": change["started_at"] or change["ended_at"],
+                "ended_at": change["ended_at"],
+                "status": "completed" if change["ended_at"] else "in_progress",
+            }
+            if change["started_at"] and change["ended_at"]:
+                started_and_ended_rows.append(row)
+            elif change["started_at"]:
+                started_rows.append(row)
+            else:
+                ended_rows.append(row)
+
+        table = WorkoutProjection.__table__
+
+        # Update started_at but preserve completed status if already completed
+        # This prevents resetting completed workouts to in_progress
+        self._upsert_rows(
+            WorkoutProjection,
+            started_rows,
+            lambda excluded: {
+                "started_at": excluded.started_at,
+                "status": case(
+                    (table.c.status == "completed", "completed"),
+                    else_="in_progress",
+                ),
+                "ended_at": case(
+                    (table.c.status == "completed", table.c.ended_at),
+                    else_=None,
+                ),
+            },
+        )
+        self._upsert_rows(
+            WorkoutProjection,
+            ended_rows,
+            lambda excluded: {
+                "ended_at": excluded.ended_at,
+                "status": "completed",
+            },
+        )
+        self._upsert_rows(
+            WorkoutProjection,
+            started_and_ended_rows,
+            lambda excluded: {
+                "started_at": excluded.started_at,
+                "ended_at": excluded.ended_at,
+                "status": "completed",
+            },
+        )
+
+        # Batch-lookup workouts referenced by set events (fixes N+1 query problem)
+        # Workouts upserted above are known; only the rest need one IN query
+        known_workout_ids = set(workout_changes.keys())
+        unknown_workout_ids = {
+            _cached_uuid(uuids, e.payload["workout_id"]) for e in set_events
+        } - known_workout_ids
+        if unknown_workout_ids:
+            known_workout_ids.update(
+                workout_id
+                for (workout_id,) in self.db.query(WorkoutProjection.workout_id)
+                .filter(WorkoutProjection.workout_id.in_(unknown_workout_ids))
+                .all()
+            )
+
+        # Later events for the same set_id in this batch win (one row per set_id)
+        set_rows: Dict[UUID, Dict] = {}
+        skipped_sets = 0
         for event in set_events:
             payload = event.payload
-            set_id = UUID(payload["set_id"])
-            workout_id = UUID(payload["workout_id"])
-
-            # Check if workout exists (in transaction or database)
-            # First check in-memory transaction cache, then query database
-            # This handles cases where workout was created in this transaction or already exists
-            workout_exists = workout_id in workouts_in_transaction
-            if not workout_exists:
-                # Query database for existing workout (single query per set - acceptable here)
-                # Note: This could be optimized with batch lookup if many sets reference same workout
-                workout = (
-                    self.db.query(WorkoutProjection)
-                    .filter(WorkoutProjection.workout_id == workout_id)
-                    .first()
-                )
-                workout_exists = workout is not None
+            workout_id = _cached_uuid(uuids, payload["workout_id"])
 
-            if not workout_exists:
-                print(
-                    f"[PROJECTION] WARNING: SET_COMPLETED for unknown workout_id={workout_id}, skipping"
-                )
+            if workout_id not in known_workout_ids:
+                skipped_sets += 1
                 continue
 
-            completed_at = payload["completed_at"]
-            if isinstance(completed_at, str):
-                completed_at = datetime.fromisoformat(
-                    completed_at.replace("Z", "+00:00")
-                )
+            set_row = _set_row(payload, workout_id, uuids)
+            set_rows[set_row["set_id"]] = set_row
 
-            # Upsert set projection
-            existing = (
-                self.db.query(SetProjection)
-                .filter(SetProjection.set_id == set_id)
-                .first()
+        if skipped_sets:
+            logger.warning(
+                "[PROJECTION] Skipped %d SET_COMPLETED events for unknown workouts",
+                skipped_sets,
             )
 
-            if existing:
-                existing.workout_id = workout_id
-                existing.exercise_id = UUID(payload["exercise_id"])
-                existing.reps = payload["reps"]
-                existing.weight = payload["weight"]
-                existing.completed_at = completed_at
-            else:
-                set_proj = SetProjection(
-                    set_id=set_id,
-                    workout_id=workout_id,
-                    exercise_id=UUID(payload["exercise_id"]),
-                    reps=payload["reps"],
-                    weight=payload["weight"],
-                    completed_at=completed_at,
+        # Upsert set projections (workouts are already written, so the foreign key holds)
+        self._upsert_rows(
+            SetProjection,
+            list(set_rows.values()),
+            lambda excluded: {
+                "workout_id": excluded.workout_id,
+                "exercise_id": excluded.exercise_id,
+                "reps": excluded.reps,
+                "weight": excluded.weight,
+                "completed_at": excluded.completed_at,
+            },
+        )
+
+        # Advance checkpoints, never moving one backwards
+        checkpoints: Dict[UUID, int] = {}
+        for event in new_events:
+            checkpoints[event.device_id] = max(
+                event.sequence_number, checkpoints.get(event.device_id, 0)
+            )
+        checkpoint_table = ProjectionCheckpoint.__table__
+        self._upsert_rows(
+            ProjectionCheckpoint,
+            [
+                {"device_id": device_id, "last_sequence_number": sequence_number}
+                for device_id, sequence_number in checkpoints.items()
+            ],
+            lambda excluded: {
+                "last_sequence_number": case(
+                    (
+                        checkpoint_table.c.last_sequence_number
+                        > excluded.last_sequence_number,
+                        checkpoint_table.c.last_sequence_number,
+                    ),
+                    else_=excluded.last_sequence_number,
                 )
-                self.db.add(set_proj)
+            },
+        )
 
-        self.db.commit()
+    def _upsert_rows(
+        self, model, rows: List[Dict], build_update: Callable[[Any], Dict]
+    ) -> None:
+        """
+        Insert rows, resolving primary key conflicts with ON CONFLICT DO UPDATE.
 
-        # Rebuild metrics only for this user
-        metrics_service = MetricsService(self.db)
-        try:
-            metrics_service.rebuild_weekly_metrics(user_id)
-        except Exception as e:
-            print(
-                f"[PROJECTION] WARNING: Failed to rebuild metrics for user {user_id}: {e}"
+        Args:
+            model: Projection model to write
+            rows: Row dicts (same keys in every row)
+            build_update: Builds the SET clause from the statement's `excluded` columns
+        """
+        if not rows:
+            return
+
+        # Postgres in production, SQLite in tests - both support ON CONFLICT
+        if self.db.get_bind().dialect.name == "postgresql":
+            dialect_insert = pg_insert
+        else:
+            dialect_insert = sqlite_insert
+
+        primary_key = [column.name for column in model.__table__.primary_key]
+
+        # One multi-row statement per chunk keeps bind parameters under driver limits
+        # (SQLite 32766, Postgres 65535) for large sync batches and catch-ups
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            stmt = dialect_insert(model).values(rows[start : start + UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=primary_key, set_=build_update(stmt.excluded)
             )
+            self.db.execute(stmt)
 
     def _rebuild_metrics_for_all_users(self) -> None:
         """Rebuild weekly metrics for all users who have workouts."""
-        # Get all unique user_ids from workouts
-        user_ids = self.db.query(distinct(WorkoutProjection.user_id)).all()
-
-        if not user_ids:
-            return
+        # One aggregate pass over all users instead of one rebuild per user
+        self._rebuild_metrics_and_commit(None)
+
+    def _rebuild_metrics_and_commit(
+        self,
+        user_ids: Optional[List[UUID]],
+        week_starts: Optional[Set[date]] = None,
+    ) -> None:
+        """
+        Rebuild weekly metrics without committing separately, then commit once.
 
-        metrics_service = MetricsService(self.db)
+        Projection writes and the metrics rebuild share one transaction. The
+        rebuild runs in a savepoint so a metrics failure is logged and rolled
+        back without losing the projection changes.
 
-        for (user_id,) in user_ids:
-            try:
-                metrics_service.rebuild_weekly_metrics(user_id)
-            except Exception as e:
-                print(
-                    f"[PROJECTION] WARNING: Failed to rebuild metrics for user {user_id}: {e}"
+        Args:
+            user_ids: Users to rebuild (None for every user with workouts)
+            week_starts: Only recompute these weeks (None for all weeks)
+        """
+        try:
+            with self.db.begin_nested():
+                self.metrics_service.rebuild_weekly_metrics_bulk(
+                    user_ids, commit=False, week_starts=week_starts
                 )
+        except Exception as e:
+            logger.warning(
+                "[PROJECTION] Failed to rebuild metrics for users %s: %s",
+                user_ids or "all",
+                e,
+            )
+        self.db.commit()
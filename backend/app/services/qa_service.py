@@ -7,10 +7,10 @@ Uses upsonic AI agent to answer user questions about exercises, form, and injuri
 from uuid import UUID
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_
 
 from app.models.projections import WorkoutProjection, SetProjection, Exercise
-from app.services.ai_agent_service import get_qa_agent, get_exercise_name_map
+from app.services.ai_agent_service import get_qa_agent
 from upsonic import Task
 
 
@@ -66,8 +66,10 @@ class QAService:
         
         thirty_days_ago = datetime.now() - timedelta(days=30)
         
+        # Last 10 completed workouts as a subquery, joined to their sets and
+        # exercise names below (one query instead of workouts + sets + names)
         recent_workouts = (
-            self.db.query(WorkoutProjection)
+            self.db.query(WorkoutProjection.workout_id)
             .filter(
                 and_(
                     WorkoutProjection.user_id == user_id,
@@ -77,17 +79,20 @@ class QAService:
             )
             .order_by(WorkoutProjection.started_at.desc())
             .limit(10)
-            .all()
+            .subquery()
         )
         
-        if not recent_workouts:
-            return None
-        
-        # Get all sets for these workouts
-        workout_ids = [w.workout_id for w in recent_workouts]
         sets = (
-            self.db.query(SetProjection)
-            .filter(SetProjection.workout_id.in_(workout_ids))
+            self.db.query(
+                SetProjection.exercise_id,
+                Exercise.name,
+                SetProjection.workout_id,
+                SetProjection.reps,
+                SetProjection.weight,
+                SetProjection.completed_at,
+            )
+            .join(recent_workouts, SetProjection.workout_id == recent_workouts.c.workout_id)
+            .outerjoin(Exercise, Exercise.exercise_id == SetProjection.exercise_id)
             .order_by(SetProjection.completed_at.desc())
             .all()
         )
@@ -95,48 +100,38 @@ class QAService:
         if not sets:
             return None
         
-        # Get exercise names
-        exercise_ids = list(set(s.exercise_id for s in sets))
-        exercise_map = get_exercise_name_map(self.db, exercise_ids)
+        # Most recent set per exercise in one pass (rows are newest first, so first seen wins)
+        latest_sets = {}
+        for s in sets:
+            latest_sets.setdefault(s.exercise_id, s)
         
         # Try to find exercises mentioned in question (simple keyword matching)
         question_lower = question.lower()
-        relevant_exercises = []
-        for exercise_id, exercise_name in exercise_map.items():
-            if exercise_name.lower() in question_lower:
-                relevant_exercises.append(exercise_id)
+        relevant_exercises = [
+            exercise_id
+            for exercise_id, s in latest_sets.items()
+            if s.name and s.name.lower() in question_lower
+        ]
         
         # If no specific exercises found, use most recent exercises
         if not relevant_exercises:
-            # Get unique exercises from recent sets (most recent first)
-            seen_exercises = []
-            for s in sets:
-                if s.exercise_id not in seen_exercises:
-                    seen_exercises.append(s.exercise_id)
-                if len(seen_exercises) >= 3:  # Limit to 3 most recent exercises
-                    break
-            relevant_exercises = seen_exercises
+            relevant_exercises = list(latest_sets)[:3]  # Limit to 3 most recent exercises
         
         # Build context for relevant exercises
         context_lines = []
         for exercise_id in relevant_exercises[:3]:  # Limit to 3 exercises
-            exercise_name = exercise_map.get(exercise_id, f"Exercise {exercise_id}")
-            exercise_sets = [s for s in sets if s.exercise_id == exercise_id]
+            most_recent = latest_sets[exercise_id]
+            exercise_name = most_recent.name or f"Exercise {exercise_id}"
+            reps = most_recent.reps or 0
+            weight = most_recent.weight or 0
+            date_str = most_recent.completed_at.strftime("%Y-%m-%d")
             
-            if exercise_sets:
-                # Get most recent set
-                most_recent = exercise_sets[0]
-                reps = most_recent.reps or 0
-                weight = most_recent.weight or 0
-                date_str = most_recent.completed_at.strftime("%Y-%m-%d")
-                
-                context_lines.append(
-                    f"Note: User's last {exercise_name} – {most_recent.workout_id} on {date_str}, "
-                    f"{reps} reps at {weight}kg."
-                )
+            context_lines.append(
+                f"Note: User's last {exercise_name} – {most_recent.workout_id} on {date_str}, "
+                f"{reps} reps at {weight}kg."
+            )
         
         if context_lines:
             return "\n".join(context_lines)
         
         return None
-
@@ -2,22 +2,48 @@
 Idempotent event ingestion service.
 
 Handles event sync with:
-- event_id uniqueness (idempotency)
+- event_id and content hash uniqueness (idempotency)
 - (device_id, sequence_number) ordering
 - Transactional writes
 - Partial batch handling
 - Ack cursor response
 """
 
-import traceback
-from typing import List, Optional
+import hashlib
+import json
+import logging
+from typing import List, Optional, Set
 from uuid import UUID
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 
 from app.models.events import Event
 from app.domain.events import validate_event_payload
-from app.services.projection_service import WorkoutProjectionBuilder
+from app.services.projection_service import UPSERT_CHUNK_SIZE, WorkoutProjectionBuilder
+
+
+logger = logging.getLogger(__name__)
+
+
+def _compute_content_hash(event_type: str, payload: dict) -> bytes:
+    """
+    Deterministic 16-byte digest of an event's type and payload.
+
+    Semantically identical events hash the same even if the client regenerated
+    their event_id, so a retried event is deduplicated either way.
+    """
+    try:
+        canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+    except TypeError:
+        # orjson only handles 64-bit integers; validation lets larger ones through
+        canonical = json.dumps(
+            payload, sort_keys=True, separators=(",", ":"), default=str
+        ).encode()
+    return hashlib.sha256(event_type.encode() + b":" + canonical).digest()[:16]
 
 
 class SyncResult:
@@ -29,11 +55,15 @@ class SyncResult:
         rejected_count: int,
         last_acked_sequence: Optional[int],
         rejected_event_ids: List[UUID],
+        duplicate_event_ids: Optional[List[UUID]] = None,
     ):
         self.accepted_count = accepted_count
         self.rejected_count = rejected_count
         self.last_acked_sequence = last_acked_sequence
         self.rejected_event_ids = rejected_event_ids
+        # Events skipped because the device already sent the same content under
+        # another event_id (acked, but their event_id is not stored)
+        self.duplicate_event_ids = duplicate_event_ids or []
 
 
 class SyncService:
@@ -59,194 +89,229 @@ class SyncService:
         Returns:
             SyncResult with accepted/rejected counts and ack cursor
         """
+        # Nothing to sync (polling clients) - no queries, no transaction
+        if not events:
+            return SyncResult(0, 0, None, [])
+
         accepted_count = 0
         rejected_count = 0
         rejected_event_ids: List[UUID] = []
         last_acked_sequence: Optional[int] = None
+        duplicate_event_ids: List[UUID] = []
+
+        # Parse each event once up front; UUID parsing is not free for large batches
+        # and the ids are reused by the existence check, the insert and every reject path
+        parsed_events = [
+            (
+                UUID(e["event_id"]),
+                e["event_type"],
+                e["payload"],
+                e.get("sequence_number"),
+            )
+            for e in events
+        ]
+        event_ids = [event_id for event_id, _, _, _ in parsed_events]
 
         # Validate sequence numbers are monotonic per device (required for ordering)
-        sequence_numbers = [e.get("sequence_number") for e in events]
-        if sequence_numbers != sorted(set(sequence_numbers)):
-            # Check if there are duplicates or non-monotonic sequences
-            seen = set()
-            for seq in sequence_numbers:
-                if seq in seen:
-                    # Duplicate sequence number in batch - reject entire batch
-                    rejected_count = len(events)
-                    rejected_event_ids = [UUID(e["event_id"]) for e in events]
-                    return SyncResult(0, rejected_count, None, rejected_event_ids)
-                seen.add(seq)
-
-            # Non-monotonic sequence (reordering not allowed) - reject entire batch
-            rejected_count = len(events)
-            rejected_event_ids = [UUID(e["event_id"]) for e in events]
-            return SyncResult(0, rejected_count, None, rejected_event_ids)
-
-        # Process events in transaction
-        events_to_insert = []
-
-        # Batch check for existing events (fixes N+1 query problem)
-        # Instead of checking each event individually (N queries), we fetch all existing
-        # event_ids in a single query and use a set for O(1) lookup
-        event_ids = [UUID(e["event_id"]) for e in events]
-        existing_events = (
-            self.db.query(Event.event_id).filter(Event.event_id.in_(event_ids)).all()
-        )
-        existing_event_ids = {e.event_id for e in existing_events}
+        sequence_numbers = [seq for _, _, _, seq in parsed_events]
+        # One linear scan: a strictly increasing batch has neither duplicates nor
+        # reordering, so the first non-increasing step rejects the batch
+        # (no sorted copy, no separate duplicate pass)
+        prev_seq = None
+        for seq in sequence_numbers:
+            if prev_seq is not None and seq <= prev_seq:
+                # Duplicate or non-monotonic sequence (reordering not allowed) - reject entire batch
+                rejected_count = len(events)
+                return SyncResult(0, rejected_count, None, event_ids)
+            prev_seq = seq
 
-        for event_data in events:
-            event_id = UUID(event_data["event_id"])
-            event_type = event_data["event_type"]
-            payload = event_data["payload"]
-            sequence_number = event_data["sequence_number"]
+        # Validate payloads; valid events become rows for one batch INSERT
+        event_rows = []
+        # Repeated event_ids within the batch are dropped before the INSERT (and before
+        # building projections from its rows) but still count as accepted and acked
+        seen_event_ids: Set[UUID] = set()
+        repeated_events: List[tuple] = []
+
+        for event_id, event_type, payload, sequence_number in parsed_events:
+            # Checked before validation: a repeat of an already-validated event_id
+            # skips the pydantic parse (only valid ids are recorded in seen_event_ids)
+            if event_id in seen_event_ids:
+                repeated_events.append((event_id, sequence_number))
+                continue
 
             # Validate payload against schema
             try:
                 validate_event_payload(event_type, payload)
             except Exception as validation_error:
-                print(
-                    f"[SYNC] ⚠️ Event validation failed for {event_type}: {validation_error}"
+                # Lazy %-formatting: nothing is rendered unless a handler emits the record
+                logger.warning(
+                    "[SYNC] Event validation failed for %s: %s",
+                    event_type,
+                    validation_error,
                 )
-                print(f"[SYNC] Payload: {payload}")
+                logger.debug("[SYNC] Payload: %s", payload)
                 rejected_count += 1
                 rejected_event_ids.append(event_id)
                 continue
 
-            # Check if event already exists (idempotency check via event_id)
-            # Using set lookup from batch query above - O(1) instead of N database queries
-            if event_id in existing_event_ids:
-                # Event already exists, skip insertion but count as accepted (idempotent)
-                # This ensures duplicate syncs don't create duplicate events
-                accepted_count += 1
-                # Update ack cursor even for duplicate events to maintain sequence tracking
-                if last_acked_sequence is None or sequence_number > last_acked_sequence:
-                    last_acked_sequence = sequence_number
-                continue
+            seen_event_ids.add(event_id)
 
-            # Prepare event for insertion
-            events_to_insert.append(
+            # Rows for a single multi-row INSERT (no per-event ORM objects)
+            event_rows.append(
                 {
                     "event_id": event_id,
                     "event_type": event_type,
                     "payload": payload,
+                    "content_hash": _compute_content_hash(event_type, payload),
                     "sequence_number": sequence_number,
+                    "user_id": user_id,
+                    "device_id": device_id,
                 }
             )
 
         # Insert new events in a single transaction
-        if events_to_insert:
+        if event_rows:
             try:
-                for event_data in events_to_insert:
-                    event = Event(
-                        event_id=event_data["event_id"],
-                        event_type=event_data["event_type"],
-                        payload=event_data["payload"],
-                        user_id=user_id,
-                        device_id=device_id,
-                        sequence_number=event_data["sequence_number"],
-                    )
-                    self.db.add(event)
+                # Idempotency in the INSERT itself (no existence pre-check SELECT):
+                # ON CONFLICT DO NOTHING skips events we already have, also
+                # under concurrent syncs, and RETURNING reports which rows are new
+                inserted_event_ids = self._insert_ignore_duplicates(event_rows)
+
+                # Rows skipped by ON CONFLICT are either known event_ids (idempotent
+                # replays) or content duplicates whose event_id was never stored
+                content_duplicate_ids = self._content_duplicate_ids(
+                    [row["event_id"] for row in event_rows],
+                    inserted_event_ids,
+                )
 
                 # Commit all new events atomically
                 self.db.commit()
-
-                # Update read-optimized projections after successful event insertion
-                # Projections are denormalized views optimized for reads (workouts_projection, sets_projection)
-                if events_to_insert:
-                    try:
-                        # Get the Event objects for the newly inserted events
-                        # Query by event_id list to fetch all events in one query (batch operation)
-                        new_event_objects = (
-                            self.db.query(Event)
-                            .filter(
-                                Event.event_id.in_(
-                                    [e["event_id"] for e in events_to_insert]
-                                )
-                            )
-                            .order_by(Event.device_id, Event.sequence_number)
-                            .all()
-                        )
-
-                        # Update projections incrementally (only new events)
-                        # This keeps projections in sync with events without full rebuild
-                        builder = WorkoutProjectionBuilder(self.db)
-                        builder.update_projections(new_event_objects, user_id)
-                    except Exception as e:
-                        # Log error but don't fail sync - projections can be rebuilt later via /rebuild endpoint
-                        # This ensures event ingestion succeeds even if projection update fails
-                        # In production, consider using a background job for projection updates
-                        import traceback
-
-                        print(f"[SYNC] ❌ ERROR: Failed to update projections: {e}")
-                        print(traceback.format_exc())
-                        # Rollback any partial projection changes to maintain consistency
-                        try:
-                            self.db.rollback()
-                        except Exception:
-                            pass
-
-                # Update accepted count and ack cursor
-                for event_data in events_to_insert:
-                    accepted_count += 1
-                    seq = event_data["sequence_number"]
-                    if last_acked_sequence is None or seq > last_acked_sequence:
-                        last_acked_sequence = seq
-
-            except IntegrityError:
-                # Rollback and handle duplicates individually
-                # This handles race conditions where events were inserted between our batch check and insert
-                # Fall back to individual inserts to identify which specific event caused the conflict
-                self.db.rollback()
-                for event_data in events_to_insert:
-                    event_id = event_data["event_id"]
-                    sequence_number = event_data["sequence_number"]
-
-                    # Try to insert individually to handle duplicates
-                    try:
-                        event = Event(
-                            event_id=event_id,
-                            event_type=event_data["event_type"],
-                            payload=event_data["payload"],
-                            user_id=user_id,
-                            device_id=device_id,
-                            sequence_number=sequence_number,
-                        )
-                        self.db.add(event)
-                        self.db.commit()
-                        accepted_count += 1
-                        if (
-                            last_acked_sequence is None
-                            or sequence_number > last_acked_sequence
-                        ):
-                            last_acked_sequence = sequence_number
-                    except IntegrityError:
-                        # Event already exists (idempotent)
-                        self.db.rollback()
-                        accepted_count += 1
-                        if (
-                            last_acked_sequence is None
-                            or sequence_number > last_acked_sequence
-                        ):
-                            last_acked_sequence = sequence_number
-                    except Exception:
-                        self.db.rollback()
-                        rejected_count += 1
-                        rejected_event_ids.append(event_id)
             except Exception as e:
-                # Rollback on any other error
-                error_traceback = traceback.format_exc()
-                print(f"[SYNC] ❌ ERROR during event insertion: {e}")
-                print(error_traceback)
+                # Rollback on any error
+                logger.exception("[SYNC] Error during event insertion: %s", e)
                 self.db.rollback()
                 # Mark all pending events as rejected
-                for event_data in events_to_insert:
+                for event_row in event_rows:
                     rejected_count += 1
-                    rejected_event_ids.append(event_data["event_id"])
+                    rejected_event_ids.append(event_row["event_id"])
                 raise
 
+            # Events that already existed count as accepted (idempotent); content
+            # duplicates are reported separately. The ack cursor covers all of them
+            # (their content is stored) to maintain sequence tracking
+            batch_event_ids = [row["event_id"] for row in event_rows] + [
+                event_id for event_id, _ in repeated_events
+            ]
+            accepted_count += sum(
+                1 for event_id in batch_event_ids if event_id not in content_duplicate_ids
+            )
+            duplicate_event_ids = [
+                row["event_id"]
+                for row in event_rows
+                if row["event_id"] in content_duplicate_ids
+            ]
+            if duplicate_event_ids:
+                logger.info(
+                    "[SYNC] Skipped %d events already stored under another event_id",
+                    len(duplicate_event_ids),
+                )
+            last_acked_sequence = max(
+                [row["sequence_number"] for row in event_rows]
+                + [sequence_number for _, sequence_number in repeated_events]
+            )
+
+            # Update read-optimized projections after successful event insertion
+            # Projections are denormalized views optimized for reads (workouts_projection, sets_projection)
+            if inserted_event_ids:
+                try:
+                    # Build transient Event objects from the rows we just inserted
+                    # (no re-SELECT round-trip - every field is already in memory)
+                    # All rows belong to one device and the batch already passed the
+                    # strictly-increasing sequence check, so input order is replay order
+                    # (no ORDER BY, no re-sort)
+                    new_event_objects = [
+                        Event(**row)
+                        for row in event_rows
+                        if row["event_id"] in inserted_event_ids
+                    ]
+
+                    # Update projections incrementally (only new events)
+                    # This keeps projections in sync with events without full rebuild
+                    builder = WorkoutProjectionBuilder(self.db)
+                    builder.update_projections(new_event_objects, user_id)
+                except Exception as e:
+                    # Log error but don't fail sync - projections can be rebuilt later via /rebuild endpoint
+                    # This ensures event ingestion succeeds even if projection update fails
+                    # In production, consider using a background job for projection updates
+                    logger.exception("[SYNC] Failed to update projections: %s", e)
+                    # Rollback any partial projection changes to maintain consistency
+                    try:
+                        self.db.rollback()
+                    except Exception:
+                        pass
+
         return SyncResult(
             accepted_count=accepted_count,
             rejected_count=rejected_count,
             last_acked_sequence=last_acked_sequence,
             rejected_event_ids=rejected_event_ids,
+            duplicate_event_ids=duplicate_event_ids,
         )
+
+    def _content_duplicate_ids(
+        self, event_ids: List[UUID], inserted_event_ids: Set[UUID]
+    ) -> Set[UUID]:
+        """
+        Get the event_ids the INSERT skipped that are not stored at all.
+
+        Args:
+            event_ids: event_ids of the rows sent to the INSERT
+            inserted_event_ids: event_ids the INSERT reported as new
+
+        Returns:
+            Skipped event_ids that only matched an existing row by content hash
+        """
+        skipped_ids = list(set(event_ids) - inserted_event_ids)
+        stored_ids: Set[UUID] = set()
+        # IN lists are chunked like the INSERT; a replayed large batch skips every row
+        for start in range(0, len(skipped_ids), UPSERT_CHUNK_SIZE):
+            stored_ids.update(
+                self.db.scalars(
+                    select(Event.event_id).where(
+                        Event.event_id.in_(skipped_ids[start : start + UPSERT_CHUNK_SIZE])
+                    )
+                )
+            )
+        return set(skipped_ids) - stored_ids
+
+    def _insert_ignore_duplicates(self, event_rows: List[dict]) -> Set[UUID]:
+        """
+        Insert event rows with multi-row INSERTs that skip rows we already have.
+
+        A row is a duplicate if its event_id exists, or if the same user already
+        sent an event with the same content hash from the same device.
+
+        Args:
+            event_rows: Row dicts for the events table
+
+        Returns:
+            event_ids of the rows actually inserted
+        """
+        # Postgres in production, SQLite in tests - both support ON CONFLICT DO NOTHING
+        if self.db.get_bind().dialect.name == "postgresql":
+            dialect_insert = pg_insert
+        else:
+            dialect_insert = sqlite_insert
+
+        inserted_event_ids: Set[UUID] = set()
+        # One statement per chunk keeps bind parameters (7 per event) under driver
+        # limits; sync batches are the client's whole pending queue and have no cap
+        for start in range(0, len(event_rows), UPSERT_CHUNK_SIZE):
+            stmt = dialect_insert(Event).values(
+                event_rows[start : start + UPSERT_CHUNK_SIZE]
+            )
+            # No conflict target: covers both the event_id primary key and
+            # uq_events_user_device_content_hash (callers tell the two apart afterwards)
+            stmt = stmt.on_conflict_do_nothing().returning(Event.event_id)
+            inserted_event_ids.update(self.db.scalars(stmt))
+        return inserted_event_ids
@@ -5,8 +5,8 @@ This service is transactional and idempotent - safe to call multiple times.
 """
 
 from uuid import UUID
-from sqlalchemy.orm import Session
-from sqlalchemy import update
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import case, delete, exists, func, literal_column, select, update
 
 from app.models.user import User
 from app.models.events import Event
@@ -17,6 +17,45 @@ from app.models.projections import (
 )
 
 
+# Tables that carry user_id directly (sets are linked via workout_id, no update needed)
+USER_OWNED_MODELS = (Event, WorkoutProjection, WeeklyMetrics, WeeklyReport)
+
+
+def _reassign_statements(anonymous_user_id: UUID, real_user_id: UUID) -> list:
+    """
+    Build one UPDATE per user-owned table moving rows to the real user.
+
+    An anonymous event whose content the real user already has from the same
+    device (a retry that regenerated event_id) keeps its row but drops its
+    content_hash, so uq_events_user_device_content_hash can't reject the merge.
+
+    Args:
+        anonymous_user_id: The anonymous user's UUID
+        real_user_id: The real (authenticated) user's UUID
+
+    Returns:
+        UPDATE statements in USER_OWNED_MODELS order
+    """
+    kept = aliased(Event)
+    content_collision = exists().where(
+        kept.user_id == real_user_id,
+        kept.device_id == Event.device_id,
+        kept.content_hash == Event.content_hash,
+    )
+    new_values = {
+        Event: {
+            "user_id": real_user_id,
+            "content_hash": case((content_collision, None), else_=Event.content_hash),
+        }
+    }
+    return [
+        update(model)
+        .where(model.user_id == anonymous_user_id)
+        .values(new_values.get(model, {"user_id": real_user_id}))
+        for model in USER_OWNED_MODELS
+    ]
+
+
 class UserMergeService:
     """Service for merging anonymous user data to real user account."""
 
@@ -47,14 +86,18 @@ class UserMergeService:
         Raises:
             ValueError: If users don't exist or validation fails
         """
-        # Validate users exist
-        anonymous_user = (
-            self.db.query(User).filter(User.user_id == anonymous_user_id).first()
-        )
+        # Validate users exist (both fetched in one IN query)
+        users = {
+            user.user_id: user
+            for user in self.db.query(User)
+            .filter(User.user_id.in_([anonymous_user_id, real_user_id]))
+            .all()
+        }
+        anonymous_user = users.get(anonymous_user_id)
         if not anonymous_user:
             raise ValueError(f"Anonymous user {anonymous_user_id} not found")
 
-        real_user = self.db.query(User).filter(User.user_id == real_user_id).first()
+        real_user = users.get(real_user_id)
         if not real_user:
             raise ValueError(f"Real user {real_user_id} not found")
 
@@ -72,11 +115,12 @@ class UserMergeService:
 
         # Check if already merged (idempotency check)
         # If no events exist for anonymous_user_id, assume already merged
-        event_count = (
-            self.db.query(Event).filter(Event.user_id == anonymous_user_id).count()
-        )
+        # EXISTS stops at the first matching row instead of counting them all
+        has_events = self.db.query(
+            self.db.query(Event).filter(Event.user_id == anonymous_user_id).exists()
+        ).scalar()
 
-        if event_count == 0:
+        if not has_events:
             # Already merged or no data to merge
             return {
                 "merged": False,
@@ -89,38 +133,12 @@ class UserMergeService:
 
         # Perform merge in single transaction
         try:
-            # Update events
-            events_updated = self.db.execute(
-                update(Event)
-                .where(Event.user_id == anonymous_user_id)
-                .values(user_id=real_user_id)
-            ).rowcount
-
-            # Update workouts_projection
-            # (sets are linked via workout_id foreign key, no direct update needed)
-            workouts_updated = self.db.execute(
-                update(WorkoutProjection)
-                .where(WorkoutProjection.user_id == anonymous_user_id)
-                .values(user_id=real_user_id)
-            ).rowcount
-
-            # Update weekly_metrics
-            metrics_updated = self.db.execute(
-                update(WeeklyMetrics)
-                .where(WeeklyMetrics.user_id == anonymous_user_id)
-                .values(user_id=real_user_id)
-            ).rowcount
-
-            # Update weekly_reports
-            reports_updated = self.db.execute(
-                update(WeeklyReport)
-                .where(WeeklyReport.user_id == anonymous_user_id)
-                .values(user_id=real_user_id)
-            ).rowcount
-
-            # Delete anonymous user record after successful merge
-            # All data has been transferred to real user, so anonymous user is no longer needed
-            self.db.delete(anonymous_user)
+            (
+                events_updated,
+                workouts_updated,
+                metrics_updated,
+                reports_updated,
+            ) = self._reassign_user_rows(anonymous_user, real_user_id)
 
             # Commit all changes atomically
             self.db.commit()
@@ -138,3 +156,59 @@ class UserMergeService:
             # Rollback on any error
             self.db.rollback()
             raise ValueError(f"Merge failed: {str(e)}") from e
+
+    def _reassign_user_rows(self, anonymous_user: User, real_user_id: UUID) -> tuple:
+        """
+        Move every row owned by the anonymous user to the real user, then delete it.
+
+        Args:
+            anonymous_user: The anonymous User being merged away
+            real_user_id: The real (authenticated) user's UUID
+
+        Returns:
+            Tuple of (events, workouts, metrics, reports) row counts updated
+        """
+        anonymous_user_id = anonymous_user.user_id
+
+        statements = _reassign_statements(anonymous_user_id, real_user_id)
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Postgres allows data-modifying statements in WITH, so the UPDATEs and the
+            # DELETE run as one statement (one round-trip) and report their row counts together
+            updated = [
+                stmt.returning(literal_column("1")).cte(f"u_{model.__tablename__}")
+                for stmt, model in zip(statements, USER_OWNED_MODELS)
+            ]
+            deleted_user = (
+                delete(User)
+                .where(User.user_id == anonymous_user_id)
+                .returning(literal_column("1"))
+                .cte("d_user")
+            )
+            counts = self.db.execute(
+                select(
+                    *[
+                        select(func.count()).select_from(cte).scalar_subquery()
+                        for cte in updated
+                    ]
+                ).add_cte(deleted_user)
+            ).one()
+            # The user row is already deleted in SQL; drop the stale ORM instance
+            self.db.expunge(anonymous_user)
+            return tuple(counts)
+
+        # Other dialects (SQLite in tests) have no data-modifying CTEs -
+        # same statements, issued one by one in the same transaction
+        # synchronize_session=False skips matching loaded instances against each UPDATE;
+        # the commit right after expires everything anyway
+        counts = tuple(
+            self.db.execute(
+                stmt.execution_options(synchronize_session=False)
+            ).rowcount
+            for stmt in statements
+        )
+
+        # Delete anonymous user record after successful merge
+        # All data has been transferred to real user, so anonymous user is no longer needed
+        self.db.delete(anonymous_user)
+        return counts
@@ -5,14 +5,27 @@ Uses upsonic AI agent to answer user questions about specific exercises
 during active workout sessions.
 """
 
+import asyncio
+from threading import Lock
 from uuid import UUID
+from datetime import datetime, timedelta
 from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from fastapi.concurrency import run_in_threadpool
 
 from app.models.projections import WorkoutProjection, SetProjection
 from app.services.ai_agent_service import get_workout_exercise_agent
-from upsonic import Task
+from upsonic import Agent, Task
+
+# Exercise history window for context
+CONTEXT_WINDOW = timedelta(days=30)
+
+
+def _run_agent_locked(agent: Agent, agent_lock: Lock, task: Task):
+    """Run a cached agent while holding its lock (agents are shared and stateful)."""
+    with agent_lock:
+        return agent.do(task)
 
 
 class WorkoutExerciseService:
@@ -21,7 +34,7 @@ class WorkoutExerciseService:
     def __init__(self, db: Session):
         self.db = db
 
-    def answer_exercise_question(
+    async def answer_exercise_question(
         self, user_id: UUID, exercise_id: UUID, exercise_name: str, question: str
     ) -> str:
         """
@@ -36,8 +49,16 @@ class WorkoutExerciseService:
         Returns:
             AI-generated answer
         """
-        # Get relevant context for this specific exercise
-        context = self._get_exercise_context(user_id, exercise_id, exercise_name)
+        # Fetch context and build the agent concurrently (both block on I/O),
+        # each in a worker thread so the event loop stays free
+        context, (agent, agent_lock) = await asyncio.gather(
+            run_in_threadpool(
+                self._get_exercise_context, user_id, exercise_id, exercise_name
+            ),
+            run_in_threadpool(
+                get_workout_exercise_agent, user_id, exercise_id, exercise_name
+            ),
+        )
 
         # Build prompt with exercise context
         # Auto-include exercise name so user can ask naturally
@@ -53,10 +74,9 @@ class WorkoutExerciseService:
                 f"Assistant:"
             )
 
-        # Get agent and generate answer
-        agent = get_workout_exercise_agent(user_id, exercise_id, exercise_name)
+        # Generate answer (blocking LLM call, kept off the event loop)
         task = Task(prompt)
-        result = agent.do(task)
+        result = await run_in_threadpool(_run_agent_locked, agent, agent_lock, task)
 
         return str(result)
 
@@ -75,12 +95,13 @@ class WorkoutExerciseService:
             Formatted context string or None
         """
         # Get recent completed workouts (last 30 days)
-        from datetime import datetime, timedelta
-
-        thirty_days_ago = datetime.now() - timedelta(days=30)
+        thirty_days_ago = datetime.now() - CONTEXT_WINDOW
 
+        # Single round-trip: join this exercise's sets to the 5 most recent completed
+        # workouts (subquery) instead of fetching workout ids first, then their sets.
+        # Only the columns actually consumed are selected - plain tuples, no ORM instances
         recent_workouts = (
-            self.db.query(WorkoutProjection)
+            self.db.query(WorkoutProjection.workout_id)
             .filter(
                 and_(
                     WorkoutProjection.user_id == user_id,
@@ -90,24 +111,20 @@ class WorkoutExerciseService:
             )
             .order_by(WorkoutProjection.started_at.desc())
             .limit(5)
-            .all()
+            .subquery()
         )
 
-        if not recent_workouts:
-            return None
-
-        # Get sets for this specific exercise from recent workouts
-        workout_ids = [w.workout_id for w in recent_workouts]
         exercise_sets = (
-            self.db.query(SetProjection)
-            .filter(
-                and_(
-                    SetProjection.workout_id.in_(workout_ids),
-                    SetProjection.exercise_id == exercise_id,
-                )
+            self.db.query(
+                SetProjection.reps, SetProjection.weight, SetProjection.completed_at
+            )
+            .join(
+                recent_workouts,
+                SetProjection.workout_id == recent_workouts.c.workout_id,
             )
+            .filter(SetProjection.exercise_id == exercise_id)
             .order_by(SetProjection.completed_at.desc())
-            .limit(5)
+            .limit(3)  # Only the 3 most recent sets are shown
             .all()
         )
 
@@ -117,10 +134,8 @@ class WorkoutExerciseService:
         # Build context with recent performance for this exercise
         context_lines = [f"User's recent {exercise_name} performance:"]
 
-        for s in exercise_sets[:3]:  # Limit to 3 most recent sets
-            reps = s.reps or 0
-            weight = s.weight or 0
-            date_str = s.completed_at.strftime("%Y-%m-%d")
-            context_lines.append(f"- {date_str}: {reps} reps at {weight}kg")
+        for reps, weight, completed_at in exercise_sets:
+            date_str = completed_at.date().isoformat()  # Same YYYY-MM-DD, no strftime
+            context_lines.append(f"- {date_str}: {reps or 0} reps at {weight or 0}kg")
 
         return "\n".join(context_lines)
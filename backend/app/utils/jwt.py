@@ -4,8 +4,10 @@ JWT token utilities for authentication.
 Handles encoding and decoding JWT tokens with user_id payload.
 """
 
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 from uuid import UUID
 from jose import JWTError, jwt
 from pydantic_settings import BaseSettings
@@ -48,23 +50,38 @@ def create_access_token(user_id: UUID) -> str:
     )
 
 
+@lru_cache(maxsize=4096)
+def _decode_token(token: str) -> Optional[Tuple[UUID, Optional[int]]]:
+    """Verify a token once and return (user_id, exp), or None if invalid."""
+    try:
+        payload = jwt.decode(
+            token, jwt_settings.secret_key, algorithms=[jwt_settings.algorithm]
+        )
+        user_id_str: str = payload.get("sub")
+        if user_id_str is None:
+            return None
+        return UUID(user_id_str), payload.get("exp")
+    except (JWTError, ValueError):
+        return None
+
+
 def decode_access_token(token: str) -> Optional[UUID]:
     """
     Decode and validate a JWT access token.
 
+    Verified tokens are cached by their raw string (a token cannot change
+    without failing verification), so repeat requests only re-check expiry.
+
     Args:
         token: JWT token string
 
     Returns:
         user_id (UUID) if token is valid, None otherwise
     """
-    try:
-        payload = jwt.decode(
-            token, jwt_settings.secret_key, algorithms=[jwt_settings.algorithm]
-        )
-        user_id_str: str = payload.get("sub")
-        if user_id_str is None:
-            return None
-        return UUID(user_id_str)
-    except (JWTError, ValueError):
+    decoded = _decode_token(token)
+    if decoded is None:
+        return None
+    user_id, exp = decoded
+    if exp is not None and exp < time.time():
         return None
+    return user_id
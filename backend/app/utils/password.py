@@ -37,3 +37,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         True if password matches, False otherwise
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def dummy_verify_password() -> None:
+    """
+    Spend the same time as a real password check, without a stored hash.
+
+    Call this when the user doesn't exist so login takes as long as a wrong
+    password (no timing side channel revealing which emails are registered).
+    """
+    pwd_context.dummy_verify()
@@ -11,20 +11,26 @@ def clear_users_table():
     """Delete all records from the users table using raw SQL."""
     with engine.connect() as conn:
         try:
-            # Count users before deletion
-            result = conn.execute(text("SELECT COUNT(*) FROM users"))
-            count_before = result.scalar()
-            print(f"Found {count_before} user(s) in the database.")
-
-            if count_before == 0:
-                print("No users to delete. Exiting.")
+            if conn.dialect.name == "postgresql":
+                # Planner estimate is free; COUNT(*) would scan the whole table
+                result = conn.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'users'")
+                )
+                print(f"About {max(result.scalar() or 0, 0)} user(s) in the database.")
+
+                # TRUNCATE drops the table's data in one step instead of deleting
+                # (and WAL-logging) every row; no other table references users
+                conn.execute(text("TRUNCATE users"))
+                conn.commit()
+
+                print("Successfully truncated the users table.")
                 return
 
-            # Delete all users using raw SQL
+            # Delete all users using raw SQL (non-Postgres databases)
             result = conn.execute(text("DELETE FROM users"))
             conn.commit()
 
-            print(f"Successfully deleted {count_before} user(s) from the users table.")
+            print(f"Successfully deleted {result.rowcount} user(s) from the users table.")
         except Exception as e:
             conn.rollback()
             print(f"Error occurred: {e}")
@@ -3,12 +3,16 @@ Pytest configuration and fixtures for integration tests.
 """
 
 import os
+from datetime import datetime, timezone
+from itertools import count
+from uuid import UUID
+
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
-from app.db.database import Base
+from app.db.database import Base, json_deserializer, json_serializer
 
 # Import models to register with Base.metadata
 from app.models import events, projections, user  # noqa: F401
@@ -17,10 +21,27 @@ from app.models import events, projections, user  # noqa: F401
 # Use test database URL from env, or default to SQLite in-memory
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
 
+# Set by pytest-xdist (gw0, gw1, ...) when running with `pytest -n auto`
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
 
-@pytest.fixture(scope="function")
+# Fixed timestamp for sample event payloads (deterministic, serialized once)
+SAMPLE_EVENT_TIMESTAMP = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc).isoformat()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Use minimum bcrypt cost in tests - same bcrypt code path, ~1ms per hash."""
+    from app.utils.password import pwd_context
+
+    previous_config = pwd_context.to_dict()
+    pwd_context.update(bcrypt__rounds=4)
+    yield
+    pwd_context.load(previous_config)
+
+
+@pytest.fixture(scope="session")
 def test_engine():
-    """Create a test database engine."""
+    """Create a test database engine (schema is created once per test run)."""
     if TEST_DATABASE_URL.startswith("sqlite"):
         # SQLite in-memory for fast tests
         engine = create_engine(
@@ -28,31 +49,85 @@ def test_engine():
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
             echo=False,
+            json_serializer=json_serializer,
+            json_deserializer=json_deserializer,
+        )
+
+        # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN
+        @event.listens_for(engine, "connect")
+        def _configure_sqlite(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+            cursor = dbapi_connection.cursor()
+            if ":memory:" not in TEST_DATABASE_URL:
+                # File-backed test DB is disposable: keep the rollback journal in
+                # memory and never fsync (in-memory databases already behave this way)
+                cursor.execute("PRAGMA journal_mode=MEMORY")
+                cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-64000")
+            cursor.close()
+
+        @event.listens_for(engine, "begin")
+        def _emit_begin(conn):
+            conn.exec_driver_sql("BEGIN")
+
+    elif XDIST_WORKER:
+        # Postgres under xdist: each worker gets its own schema so parallel
+        # create_all/drop_all runs don't collide (SQLite :memory: is per process already)
+        schema = f"test_{XDIST_WORKER}"
+        bootstrap_engine = create_engine(TEST_DATABASE_URL)
+        with bootstrap_engine.begin() as conn:
+            conn.exec_driver_sql(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        bootstrap_engine.dispose()
+        engine = create_engine(
+            TEST_DATABASE_URL,
+            connect_args={"options": f"-csearch_path={schema}"},
+            echo=False,
+            json_serializer=json_serializer,
+            json_deserializer=json_deserializer,
         )
     else:
         # Postgres for more realistic integration tests
-        engine = create_engine(TEST_DATABASE_URL, echo=False)
+        engine = create_engine(
+            TEST_DATABASE_URL,
+            echo=False,
+            json_serializer=json_serializer,
+            json_deserializer=json_deserializer,
+        )
 
     # Create all tables
     Base.metadata.create_all(bind=engine)
 
     yield engine
 
-    # Drop all tables after test
+    # Drop all tables after the run
     Base.metadata.drop_all(bind=engine)
     engine.dispose()
 
 
 @pytest.fixture(scope="function")
 def test_db(test_engine):
-    """Create a test database session."""
-    TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-    session = TestSessionLocal()
+    """
+    Create a test database session isolated in an outer transaction.
+
+    The session joins a connection-level transaction and turns its own commits
+    into SAVEPOINT releases, so everything a test writes is rolled back afterwards.
+    """
+    connection = test_engine.connect()
+    transaction = connection.begin()
+    session = Session(
+        bind=connection,
+        autoflush=False,
+        join_transaction_mode="create_savepoint",
+    )
 
     try:
         yield session
     finally:
         session.close()
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(scope="function")
@@ -68,6 +143,32 @@ def override_get_db(test_db):
     return _get_db
 
 
+@pytest.fixture(scope="session")
+def app_client():
+    """One TestClient (and ASGI lifespan) shared by the whole test run."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="function")
+def client(app_client, override_get_db):
+    """Shared TestClient with get_db routed to this test's session."""
+    from app.db.database import get_db
+
+    app = app_client.app
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+
+    yield app_client
+
+    # Restore whatever overrides were installed before this test
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous_overrides)
+
+
 @pytest.fixture
 def sample_user_id():
     """Sample user ID for tests."""
@@ -82,3 +183,86 @@ def sample_device_id():
     from uuid import uuid4
 
     return uuid4()
+
+
+@pytest.fixture
+def sample_user(test_db, sample_user_id, request):
+    """
+    Persisted non-anonymous user with sample_user_id (flushed, rolled back with the test).
+
+    Gender defaults to "male"; override it with
+    @pytest.mark.parametrize("sample_user", ["female"], indirect=True).
+    """
+    from app.models.user import User
+
+    user = User(
+        user_id=sample_user_id,
+        email="test@example.com",
+        gender=getattr(request, "param", "male"),
+        is_anonymous=False,
+    )
+    test_db.add(user)
+    test_db.flush()
+    return user
+
+
+@pytest.fixture
+def sample_event_batch_factory():
+    """
+    Factory for a single-workout sync batch (WorkoutStarted ... WorkoutEnded).
+
+    Ids are deterministic (unique within the test) and every payload uses
+    SAMPLE_EVENT_TIMESTAMP; pass include_exercise_added=False for the trimmed
+    three-event variant.
+    """
+    ids = (str(UUID(int=i)) for i in count(1))
+
+    def _make_batch(include_exercise_added=True, reps=10, weight=100.0):
+        workout_id = next(ids)
+        exercise_id = next(ids)
+        timestamp = SAMPLE_EVENT_TIMESTAMP
+
+        payloads = [("WorkoutStarted", {"workout_id": workout_id, "started_at": timestamp})]
+        if include_exercise_added:
+            payloads.append(
+                (
+                    "ExerciseAdded",
+                    {
+                        "workout_id": workout_id,
+                        "exercise_id": exercise_id,
+                        "exercise_name": "Bench Press",
+                    },
+                )
+            )
+        payloads.append(
+            (
+                "SetCompleted",
+                {
+                    "workout_id": workout_id,
+                    "exercise_id": exercise_id,
+                    "set_id": next(ids),
+                    "reps": reps,
+                    "weight": weight,
+                    "completed_at": timestamp,
+                },
+            )
+        )
+        payloads.append(("WorkoutEnded", {"workout_id": workout_id, "ended_at": timestamp}))
+
+        return [
+            {
+                "event_id": next(ids),
+                "event_type": event_type,
+                "payload": payload,
+                "sequence_number": sequence_number,
+            }
+            for sequence_number, (event_type, payload) in enumerate(payloads, start=1)
+        ]
+
+    return _make_batch
+
+
+@pytest.fixture
+def sample_event_batch(sample_event_batch_factory):
+    """Four-event sync batch for one workout with a single completed set."""
+    return sample_event_batch_factory()
@@ -0,0 +1,77 @@
+"""
+Integration tests for the projection rebuild endpoint.
+
+Tests full replay and the completed-workout snapshot option.
+"""
+
+from uuid import uuid4
+
+from sqlalchemy import delete, insert
+
+from app.domain.events import EventType
+from app.models.events import Event
+from app.models.projections import WorkoutProjection
+from app.services.projection_service import WorkoutProjectionBuilder
+
+
+TIMESTAMP = "2024-01-01T10:00:00+00:00"
+
+
+def _completed_workout_events(user_id, device_id):
+    """WorkoutStarted and WorkoutEnded rows for one new workout."""
+    workout_id = uuid4()
+    return workout_id, [
+        {
+            "event_id": uuid4(),
+            "user_id": user_id,
+            "device_id": device_id,
+            "event_type": event_type,
+            "payload": {"workout_id": str(workout_id), timestamp_key: TIMESTAMP},
+            "sequence_number": sequence_number,
+        }
+        for sequence_number, (event_type, timestamp_key) in enumerate(
+            [
+                (EventType.WORKOUT_STARTED, "started_at"),
+                (EventType.WORKOUT_ENDED, "ended_at"),
+            ],
+            start=1,
+        )
+    ]
+
+
+class TestRebuildProjections:
+    """Tests for POST /api/v1/projections/rebuild endpoint."""
+
+    def _project_then_drop_events(self, test_db, sample_user_id, sample_device_id):
+        """Project one completed workout, then delete its events."""
+        workout_id, events = _completed_workout_events(sample_user_id, sample_device_id)
+        test_db.execute(insert(Event), events)
+        test_db.commit()
+        WorkoutProjectionBuilder(test_db).rebuild_projections()
+        test_db.execute(delete(Event))
+        test_db.commit()
+        return workout_id
+
+    def test_rebuild_replays_full_log(self, test_db, client, sample_user_id, sample_device_id):
+        """Default full replay drops projections whose events are gone."""
+        self._project_then_drop_events(test_db, sample_user_id, sample_device_id)
+
+        response = client.post("/api/v1/projections/rebuild")
+
+        assert response.status_code == 200
+        assert test_db.query(WorkoutProjection).count() == 0
+
+    def test_rebuild_keep_completed(self, test_db, client, sample_user_id, sample_device_id):
+        """keep_completed=true keeps completed workout snapshots."""
+        workout_id = self._project_then_drop_events(
+            test_db, sample_user_id, sample_device_id
+        )
+
+        response = client.post(
+            "/api/v1/projections/rebuild", params={"keep_completed": "true"}
+        )
+
+        assert response.status_code == 200
+        workout = test_db.query(WorkoutProjection).one()
+        assert workout.workout_id == workout_id
+        assert workout.status == "completed"
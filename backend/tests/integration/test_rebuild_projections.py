@@ -8,8 +8,9 @@ This test verifies that:
 """
 
 import pytest
-from uuid import uuid4
+from uuid import UUID, uuid4
 from datetime import datetime, timezone
+from sqlalchemy import delete, insert
 
 from app.services.sync_service import SyncService
 from app.services.projection_service import WorkoutProjectionBuilder
@@ -17,6 +18,107 @@ from app.models.events import Event
 from app.models.projections import WorkoutProjection, SetProjection
 
 
+def make_event(event_type, payload, sequence_number):
+    """Build a sync event dict with a fresh event_id."""
+    return {
+        "event_id": str(uuid4()),
+        "event_type": event_type,
+        "payload": payload,
+        "sequence_number": sequence_number,
+    }
+
+
+def workout_started_event(workout_id, sequence_number, started_iso):
+    """Build a WorkoutStarted event dict."""
+    return make_event(
+        "WorkoutStarted",
+        {"workout_id": str(workout_id), "started_at": started_iso},
+        sequence_number,
+    )
+
+
+def workout_ended_event(workout_id, sequence_number, ended_iso):
+    """Build a WorkoutEnded event dict."""
+    return make_event(
+        "WorkoutEnded",
+        {"workout_id": str(workout_id), "ended_at": ended_iso},
+        sequence_number,
+    )
+
+
+def set_completed_event(
+    workout_id, exercise_id, reps, weight, completed_iso, sequence_number
+):
+    """Build a SetCompleted event dict with a fresh set_id."""
+    return make_event(
+        "SetCompleted",
+        {
+            "workout_id": str(workout_id),
+            "exercise_id": str(exercise_id),
+            "set_id": str(uuid4()),
+            "reps": reps,
+            "weight": weight,
+            "completed_at": completed_iso,
+        },
+        sequence_number,
+    )
+
+
+def seed_events(db, user_id, device_id, events):
+    """Insert raw events for rebuild tests in one Core executemany (skips sync validation)."""
+    db.execute(
+        insert(Event),
+        [
+            {
+                "event_id": UUID(e["event_id"]),
+                "event_type": e["event_type"],
+                "payload": e["payload"],
+                "sequence_number": e["sequence_number"],
+                "user_id": user_id,
+                "device_id": device_id,
+            }
+            for e in events
+        ],
+    )
+    # No commit: rebuild reads through the same session, and the test's outer
+    # transaction is rolled back anyway (rebuild_projections commits its own work)
+
+
+def projection_snapshot(db):
+    """Serialize projections for comparison, ordered by id in the database."""
+    # Column-only queries: one SELECT each, plain rows, no ORM instances
+    workouts = db.query(
+        WorkoutProjection.workout_id,
+        WorkoutProjection.user_id,
+        WorkoutProjection.status,
+    ).order_by(WorkoutProjection.workout_id)
+    sets = db.query(
+        SetProjection.set_id,
+        SetProjection.workout_id,
+        SetProjection.reps,
+        SetProjection.weight,
+    ).order_by(SetProjection.set_id)
+
+    workouts_data = [
+        {
+            "workout_id": str(workout_id),
+            "user_id": str(user_id),
+            "status": status,
+        }
+        for workout_id, user_id, status in workouts
+    ]
+    sets_data = [
+        {
+            "set_id": str(set_id),
+            "workout_id": str(workout_id),
+            "reps": reps,
+            "weight": weight,
+        }
+        for set_id, workout_id, reps, weight in sets
+    ]
+    return workouts_data, sets_data
+
+
 def test_rebuild_projections_produces_identical_result(
     test_db, sample_user_id, sample_device_id
 ):
@@ -29,107 +131,38 @@ def test_rebuild_projections_produces_identical_result(
     workout2_id = uuid4()
     exercise1_id = uuid4()
     exercise2_id = uuid4()
-    started_at = datetime.now(timezone.utc)
-    ended_at = datetime.now(timezone.utc)
+    # Timestamps are the same for every event - format them once
+    started_iso = datetime.now(timezone.utc).isoformat()
+    ended_iso = datetime.now(timezone.utc).isoformat()
 
     events = [
         # Workout 1
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutStarted",
-            "payload": {
-                "workout_id": str(workout1_id),
-                "started_at": started_at.isoformat(),
-            },
-            "sequence_number": 1,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "ExerciseAdded",
-            "payload": {
+        workout_started_event(workout1_id, 1, started_iso),
+        make_event(
+            "ExerciseAdded",
+            {
                 "workout_id": str(workout1_id),
                 "exercise_id": str(exercise1_id),
                 "exercise_name": "Bench Press",
             },
-            "sequence_number": 2,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "SetCompleted",
-            "payload": {
-                "workout_id": str(workout1_id),
-                "exercise_id": str(exercise1_id),
-                "set_id": str(uuid4()),
-                "reps": 10,
-                "weight": 100.0,
-                "completed_at": started_at.isoformat(),
-            },
-            "sequence_number": 3,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "SetCompleted",
-            "payload": {
-                "workout_id": str(workout1_id),
-                "exercise_id": str(exercise1_id),
-                "set_id": str(uuid4()),
-                "reps": 8,
-                "weight": 100.0,
-                "completed_at": started_at.isoformat(),
-            },
-            "sequence_number": 4,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutEnded",
-            "payload": {
-                "workout_id": str(workout1_id),
-                "ended_at": ended_at.isoformat(),
-            },
-            "sequence_number": 5,
-        },
+            2,
+        ),
+        set_completed_event(workout1_id, exercise1_id, 10, 100.0, started_iso, 3),
+        set_completed_event(workout1_id, exercise1_id, 8, 100.0, started_iso, 4),
+        workout_ended_event(workout1_id, 5, ended_iso),
         # Workout 2
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutStarted",
-            "payload": {
-                "workout_id": str(workout2_id),
-                "started_at": started_at.isoformat(),
-            },
-            "sequence_number": 6,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "ExerciseAdded",
-            "payload": {
+        workout_started_event(workout2_id, 6, started_iso),
+        make_event(
+            "ExerciseAdded",
+            {
                 "workout_id": str(workout2_id),
                 "exercise_id": str(exercise2_id),
                 "exercise_name": "Squat",
             },
-            "sequence_number": 7,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "SetCompleted",
-            "payload": {
-                "workout_id": str(workout2_id),
-                "exercise_id": str(exercise2_id),
-                "set_id": str(uuid4()),
-                "reps": 5,
-                "weight": 150.0,
-                "completed_at": started_at.isoformat(),
-            },
-            "sequence_number": 8,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutEnded",
-            "payload": {
-                "workout_id": str(workout2_id),
-                "ended_at": ended_at.isoformat(),
-            },
-            "sequence_number": 9,
-        },
+            7,
+        ),
+        set_completed_event(workout2_id, exercise2_id, 5, 150.0, started_iso, 8),
+        workout_ended_event(workout2_id, 9, ended_iso),
     ]
 
     # Sync all events
@@ -143,39 +176,20 @@ def test_rebuild_projections_produces_identical_result(
     # Build projections first time
     projection_builder.rebuild_projections()
 
+    # Cheap COUNTs first so a wrong rebuild fails before any rows are serialized
+    assert test_db.query(WorkoutProjection).count() == 2
+    assert test_db.query(SetProjection).count() == 3
+
     # Capture first projection state
-    workouts_first = test_db.query(WorkoutProjection).all()
-    sets_first = test_db.query(SetProjection).all()
+    workouts_data_first, sets_data_first = projection_snapshot(test_db)
 
-    # Serialize for comparison
-    workouts_data_first = sorted(
-        [
-            {
-                "workout_id": str(w.workout_id),
-                "user_id": str(w.user_id),
-                "status": w.status,
-            }
-            for w in workouts_first
-        ],
-        key=lambda x: x["workout_id"],
+    # Drop projections (plain DELETEs, no identity-map sync; sets first for the FK)
+    test_db.execute(
+        delete(SetProjection).execution_options(synchronize_session=False)
     )
-
-    sets_data_first = sorted(
-        [
-            {
-                "set_id": str(s.set_id),
-                "workout_id": str(s.workout_id),
-                "reps": s.reps,
-                "weight": s.weight,
-            }
-            for s in sets_first
-        ],
-        key=lambda x: x["set_id"],
+    test_db.execute(
+        delete(WorkoutProjection).execution_options(synchronize_session=False)
     )
-
-    # Drop projections
-    test_db.query(WorkoutProjection).delete()
-    test_db.query(SetProjection).delete()
     test_db.commit()
 
     assert test_db.query(WorkoutProjection).count() == 0
@@ -185,33 +199,7 @@ def test_rebuild_projections_produces_identical_result(
     projection_builder.rebuild_projections()
 
     # Capture second projection state
-    workouts_second = test_db.query(WorkoutProjection).all()
-    sets_second = test_db.query(SetProjection).all()
-
-    workouts_data_second = sorted(
-        [
-            {
-                "workout_id": str(w.workout_id),
-                "user_id": str(w.user_id),
-                "status": w.status,
-            }
-            for w in workouts_second
-        ],
-        key=lambda x: x["workout_id"],
-    )
-
-    sets_data_second = sorted(
-        [
-            {
-                "set_id": str(s.set_id),
-                "workout_id": str(s.workout_id),
-                "reps": s.reps,
-                "weight": s.weight,
-            }
-            for s in sets_second
-        ],
-        key=lambda x: x["set_id"],
-    )
+    workouts_data_second, sets_data_second = projection_snapshot(test_db)
 
     # Verify projections are identical
     assert len(workouts_data_first) == len(workouts_data_second)
@@ -226,67 +214,31 @@ def test_rebuild_projections_produces_identical_result(
 
 def test_rebuild_multiple_times_consistent(test_db, sample_user_id, sample_device_id):
     """Test that rebuilding multiple times produces consistent results."""
-    sync_service = SyncService(test_db)
     projection_builder = WorkoutProjectionBuilder(test_db)
 
     workout_id = uuid4()
-    started_at = datetime.now(timezone.utc)
-    ended_at = datetime.now(timezone.utc)
+    # Timestamps are the same for every event - format them once
+    started_iso = datetime.now(timezone.utc).isoformat()
+    ended_iso = datetime.now(timezone.utc).isoformat()
 
     events = [
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutStarted",
-            "payload": {
-                "workout_id": str(workout_id),
-                "started_at": started_at.isoformat(),
-            },
-            "sequence_number": 1,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutEnded",
-            "payload": {
-                "workout_id": str(workout_id),
-                "ended_at": ended_at.isoformat(),
-            },
-            "sequence_number": 2,
-        },
+        workout_started_event(workout_id, 1, started_iso),
+        workout_ended_event(workout_id, 2, ended_iso),
     ]
 
-    # Sync events
-    sync_service.sync_events(
-        device_id=sample_device_id,
-        user_id=sample_user_id,
-        events=events,
-    )
+    # Seed events directly - sync_events itself is covered above
+    seed_events(test_db, sample_user_id, sample_device_id, events)
 
-    # Rebuild multiple times and verify consistency
-    projection_states = []
+    # First rebuild sets the expected state; later rebuilds must match it
+    projection_builder.rebuild_projections()
+    expected_state = projection_snapshot(test_db)
+    assert len(expected_state[0]) == 1
 
-    for _ in range(3):
+    for _ in range(2):
         projection_builder.rebuild_projections()
-
-        workouts = test_db.query(WorkoutProjection).all()
-        state = {
-            "workout_count": len(workouts),
-            "workouts": sorted(
-                [
-                    {
-                        "workout_id": str(w.workout_id),
-                        "status": w.status,
-                    }
-                    for w in workouts
-                ],
-                key=lambda x: x["workout_id"],
-            ),
-        }
-        projection_states.append(state)
-
-    # All states should be identical
-    assert all(state == projection_states[0] for state in projection_states), (
-        "Multiple rebuilds must produce identical results"
-    )
+        assert projection_snapshot(test_db) == expected_state, (
+            "Multiple rebuilds must produce identical results"
+        )
 
 
 def test_rebuild_with_no_events(test_db):
@@ -304,52 +256,32 @@ def test_rebuild_preserves_all_workouts_and_sets(
     test_db, sample_user_id, sample_device_id
 ):
     """Test that rebuild preserves all workouts and sets from events."""
-    sync_service = SyncService(test_db)
     projection_builder = WorkoutProjectionBuilder(test_db)
 
     # Create events for 3 workouts
     workout_ids = [uuid4() for _ in range(3)]
-    started_at = datetime.now(timezone.utc)
-    ended_at = datetime.now(timezone.utc)
+    # Timestamps are the same for every event - format them once
+    started_iso = datetime.now(timezone.utc).isoformat()
+    ended_iso = datetime.now(timezone.utc).isoformat()
 
-    events = []
-    for i, workout_id in enumerate(workout_ids):
-        events.append(
-            {
-                "event_id": str(uuid4()),
-                "event_type": "WorkoutStarted",
-                "payload": {
-                    "workout_id": str(workout_id),
-                    "started_at": started_at.isoformat(),
-                },
-                "sequence_number": i * 2 + 1,
-            }
-        )
-        events.append(
-            {
-                "event_id": str(uuid4()),
-                "event_type": "WorkoutEnded",
-                "payload": {
-                    "workout_id": str(workout_id),
-                    "ended_at": ended_at.isoformat(),
-                },
-                "sequence_number": i * 2 + 2,
-            }
+    events = [
+        event
+        for i, workout_id in enumerate(workout_ids)
+        for event in (
+            workout_started_event(workout_id, i * 2 + 1, started_iso),
+            workout_ended_event(workout_id, i * 2 + 2, ended_iso),
         )
+    ]
 
-    # Sync events
-    sync_service.sync_events(
-        device_id=sample_device_id,
-        user_id=sample_user_id,
-        events=events,
-    )
+    # Seed events directly - sync_events itself is covered above
+    seed_events(test_db, sample_user_id, sample_device_id, events)
 
     # Rebuild
     projection_builder.rebuild_projections()
 
     # Verify all workouts are present
-    workouts = test_db.query(WorkoutProjection).all()
+    workouts = test_db.query(WorkoutProjection.workout_id).all()
     assert len(workouts) == 3
 
-    workout_ids_in_projection = {w.workout_id for w in workouts}
+    workout_ids_in_projection = {workout_id for (workout_id,) in workouts}
     assert workout_ids_in_projection == set(workout_ids)
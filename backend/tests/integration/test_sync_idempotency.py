@@ -7,69 +7,25 @@ This test verifies that:
 3. Event replay produces same projections
 """
 
-from uuid import uuid4
-from datetime import datetime, timezone
+import sqlite3
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, select
 
 from app.services.sync_service import SyncService
 from app.services.projection_service import WorkoutProjectionBuilder
+from app.services.user_merge_service import UserMergeService
 from app.models.events import Event
 from app.models.projections import WorkoutProjection, SetProjection
+from app.models.user import User
 
 
-def test_sync_idempotency_same_batch_twice(test_db, sample_user_id, sample_device_id):
+def test_sync_idempotency_same_batch_twice(
+    test_db, sample_user_id, sample_device_id, sample_event_batch
+):
     """Test that submitting the same batch twice creates no duplicates."""
     sync_service = SyncService(test_db)
-
-    # Create a batch of events
-    workout_id = uuid4()
-    exercise_id = uuid4()
-    set_id = uuid4()
-    started_at = datetime.now(timezone.utc)
-    ended_at = datetime.now(timezone.utc)
-
-    events_batch = [
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutStarted",
-            "payload": {
-                "workout_id": str(workout_id),
-                "started_at": started_at.isoformat(),
-            },
-            "sequence_number": 1,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "ExerciseAdded",
-            "payload": {
-                "workout_id": str(workout_id),
-                "exercise_id": str(exercise_id),
-                "exercise_name": "Bench Press",
-            },
-            "sequence_number": 2,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "SetCompleted",
-            "payload": {
-                "workout_id": str(workout_id),
-                "exercise_id": str(exercise_id),
-                "set_id": str(set_id),
-                "reps": 10,
-                "weight": 100.0,
-                "completed_at": started_at.isoformat(),
-            },
-            "sequence_number": 3,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutEnded",
-            "payload": {
-                "workout_id": str(workout_id),
-                "ended_at": ended_at.isoformat(),
-            },
-            "sequence_number": 4,
-        },
-    ]
+    events_batch = sample_event_batch
 
     # Submit batch first time
     result1 = sync_service.sync_events(
@@ -84,7 +40,7 @@ def test_sync_idempotency_same_batch_twice(test_db, sample_user_id, sample_devic
     assert result1.last_acked_sequence == 4
 
     # Count events in DB
-    event_count_after_first = test_db.query(Event).count()
+    event_count_after_first = test_db.scalar(select(func.count()).select_from(Event))
     assert event_count_after_first == 4
 
     # Submit same batch again (same event_ids)
@@ -100,62 +56,148 @@ def test_sync_idempotency_same_batch_twice(test_db, sample_user_id, sample_devic
     assert result2.last_acked_sequence == 4
 
     # Verify no new events were created
-    event_count_after_second = test_db.query(Event).count()
+    event_count_after_second = test_db.scalar(select(func.count()).select_from(Event))
     assert event_count_after_second == 4, "Duplicate events should not be created"
 
     # Verify event_ids are unique
-    event_ids = [e.event_id for e in test_db.query(Event).all()]
+    event_ids = test_db.scalars(select(Event.event_id)).all()
     assert len(event_ids) == len(set(event_ids)), "All event_ids must be unique"
 
 
-def test_sync_idempotency_replay_produces_same_projections(
-    test_db, sample_user_id, sample_device_id
+def test_sync_idempotency_regenerated_event_ids(
+    test_db, sample_user_id, sample_device_id, sample_event_batch
 ):
-    """Test that event replay produces identical projections after duplicate submissions."""
+    """Test that a retry with regenerated event_ids is acked but reported as duplicates, not accepted."""
     sync_service = SyncService(test_db)
-    projection_builder = WorkoutProjectionBuilder(test_db)
+    sync_service.sync_events(
+        device_id=sample_device_id,
+        user_id=sample_user_id,
+        events=sample_event_batch,
+    )
 
-    # Create events
-    workout_id = uuid4()
-    exercise_id = uuid4()
-    set_id = uuid4()
-    started_at = datetime.now(timezone.utc)
-    ended_at = datetime.now(timezone.utc)
+    retried_batch = [{**e, "event_id": str(uuid4())} for e in sample_event_batch]
+    result = sync_service.sync_events(
+        device_id=sample_device_id,
+        user_id=sample_user_id,
+        events=retried_batch,
+    )
 
-    events_batch = [
-        {
-            "event_id": str(uuid4()),
-            "event_type": "WorkoutStarted",
-            "payload": {
-                "workout_id": str(workout_id),
-                "started_at": started_at.isoformat(),
-            },
-            "sequence_number": 1,
-        },
-        {
-            "event_id": str(uuid4()),
-            "event_type": "SetCompleted",
-            "payload": {
-                "workout_id": str(workout_id),
-                "exercise_id": str(exercise_id),
-                "set_id": str(set_id),
-                "reps": 8,
-                "weight": 80.0,
-                "completed_at": started_at.isoformat(),
-            },
-            "sequence_number": 2,
-        },
+    assert result.accepted_count == 0
+    assert result.rejected_count == 0
+    assert sorted(result.duplicate_event_ids) == sorted(
+        UUID(e["event_id"]) for e in retried_batch
+    )
+    assert result.last_acked_sequence == 4
+    assert test_db.scalar(select(func.count()).select_from(Event)) == 4
+
+
+def test_sync_same_content_from_another_device_is_stored(
+    test_db, sample_user_id, sample_device_id, sample_event_batch
+):
+    """Test that content dedup is scoped per device, so identical events from two devices both land."""
+    sync_service = SyncService(test_db)
+    sync_service.sync_events(sample_device_id, sample_user_id, sample_event_batch)
+
+    other_batch = [{**e, "event_id": str(uuid4())} for e in sample_event_batch]
+    result = sync_service.sync_events(uuid4(), sample_user_id, other_batch)
+
+    assert result.accepted_count == 4
+    assert result.duplicate_event_ids == []
+    assert test_db.scalar(select(func.count()).select_from(Event)) == 8
+
+
+def test_sync_idempotency_duplicate_event_id_within_batch(
+    test_db, sample_user_id, sample_device_id, sample_event_batch
+):
+    """Test that an event_id repeated inside one batch is stored and projected once."""
+    repeated = {**sample_event_batch[-1], "sequence_number": 5}
+
+    result = SyncService(test_db).sync_events(
+        device_id=sample_device_id,
+        user_id=sample_user_id,
+        events=sample_event_batch + [repeated],
+    )
+
+    assert result.accepted_count == 5
+    assert result.rejected_count == 0
+    assert result.last_acked_sequence == 5
+    assert test_db.scalar(select(func.count()).select_from(Event)) == 4
+    assert test_db.scalar(select(func.count()).select_from(WorkoutProjection)) == 1
+
+
+def test_sync_batch_over_bind_parameter_limit(
+    test_db, sample_user_id, sample_device_id, sample_event_batch
+):
+    """Test that a batch needing more bind parameters than one statement allows is stored in chunks."""
+    started, _, set_completed, _ = sample_event_batch
+    # 7 parameters per event: 5000 events is over SQLite's default limit of 32766
+    set_events = [
         {
+            **set_completed,
             "event_id": str(uuid4()),
-            "event_type": "WorkoutEnded",
-            "payload": {
-                "workout_id": str(workout_id),
-                "ended_at": ended_at.isoformat(),
-            },
-            "sequence_number": 3,
-        },
+            "payload": {**set_completed["payload"], "set_id": str(uuid4())},
+            "sequence_number": sequence_number,
+        }
+        for sequence_number in range(2, 5002)
     ]
 
+    # Bundled SQLite builds allow 250000 variables; use the stock default instead
+    dbapi_connection = test_db.connection().connection.dbapi_connection
+    is_sqlite = isinstance(dbapi_connection, sqlite3.Connection)
+    if is_sqlite:
+        previous_limit = dbapi_connection.setlimit(
+            sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 32766
+        )
+    try:
+        result = SyncService(test_db).sync_events(
+            sample_device_id, sample_user_id, [started] + set_events
+        )
+    finally:
+        if is_sqlite:
+            dbapi_connection.setlimit(
+                sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, previous_limit
+            )
+
+    assert result.accepted_count == 5001
+    assert result.rejected_count == 0
+    assert result.last_acked_sequence == 5001
+    assert test_db.scalar(select(func.count()).select_from(Event)) == 5001
+    assert test_db.scalar(select(func.count()).select_from(SetProjection)) == 5000
+
+
+def test_sync_payload_with_integer_over_64_bits(
+    test_db, sample_user_id, sample_device_id, sample_event_batch
+):
+    """Test that a valid payload carrying an integer orjson can't encode is stored and replayed."""
+    started = sample_event_batch[0]
+    oversized = {**started, "payload": {**started["payload"], "client_counter": 2**70 + 1}}
+
+    sync_service = SyncService(test_db)
+    result = sync_service.sync_events(sample_device_id, sample_user_id, [oversized])
+    retried = sync_service.sync_events(
+        sample_device_id,
+        sample_user_id,
+        [{**oversized, "event_id": str(uuid4())}],
+    )
+
+    assert result.accepted_count == 1
+    assert result.rejected_count == 0
+    assert retried.duplicate_event_ids != []
+    test_db.expire_all()
+    assert test_db.scalars(select(Event.payload)).one()["client_counter"] == 2**70 + 1
+
+
+def test_sync_idempotency_replay_produces_same_projections(
+    test_db, sample_user_id, sample_device_id, sample_event_batch_factory
+):
+    """Test that event replay produces identical projections after duplicate submissions."""
+    sync_service = SyncService(test_db)
+    projection_builder = WorkoutProjectionBuilder(test_db)
+
+    events_batch = sample_event_batch_factory(
+        include_exercise_added=False, reps=8, weight=80.0
+    )
+
     # Submit batch
     sync_service.sync_events(
         device_id=sample_device_id,
@@ -167,26 +209,21 @@ def test_sync_idempotency_replay_produces_same_projections(
     projection_builder.rebuild_projections()
 
     # Capture first projection state
-    workouts_first = test_db.query(WorkoutProjection).all()
-    sets_first = test_db.query(SetProjection).all()
-
-    workout_data_first = [
-        {
-            "workout_id": w.workout_id,
-            "user_id": w.user_id,
-            "status": w.status,
-        }
-        for w in workouts_first
-    ]
-    sets_data_first = [
-        {
-            "set_id": s.set_id,
-            "workout_id": s.workout_id,
-            "reps": s.reps,
-            "weight": s.weight,
-        }
-        for s in sets_first
-    ]
+    workout_data_first = test_db.execute(
+        select(
+            WorkoutProjection.workout_id,
+            WorkoutProjection.user_id,
+            WorkoutProjection.status,
+        )
+    ).all()
+    sets_data_first = test_db.execute(
+        select(
+            SetProjection.set_id,
+            SetProjection.workout_id,
+            SetProjection.reps,
+            SetProjection.weight,
+        )
+    ).all()
 
     # Submit same batch again (idempotent)
     sync_service.sync_events(
@@ -199,31 +236,81 @@ def test_sync_idempotency_replay_produces_same_projections(
     projection_builder.rebuild_projections()
 
     # Capture second projection state
-    workouts_second = test_db.query(WorkoutProjection).all()
-    sets_second = test_db.query(SetProjection).all()
-
-    workout_data_second = [
-        {
-            "workout_id": w.workout_id,
-            "user_id": w.user_id,
-            "status": w.status,
-        }
-        for w in workouts_second
-    ]
-    sets_data_second = [
-        {
-            "set_id": s.set_id,
-            "workout_id": s.workout_id,
-            "reps": s.reps,
-            "weight": s.weight,
-        }
-        for s in sets_second
-    ]
+    workout_data_second = test_db.execute(
+        select(
+            WorkoutProjection.workout_id,
+            WorkoutProjection.user_id,
+            WorkoutProjection.status,
+        )
+    ).all()
+    sets_data_second = test_db.execute(
+        select(
+            SetProjection.set_id,
+            SetProjection.workout_id,
+            SetProjection.reps,
+            SetProjection.weight,
+        )
+    ).all()
 
     # Verify projections are identical
     assert len(workout_data_first) == len(workout_data_second)
     assert len(sets_data_first) == len(sets_data_second)
-    assert workout_data_first == workout_data_second, (
+    assert sorted(workout_data_first) == sorted(workout_data_second), (
         "Workout projections must be identical"
     )
-    assert sets_data_first == sets_data_second, "Set projections must be identical"
+    assert sorted(sets_data_first) == sorted(sets_data_second), (
+        "Set projections must be identical"
+    )
+
+
+def test_sync_empty_batch_is_noop(test_db, sample_user_id, sample_device_id):
+    """Test that an empty batch returns an empty result without touching the db."""
+    result = SyncService(test_db).sync_events(sample_device_id, sample_user_id, [])
+
+    assert result.accepted_count == 0
+    assert result.rejected_count == 0
+    assert result.last_acked_sequence is None
+    assert result.rejected_event_ids == []
+    assert test_db.scalar(select(func.count()).select_from(Event)) == 0
+
+
+def test_merge_keeps_events_whose_content_the_real_user_already_has(
+    test_db, sample_user, sample_device_id, sample_event_batch
+):
+    """Test that merging an anonymous user survives a content-hash collision with the real user.
+
+    Runs the Postgres CTE path when TEST_DATABASE_URL points at Postgres.
+    """
+    anonymous_user_id = uuid4()
+    test_db.add(User(user_id=anonymous_user_id, is_anonymous=True))
+    test_db.flush()
+
+    sync_service = SyncService(test_db)
+    sync_service.sync_events(
+        sample_device_id, anonymous_user_id, sample_event_batch[:2]
+    )
+    sync_service.sync_events(
+        sample_device_id,
+        sample_user.user_id,
+        [{**sample_event_batch[0], "event_id": str(uuid4())}],
+    )
+
+    result = UserMergeService(test_db).merge_user_data(
+        anonymous_user_id, sample_user.user_id
+    )
+
+    assert result["merged"] is True
+    assert result["events_updated"] == 2
+    hashes = {
+        event_id: content_hash
+        for event_id, content_hash in test_db.execute(
+            select(Event.event_id, Event.content_hash).where(
+                Event.user_id == sample_user.user_id
+            )
+        )
+    }
+    assert len(hashes) == 3
+    # Only the anonymous copy of the colliding WorkoutStarted loses its hash
+    assert hashes[UUID(sample_event_batch[0]["event_id"])] is None
+    assert hashes[UUID(sample_event_batch[1]["event_id"])] is not None
+    assert test_db.get(User, anonymous_user_id) is None
@@ -0,0 +1,78 @@
+"""
+Unit tests for the AI agent factories.
+
+Tests the TTL- and size-bounded workout exercise agent cache.
+"""
+
+from uuid import UUID
+
+import pytest
+
+from app.services import ai_agent_service
+from app.services.ai_agent_service import get_workout_exercise_agent
+
+
+USER_ID = UUID(int=1)
+EXERCISE_NAME = "Bench Press"
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Empty agent cache with a controllable clock and stub agents (no model setup)."""
+    fake_clock = FakeClock()
+    monkeypatch.setattr(ai_agent_service, "monotonic", fake_clock)
+    monkeypatch.setattr(ai_agent_service, "_workout_exercise_agents", {})
+    monkeypatch.setattr(
+        ai_agent_service, "_create_workout_exercise_agent", lambda *key: object()
+    )
+    return fake_clock
+
+
+def _get(exercise_number):
+    """Cached agent and lock for the given exercise of USER_ID."""
+    return get_workout_exercise_agent(USER_ID, UUID(int=exercise_number), EXERCISE_NAME)
+
+
+class TestWorkoutExerciseAgentCache:
+    """Tests for get_workout_exercise_agent caching."""
+
+    def test_same_key_hits_cache(self, clock):
+        """Repeated calls within the TTL share one agent and one lock."""
+        agent, lock = _get(1)
+        clock.now += ai_agent_service.WORKOUT_EXERCISE_AGENT_TTL_SECONDS - 1
+
+        assert _get(1) == (agent, lock)
+        assert _get(2)[0] is not agent
+
+    def test_expired_entry_is_rebuilt(self, clock):
+        """An agent older than the TTL is replaced."""
+        agent, lock = _get(1)
+        clock.now += ai_agent_service.WORKOUT_EXERCISE_AGENT_TTL_SECONDS
+
+        new_agent, new_lock = _get(1)
+
+        assert new_agent is not agent
+        assert new_lock is not lock
+        assert len(ai_agent_service._workout_exercise_agents) == 1
+
+    def test_oldest_entries_evicted_past_size_cap(self, clock, monkeypatch):
+        """The cache never holds more than the cap; the oldest agent goes first."""
+        monkeypatch.setattr(ai_agent_service, "WORKOUT_EXERCISE_AGENT_CACHE_SIZE", 3)
+        first_agent, _ = _get(1)
+        for exercise_number in range(2, 5):
+            clock.now += 1
+            _get(exercise_number)
+
+        cached_exercises = [key[1] for key in ai_agent_service._workout_exercise_agents]
+        assert cached_exercises == [UUID(int=2), UUID(int=3), UUID(int=4)]
+        assert _get(1)[0] is not first_agent
@@ -4,6 +4,8 @@ Unit tests for BodyFatCalculator service.
 Tests all calculation methods and edge cases.
 """
 
+from itertools import product
+
 import pytest
 from app.services.body_fat_calculator import BodyFatCalculator
 
@@ -46,122 +48,78 @@ class TestNavyBodyFatCalculation:
                 neck_cm=40.0,
             )
 
-    def test_calculate_navy_body_fat_negative_values(self):
-        """Raises ValueError for negative measurements."""
-        with pytest.raises(ValueError, match="must be positive"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="male",
-                height_cm=-180.0,
-                waist_cm=90.0,
-                neck_cm=40.0,
-            )
-
-        with pytest.raises(ValueError, match="must be positive"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="male",
-                height_cm=180.0,
-                waist_cm=-90.0,
-                neck_cm=40.0,
-            )
-
-        with pytest.raises(ValueError, match="must be positive"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="male",
-                height_cm=180.0,
-                waist_cm=90.0,
-                neck_cm=-40.0,
-            )
-
-    def test_calculate_navy_body_fat_zero_values(self):
-        """Raises ValueError for zero measurements."""
-        with pytest.raises(ValueError, match="must be positive"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="male",
-                height_cm=0.0,
-                waist_cm=90.0,
-                neck_cm=40.0,
-            )
-
-    def test_calculate_navy_body_fat_waist_less_than_neck(self):
-        """Raises ValueError when waist <= neck."""
-        with pytest.raises(ValueError, match="Waist must be greater than neck"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="male",
-                height_cm=180.0,
-                waist_cm=40.0,
-                neck_cm=40.0,
-            )
-
-        with pytest.raises(ValueError, match="Waist must be greater than neck"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="male",
-                height_cm=180.0,
-                waist_cm=35.0,
-                neck_cm=40.0,
-            )
-
-    def test_calculate_navy_body_fat_female_missing_hip(self):
-        """Raises ValueError when female missing hip."""
-        with pytest.raises(ValueError, match="Hip measurement is required for women"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="female",
-                height_cm=165.0,
-                waist_cm=75.0,
-                neck_cm=35.0,
-                hip_cm=None,
-            )
-
-    def test_calculate_navy_body_fat_female_hip_less_than_waist(self):
-        """Raises ValueError when hip <= waist."""
-        with pytest.raises(ValueError, match="Hip must be greater than waist"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="female",
-                height_cm=165.0,
-                waist_cm=75.0,
-                neck_cm=35.0,
-                hip_cm=75.0,
-            )
+    @pytest.mark.parametrize(
+        "kwargs,match",
+        [
+            # Negative and zero measurements
+            ({"height_cm": -180.0}, "must be positive"),
+            ({"waist_cm": -90.0}, "must be positive"),
+            ({"neck_cm": -40.0}, "must be positive"),
+            ({"height_cm": 0.0}, "must be positive"),
+            # Waist must exceed neck
+            ({"waist_cm": 40.0, "neck_cm": 40.0}, "Waist must be greater than neck"),
+            ({"waist_cm": 35.0, "neck_cm": 40.0}, "Waist must be greater than neck"),
+            # Female hip checks
+            (
+                {"gender": "female", "height_cm": 165.0, "waist_cm": 75.0, "neck_cm": 35.0},
+                "Hip measurement is required for women",
+            ),
+            (
+                {"gender": "female", "height_cm": 165.0, "waist_cm": 75.0, "neck_cm": 35.0, "hip_cm": 75.0},
+                "Hip must be greater than waist",
+            ),
+            (
+                {"gender": "female", "height_cm": 165.0, "waist_cm": 75.0, "neck_cm": 35.0, "hip_cm": 70.0},
+                "Hip must be greater than waist",
+            ),
+            (
+                {"gender": "female", "height_cm": 165.0, "waist_cm": 75.0, "neck_cm": 35.0, "hip_cm": -95.0},
+                "Hip must be a positive value",
+            ),
+        ],
+        ids=[
+            "negative_height",
+            "negative_waist",
+            "negative_neck",
+            "zero_height",
+            "waist_equals_neck",
+            "waist_less_than_neck",
+            "female_missing_hip",
+            "female_hip_equals_waist",
+            "female_hip_less_than_waist",
+            "female_negative_hip",
+        ],
+    )
+    def test_calculate_navy_body_fat_invalid_measurements(self, kwargs, match):
+        """Raises ValueError for invalid measurements."""
+        # Valid male baseline; each case overrides the fields under test
+        params = {"gender": "male", "height_cm": 180.0, "waist_cm": 90.0, "neck_cm": 40.0}
+        params.update(kwargs)
+        with pytest.raises(ValueError, match=match):
+            BodyFatCalculator.calculate_navy_body_fat(**params)
 
-        with pytest.raises(ValueError, match="Hip must be greater than waist"):
-            BodyFatCalculator.calculate_navy_body_fat(
-                gender="female",
-                height_cm=165.0,
-                waist_cm=75.0,
-                neck_cm=35.0,
-                hip_cm=70.0,
+    def test_calculate_navy_body_fat_clamping(self):
+        """Results clamped to 0-50% range."""
+        # Sweep a grid of measurements, including extremes that fall outside 0-50% unclamped
+        heights = [150.0, 165.0, 180.0, 195.0, 210.0]
+        waists = [60.0, 75.0, 90.0, 110.0, 140.0]
+        necks = [30.0, 38.0, 45.0, 55.0]
+        for height, waist, neck in product(heights, waists, necks):
+            if waist <= neck:
+                continue
+            bfp = BodyFatCalculator.calculate_navy_body_fat(
+                gender="male", height_cm=height, waist_cm=waist, neck_cm=neck
             )
+            assert 0 <= bfp <= 50, (height, waist, neck)
 
-    def test_calculate_navy_body_fat_female_negative_hip(self):
-        """Raises ValueError for negative hip measurement."""
-        with pytest.raises(ValueError, match="Hip must be a positive value"):
-            BodyFatCalculator.calculate_navy_body_fat(
+            bfp = BodyFatCalculator.calculate_navy_body_fat(
                 gender="female",
-                height_cm=165.0,
-                waist_cm=75.0,
-                neck_cm=35.0,
-                hip_cm=-95.0,
+                height_cm=height,
+                waist_cm=waist,
+                neck_cm=neck,
+                hip_cm=waist + 10.0,
             )
-
-    def test_calculate_navy_body_fat_clamping(self):
-        """Results clamped to 0-50% range."""
-        # Test with extreme values that would produce out-of-range results
-        # Very low body fat scenario
-        bfp_low = BodyFatCalculator.calculate_navy_body_fat(
-            gender="male",
-            height_cm=190.0,
-            waist_cm=70.0,
-            neck_cm=38.0,
-        )
-        assert 0 <= bfp_low <= 50
-
-        # Very high body fat scenario
-        bfp_high = BodyFatCalculator.calculate_navy_body_fat(
-            gender="male",
-            height_cm=170.0,
-            waist_cm=120.0,
-            neck_cm=45.0,
-        )
-        assert 0 <= bfp_high <= 50
+            assert 0 <= bfp <= 50, (height, waist, neck)
 
     def test_calculate_navy_body_fat_precision(self):
         """Results are rounded to 2 decimal places."""
@@ -211,39 +169,22 @@ class TestBMIBodyFatCalculation:
                 weight_kg=80.0,
             )
 
-    def test_calculate_bmi_body_fat_invalid_inputs(self):
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"age": -30},
+            {"height_cm": -180.0},
+            {"weight_kg": -80.0},
+            {"age": 0},
+        ],
+        ids=["negative_age", "negative_height", "negative_weight", "zero_age"],
+    )
+    def test_calculate_bmi_body_fat_invalid_inputs(self, kwargs):
         """Raises ValueError for invalid inputs."""
+        params = {"gender": "male", "age": 30, "height_cm": 180.0, "weight_kg": 80.0}
+        params.update(kwargs)
         with pytest.raises(ValueError, match="must be positive"):
-            BodyFatCalculator.calculate_bmi_body_fat(
-                gender="male",
-                age=-30,
-                height_cm=180.0,
-                weight_kg=80.0,
-            )
-
-        with pytest.raises(ValueError, match="must be positive"):
-            BodyFatCalculator.calculate_bmi_body_fat(
-                gender="male",
-                age=30,
-                height_cm=-180.0,
-                weight_kg=80.0,
-            )
-
-        with pytest.raises(ValueError, match="must be positive"):
-            BodyFatCalculator.calculate_bmi_body_fat(
-                gender="male",
-                age=30,
-                height_cm=180.0,
-                weight_kg=-80.0,
-            )
-
-        with pytest.raises(ValueError, match="must be positive"):
-            BodyFatCalculator.calculate_bmi_body_fat(
-                gender="male",
-                age=0,
-                height_cm=180.0,
-                weight_kg=80.0,
-            )
+            BodyFatCalculator.calculate_bmi_body_fat(**params)
 
     def test_calculate_bmi_body_fat_clamping(self):
         """Results clamped to 0-50% range."""
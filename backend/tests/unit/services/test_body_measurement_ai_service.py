@@ -0,0 +1,95 @@
+"""
+Unit tests for BodyMeasurementAIService.
+
+Tests the first-measurement report served without an LLM call.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.body_measurement import BodyMeasurement
+from app.services import body_measurement_ai_service
+from app.services.body_measurement_ai_service import BodyMeasurementAIService
+from app.services.body_measurement_service import BodyMeasurementService
+
+
+FIXED_NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _measurement(**overrides):
+    """Transient measurement with unrounded values."""
+    values = {
+        "measured_at": FIXED_NOW,
+        "height_cm": 180.0,
+        "weight_kg": 80.04,
+        "neck_cm": 40.26,
+        "waist_cm": 90.0,
+        "body_fat_percentage": 18.4567,
+        "fat_mass_kg": 14.7712,
+        "lean_mass_kg": 65.2688,
+    }
+    values.update(overrides)
+    return BodyMeasurement(**values)
+
+
+@pytest.fixture
+def service(test_db):
+    """BodyMeasurementAIService bound to the test session."""
+    return BodyMeasurementAIService(test_db)
+
+
+class TestFormatFirstMeasurementLines:
+    """Tests for BodyMeasurementAIService._format_first_measurement_lines."""
+
+    def test_rounds_to_one_decimal(self, service):
+        """Every value is shown with one decimal."""
+        lines = service._format_first_measurement_lines(_measurement())
+
+        assert lines.split("\n") == [
+            "  Weight: 80.0 kg",
+            "  Body Fat %: 18.5%",
+            "  Fat Mass: 14.8 kg",
+            "  Lean Mass: 65.3 kg",
+            "  Waist: 90.0 cm",
+            "  Neck: 40.3 cm",
+        ]
+
+    def test_omits_missing_body_composition(self, service):
+        """Body composition fields that were not calculated are left out."""
+        lines = service._format_first_measurement_lines(
+            _measurement(body_fat_percentage=None, fat_mass_kg=None, lean_mass_kg=None)
+        )
+
+        assert "None" not in lines
+        assert lines.split("\n") == [
+            "  Weight: 80.0 kg",
+            "  Waist: 90.0 cm",
+            "  Neck: 40.3 cm",
+        ]
+
+
+class TestGenerateMeasurementReport:
+    """Tests for BodyMeasurementAIService.generate_measurement_report."""
+
+    def test_first_measurement_skips_agent(self, test_db, service, sample_user_id, sample_user, monkeypatch):
+        """With no earlier measurements the template is returned without calling the agent."""
+
+        def _no_agent(user_id):
+            raise AssertionError("agent must not be built for a first measurement")
+
+        monkeypatch.setattr(body_measurement_ai_service, "get_body_measurement_agent", _no_agent)
+        measurement = BodyMeasurementService(test_db).create_measurement(
+            user_id=sample_user_id,
+            measured_at=FIXED_NOW,
+            height_cm=180.0,
+            weight_kg=80.0,
+            neck_cm=40.0,
+            waist_cm=90.0,
+        )
+
+        report = service.generate_measurement_report(sample_user_id, measurement.measurement_id)
+
+        assert report.startswith("This is your first body measurement")
+        assert "Your starting point (2025-01-01):" in report
+        assert "  Weight: 80.0 kg\n" in report
@@ -4,40 +4,80 @@ Unit tests for BodyMeasurementService.
 Tests measurement creation, retrieval, and automatic calculations.
 """
 
-from uuid import uuid4
+from uuid import UUID, uuid4
 from datetime import datetime, timezone, timedelta
 import pytest
+from sqlalchemy import insert
 
 from app.services.body_measurement_service import BodyMeasurementService
 from app.models.body_measurement import BodyMeasurement
-from app.models.user import User
+
+
+# Fixed measurement time; tests only care about relative order
+FIXED_NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+# Fixed ids that never match a sample user (sample_user_id is random) or a stored row
+OTHER_USER_ID = UUID(int=1)
+MISSING_USER_ID = UUID(int=2)
+MISSING_MEASUREMENT_ID = UUID(int=3)
+
+# Required measurements that pass validation for a male user
+VALID_MEASUREMENTS = {
+    "height_cm": 180.0,
+    "weight_kg": 80.0,
+    "neck_cm": 40.0,
+    "waist_cm": 90.0,
+}
+
+# Hand-computed results for VALID_MEASUREMENTS (male), independent of the service:
+# Navy (inches): 86.010*log10((90-40)/2.54) - 70.041*log10(180/2.54) + 36.76 = 18.46%
+EXPECTED_MALE_BFP = 18.46
+EXPECTED_MALE_FAT_MASS_KG = 14.77  # 80.0 * 18.46 / 100
+EXPECTED_MALE_LEAN_MASS_KG = 65.23  # 80.0 - 14.77
+
+
+def _bulk_create_measurements(db, user_id, n, base_time=FIXED_NOW):
+    """
+    Insert n measurements one day apart (newest first) in a single statement.
+
+    For read-path tests only: skips create_measurement's validation and body fat math.
+    """
+    db.execute(
+        insert(BodyMeasurement),
+        [
+            {
+                "measurement_id": uuid4(),
+                "user_id": user_id,
+                "measured_at": base_time - timedelta(days=i),
+                "height_cm": 180.0 + i,
+                "weight_kg": 80.0 + i,
+                "neck_cm": 40.0,
+                "waist_cm": 90.0,
+            }
+            for i in range(n)
+        ],
+    )
+
+
+@pytest.fixture
+def service(test_db):
+    """BodyMeasurementService bound to the test session."""
+    return BodyMeasurementService(test_db)
+
+
+@pytest.fixture
+def measurement_kwargs(sample_user):
+    """create_measurement arguments for sample_user that pass validation."""
+    return {"user_id": sample_user.user_id, "measured_at": FIXED_NOW, **VALID_MEASUREMENTS}
 
 
 class TestCreateMeasurement:
     """Tests for create_measurement method."""
 
-    def test_create_measurement_valid(self, test_db, sample_user_id):
+    def test_create_measurement_valid(self, service, sample_user_id, measurement_kwargs):
         """Creates measurement with all fields."""
-        # Create user with gender
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        measured_at = datetime.now(timezone.utc)
         measurement = service.create_measurement(
-            user_id=sample_user_id,
-            measured_at=measured_at,
-            height_cm=180.0,
-            weight_kg=80.0,
-            neck_cm=40.0,
-            waist_cm=90.0,
+            **measurement_kwargs,
             chest_cm=100.0,
             shoulder_cm=110.0,
             bicep_cm=35.0,
@@ -56,102 +96,21 @@ class TestCreateMeasurement:
         assert measurement.fat_mass_kg is not None
         assert measurement.lean_mass_kg is not None
 
-    def test_create_measurement_calculates_bfp(self, test_db, sample_user_id):
-        """Automatically calculates body fat."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        measurement = service.create_measurement(
-            user_id=sample_user_id,
-            measured_at=datetime.now(timezone.utc),
-            height_cm=180.0,
-            weight_kg=80.0,
-            neck_cm=40.0,
-            waist_cm=90.0,
-        )
-
-        assert measurement.body_fat_percentage is not None
-        assert 0 <= measurement.body_fat_percentage <= 50
-
-    def test_create_measurement_calculates_fat_mass(self, test_db, sample_user_id):
-        """Calculates fat mass correctly."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        measurement = service.create_measurement(
-            user_id=sample_user_id,
-            measured_at=datetime.now(timezone.utc),
-            height_cm=180.0,
-            weight_kg=80.0,
-            neck_cm=40.0,
-            waist_cm=90.0,
-        )
-
-        assert measurement.fat_mass_kg is not None
-        assert measurement.fat_mass_kg == pytest.approx(
-            80.0 * (measurement.body_fat_percentage / 100.0), abs=0.01
-        )
-
-    def test_create_measurement_calculates_lean_mass(self, test_db, sample_user_id):
-        """Calculates lean mass correctly."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        measurement = service.create_measurement(
-            user_id=sample_user_id,
-            measured_at=datetime.now(timezone.utc),
-            height_cm=180.0,
-            weight_kg=80.0,
-            neck_cm=40.0,
-            waist_cm=90.0,
-        )
+    def test_create_measurement_derived_fields(self, service, sample_user_id, measurement_kwargs):
+        """Automatically calculates body fat, fat mass and lean mass."""
+        measurement = service.create_measurement(**measurement_kwargs)
 
-        assert measurement.lean_mass_kg is not None
-        assert measurement.lean_mass_kg == pytest.approx(
-            80.0 - measurement.fat_mass_kg, abs=0.01
-        )
+        assert measurement.body_fat_percentage == pytest.approx(EXPECTED_MALE_BFP, abs=0.01)
+        assert measurement.fat_mass_kg == pytest.approx(EXPECTED_MALE_FAT_MASS_KG, abs=0.01)
+        assert measurement.lean_mass_kg == pytest.approx(EXPECTED_MALE_LEAN_MASS_KG, abs=0.01)
 
-    def test_create_measurement_female_requires_hip(self, test_db, sample_user_id):
+    @pytest.mark.parametrize("sample_user", ["female"], indirect=True)
+    def test_create_measurement_female_requires_hip(self, service, sample_user_id, sample_user):
         """Female measurements require hip."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="female",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
         with pytest.raises(ValueError, match="Hip measurement is required for women"):
             service.create_measurement(
                 user_id=sample_user_id,
-                measured_at=datetime.now(timezone.utc),
+                measured_at=FIXED_NOW,
                 height_cm=165.0,
                 weight_kg=60.0,
                 neck_cm=35.0,
@@ -159,22 +118,12 @@ class TestCreateMeasurement:
                 hip_cm=None,
             )
 
-    def test_create_measurement_female_with_hip(self, test_db, sample_user_id):
+    @pytest.mark.parametrize("sample_user", ["female"], indirect=True)
+    def test_create_measurement_female_with_hip(self, service, sample_user_id, sample_user):
         """Female measurements work with hip."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="female",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
         measurement = service.create_measurement(
             user_id=sample_user_id,
-            measured_at=datetime.now(timezone.utc),
+            measured_at=FIXED_NOW,
             height_cm=165.0,
             weight_kg=60.0,
             neck_cm=35.0,
@@ -185,134 +134,48 @@ class TestCreateMeasurement:
         assert measurement.hip_cm == 95.0
         assert measurement.body_fat_percentage is not None
 
-    def test_create_measurement_invalid_measurements(self, test_db, sample_user_id):
-        """Raises ValueError for invalid inputs."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        with pytest.raises(ValueError, match="must be positive"):
-            service.create_measurement(
-                user_id=sample_user_id,
-                measured_at=datetime.now(timezone.utc),
-                height_cm=-180.0,
-                weight_kg=80.0,
-                neck_cm=40.0,
-                waist_cm=90.0,
-            )
-
-        with pytest.raises(ValueError, match="Waist must be greater than neck"):
-            service.create_measurement(
-                user_id=sample_user_id,
-                measured_at=datetime.now(timezone.utc),
-                height_cm=180.0,
-                weight_kg=80.0,
-                neck_cm=90.0,
-                waist_cm=40.0,
-            )
-
-    def test_create_measurement_user_not_found(self, test_db):
+    @pytest.mark.parametrize(
+        "sample_user,overrides,match",
+        [
+            ("male", {"height_cm": -180.0}, "must be positive"),
+            ("male", {"neck_cm": 90.0, "waist_cm": 40.0}, "Waist must be greater than neck"),
+            (None, {}, "User gender must be set"),
+        ],
+        ids=["negative_height", "waist_less_than_neck", "user_no_gender"],
+        indirect=["sample_user"],
+    )
+    def test_create_measurement_invalid(self, service, sample_user_id, measurement_kwargs, overrides, match):
+        """Raises ValueError for invalid inputs or a user without gender."""
+        with pytest.raises(ValueError, match=match):
+            service.create_measurement(**{**measurement_kwargs, **overrides})
+
+    def test_create_measurement_user_not_found(self, service):
         """Raises ValueError when user not found."""
-        service = BodyMeasurementService(test_db)
-        non_existent_user_id = uuid4()
+        non_existent_user_id = MISSING_USER_ID
 
         with pytest.raises(ValueError, match="not found"):
             service.create_measurement(
                 user_id=non_existent_user_id,
-                measured_at=datetime.now(timezone.utc),
-                height_cm=180.0,
-                weight_kg=80.0,
-                neck_cm=40.0,
-                waist_cm=90.0,
-            )
-
-    def test_create_measurement_user_no_gender(self, test_db, sample_user_id):
-        """Raises ValueError when user has no gender."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender=None,
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        with pytest.raises(ValueError, match="User gender must be set"):
-            service.create_measurement(
-                user_id=sample_user_id,
-                measured_at=datetime.now(timezone.utc),
-                height_cm=180.0,
-                weight_kg=80.0,
-                neck_cm=40.0,
-                waist_cm=90.0,
+                measured_at=FIXED_NOW,
+                **VALID_MEASUREMENTS,
             )
 
 
 class TestGetMeasurements:
     """Tests for get_measurements method."""
 
-    def test_get_measurements_for_user(self, test_db, sample_user_id):
+    def test_get_measurements_for_user(self, test_db, service, sample_user_id, sample_user):
         """Returns all measurements for user."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        # Create multiple measurements
-        for i in range(3):
-            service.create_measurement(
-                user_id=sample_user_id,
-                measured_at=datetime.now(timezone.utc),
-                height_cm=180.0 + i,
-                weight_kg=80.0 + i,
-                neck_cm=40.0,
-                waist_cm=90.0,
-            )
+        _bulk_create_measurements(test_db, sample_user_id, 3)
 
         measurements = service.get_measurements(sample_user_id)
 
         assert len(measurements) == 3
         assert all(m.user_id == sample_user_id for m in measurements)
 
-    def test_get_measurements_ordered_by_date(self, test_db, sample_user_id):
+    def test_get_measurements_ordered_by_date(self, test_db, service, sample_user_id, sample_user):
         """Returns measurements in date order (newest first)."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        # Create measurements with different dates
-        base_time = datetime.now(timezone.utc)
-        for i in range(3):
-            service.create_measurement(
-                user_id=sample_user_id,
-                measured_at=base_time - timedelta(days=i),
-                height_cm=180.0,
-                weight_kg=80.0,
-                neck_cm=40.0,
-                waist_cm=90.0,
-            )
+        _bulk_create_measurements(test_db, sample_user_id, 3)
 
         measurements = service.get_measurements(sample_user_id)
 
@@ -321,78 +184,49 @@ class TestGetMeasurements:
         assert measurements[0].measured_at > measurements[1].measured_at
         assert measurements[1].measured_at > measurements[2].measured_at
 
-    def test_get_measurements_with_limit(self, test_db, sample_user_id):
+    def test_get_measurements_with_limit(self, test_db, service, sample_user_id, sample_user):
         """Respects limit parameter."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
+        _bulk_create_measurements(test_db, sample_user_id, 4)
 
-        service = BodyMeasurementService(test_db)
+        assert len(service.get_measurements(sample_user_id, limit=3)) == 3
+        assert len(service.get_measurements(sample_user_id, limit=10)) == 4
 
-        # Create 5 measurements
-        for i in range(5):
-            service.create_measurement(
-                user_id=sample_user_id,
-                measured_at=datetime.now(timezone.utc),
-                height_cm=180.0,
-                weight_kg=80.0,
-                neck_cm=40.0,
-                waist_cm=90.0,
-            )
+    def test_get_measurements_empty(self, service, sample_user_id):
+        """Returns empty list when no measurements."""
+        measurements = service.get_measurements(sample_user_id)
+
+        assert measurements == []
 
-        measurements = service.get_measurements(sample_user_id, limit=3)
 
-        assert len(measurements) == 3
+class TestIterMeasurements:
+    """Tests for iter_measurements method."""
 
-    def test_get_measurements_empty(self, test_db, sample_user_id):
-        """Returns empty list when no measurements."""
-        service = BodyMeasurementService(test_db)
+    def test_iter_measurements_streams_newest_first(self, test_db, service, sample_user_id, sample_user):
+        """Yields all measurements in date order (newest first)."""
+        _bulk_create_measurements(test_db, sample_user_id, 3)
 
-        measurements = service.get_measurements(sample_user_id)
+        measurements = service.iter_measurements(sample_user_id)
 
-        assert measurements == []
+        assert not isinstance(measurements, list)
+        measurements = list(measurements)
+        assert len(measurements) == 3
+        assert measurements[0].measured_at > measurements[1].measured_at
+        assert measurements[1].measured_at > measurements[2].measured_at
 
 
 class TestGetLatestMeasurement:
     """Tests for get_latest_measurement method."""
 
-    def test_get_latest_measurement_returns_newest(self, test_db, sample_user_id):
+    def test_get_latest_measurement_returns_newest(self, service, sample_user_id, measurement_kwargs):
         """Returns most recent measurement."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        base_time = datetime.now(timezone.utc)
         # Create older measurement
         service.create_measurement(
-            user_id=sample_user_id,
-            measured_at=base_time - timedelta(days=10),
-            height_cm=180.0,
-            weight_kg=80.0,
-            neck_cm=40.0,
-            waist_cm=90.0,
+            **{**measurement_kwargs, "measured_at": FIXED_NOW - timedelta(days=10)}
         )
 
         # Create newer measurement
         latest = service.create_measurement(
-            user_id=sample_user_id,
-            measured_at=base_time,
-            height_cm=185.0,
-            weight_kg=85.0,
-            neck_cm=40.0,
-            waist_cm=90.0,
+            **{**measurement_kwargs, "height_cm": 185.0, "weight_kg": 85.0}
         )
 
         result = service.get_latest_measurement(sample_user_id)
@@ -401,10 +235,8 @@ class TestGetLatestMeasurement:
         assert result.measurement_id == latest.measurement_id
         assert result.height_cm == 185.0
 
-    def test_get_latest_measurement_none(self, test_db, sample_user_id):
+    def test_get_latest_measurement_none(self, service, sample_user_id):
         """Returns None when no measurements."""
-        service = BodyMeasurementService(test_db)
-
         result = service.get_latest_measurement(sample_user_id)
 
         assert result is None
@@ -413,65 +245,28 @@ class TestGetLatestMeasurement:
 class TestGetMeasurement:
     """Tests for get_measurement method."""
 
-    def test_get_measurement_by_id(self, test_db, sample_user_id):
+    def test_get_measurement_by_id(self, service, sample_user_id, measurement_kwargs):
         """Returns specific measurement by ID."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        measurement = service.create_measurement(
-            user_id=sample_user_id,
-            measured_at=datetime.now(timezone.utc),
-            height_cm=180.0,
-            weight_kg=80.0,
-            neck_cm=40.0,
-            waist_cm=90.0,
-        )
+        measurement = service.create_measurement(**measurement_kwargs)
 
         result = service.get_measurement(measurement.measurement_id, sample_user_id)
 
         assert result is not None
         assert result.measurement_id == measurement.measurement_id
 
-    def test_get_measurement_not_found(self, test_db, sample_user_id):
+    def test_get_measurement_not_found(self, service, sample_user_id):
         """Returns None when measurement not found."""
-        service = BodyMeasurementService(test_db)
-        non_existent_id = uuid4()
+        non_existent_id = MISSING_MEASUREMENT_ID
 
         result = service.get_measurement(non_existent_id, sample_user_id)
 
         assert result is None
 
-    def test_get_measurement_wrong_user(self, test_db, sample_user_id):
+    def test_get_measurement_wrong_user(self, service, sample_user_id, measurement_kwargs):
         """Returns None when measurement belongs to different user."""
-        user = User(
-            user_id=sample_user_id,
-            email="test@example.com",
-            gender="male",
-            is_anonymous=False,
-        )
-        test_db.add(user)
-        test_db.commit()
-
-        service = BodyMeasurementService(test_db)
-
-        measurement = service.create_measurement(
-            user_id=sample_user_id,
-            measured_at=datetime.now(timezone.utc),
-            height_cm=180.0,
-            weight_kg=80.0,
-            neck_cm=40.0,
-            waist_cm=90.0,
-        )
+        measurement = service.create_measurement(**measurement_kwargs)
 
-        other_user_id = uuid4()
+        other_user_id = OTHER_USER_ID
         result = service.get_measurement(measurement.measurement_id, other_user_id)
 
         assert result is None
@@ -7,419 +7,224 @@ Tests weekly metrics calculation and rebuild functionality.
 from uuid import uuid4
 from datetime import datetime, date, timedelta, timezone
 
+import pytest
+
 from app.services.metrics_service import MetricsService, get_week_start
 from app.models.projections import WorkoutProjection, SetProjection, WeeklyMetrics
 from app.domain.events import EventType
 
 
-class TestGetWeekStart:
-    """Tests for get_week_start helper function."""
+MONDAY = datetime(2024, 1, 1, 10, 0, 0)  # Monday
+TUESDAY = MONDAY + timedelta(days=1)
+WEDNESDAY = MONDAY + timedelta(days=2)
+PREVIOUS_SUNDAY = MONDAY - timedelta(days=1)
+NEXT_MONDAY = MONDAY + timedelta(days=7)
+WEEK_START = get_week_start(MONDAY)
+
+
+def _workout(user_id, started_at=MONDAY, workout_id=None):
+    """Completed one-hour WorkoutProjection starting at started_at."""
+    return WorkoutProjection(
+        workout_id=workout_id or uuid4(),
+        user_id=user_id,
+        started_at=started_at,
+        ended_at=started_at + timedelta(hours=1),
+        status="completed",
+    )
+
+
+def _set(workout_id, exercise_id, reps, weight, completed_at=MONDAY):
+    """SetProjection of reps x weight completed at completed_at."""
+    return SetProjection(
+        set_id=uuid4(),
+        workout_id=workout_id,
+        exercise_id=exercise_id,
+        reps=reps,
+        weight=weight,
+        completed_at=completed_at,
+    )
+
+
+def _seed_scenario(test_db, user_id, scenario):
+    """
+    Seed one calculate_weekly_metrics scenario for WEEK_START.
+
+    Returns:
+        Dict of expected workouts/volume/exercises (and metrics_id for "update")
+    """
+    if scenario == "empty":
+        return {"workouts": 0, "volume": 0.0, "exercises": 0}
+
+    if scenario == "boundary":
+        # Only includes workouts in week range
+        previous_week = _workout(user_id, PREVIOUS_SUNDAY)
+        current_week = _workout(user_id, WEDNESDAY)
+        next_week = _workout(user_id, NEXT_MONDAY)
+        # Add sets only to the current week's workout
+        set_proj = _set(current_week.workout_id, uuid4(), 10, 100.0, completed_at=WEDNESDAY)
+        test_db.bulk_save_objects([previous_week, current_week, next_week, set_proj])
+        test_db.commit()
+        return {"workouts": 1, "volume": 1000.0, "exercises": 1}
+
+    # "update": a stale record exists for the week before the new workout is counted
+    existing_metrics = WeeklyMetrics(
+        user_id=user_id,
+        week_start=WEEK_START,
+        total_workouts=1,
+        total_volume=500.0,
+        exercises_count=1,
+    )
+    workout = _workout(user_id)
+    set_proj = _set(workout.workout_id, uuid4(), 10, 100.0)
+    test_db.add_all([existing_metrics, workout, set_proj])
+    test_db.commit()
+    return {
+        "workouts": 1,
+        "volume": 1000.0,
+        "exercises": 1,
+        "metrics_id": existing_metrics.id,
+    }
+
+
+@pytest.fixture
+def service(test_db):
+    """MetricsService bound to the test session."""
+    return MetricsService(test_db)
 
-    def test_get_week_start_monday(self):
-        """Monday returns itself."""
-        monday = datetime(2024, 1, 1, 10, 0, 0)  # Monday
-        week_start = get_week_start(monday)
-        assert week_start == date(2024, 1, 1)
 
-    def test_get_week_start_tuesday(self):
-        """Tuesday returns previous Monday."""
-        tuesday = datetime(2024, 1, 2, 10, 0, 0)  # Tuesday
-        week_start = get_week_start(tuesday)
-        assert week_start == date(2024, 1, 1)
+class TestGetWeekStart:
+    """Tests for get_week_start helper function."""
 
-    def test_get_week_start_sunday(self):
-        """Sunday returns previous Monday."""
-        sunday = datetime(2024, 1, 7, 10, 0, 0)  # Sunday
-        week_start = get_week_start(sunday)
-        assert week_start == date(2024, 1, 1)
+    @pytest.mark.parametrize(
+        "dt,expected",
+        [
+            (datetime(2024, 1, 1, 10, 0, 0), date(2024, 1, 1)),
+            (datetime(2024, 1, 2, 10, 0, 0), date(2024, 1, 1)),
+            (datetime(2024, 1, 7, 10, 0, 0), date(2024, 1, 1)),
+            # Week spanning new year returns Monday of previous year
+            (datetime(2025, 1, 1, 23, 59, 0, tzinfo=timezone.utc), date(2024, 12, 30)),
+        ],
+        ids=["monday", "tuesday", "sunday", "across_year_boundary"],
+    )
+    def test_get_week_start(self, dt, expected):
+        """Returns the Monday of the week (Monday returns itself)."""
+        assert get_week_start(dt) == expected
 
 
 class TestCalculateWeeklyMetrics:
     """Tests for calculate_weekly_metrics method."""
 
-    def test_calculate_weekly_metrics_single_workout(self, test_db, sample_user_id):
-        """Calculates metrics for one workout."""
-        service = MetricsService(test_db)
-
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        set_id = uuid4()
-        # Use a Monday for week_start
-        monday = datetime(2024, 1, 1, 10, 0, 0)  # Monday
-        week_start = get_week_start(monday)
-
-        # Create workout projection
-        workout = WorkoutProjection(
-            workout_id=workout_id,
-            user_id=sample_user_id,
-            started_at=monday,
-            ended_at=monday + timedelta(hours=1),
-            status="completed",
-        )
-        test_db.add(workout)
-        test_db.commit()
-
-        # Create set projection
-        set_proj = SetProjection(
-            set_id=set_id,
-            workout_id=workout_id,
-            exercise_id=exercise_id,
-            reps=10,
-            weight=100.0,
-            completed_at=monday,
-        )
-        test_db.add(set_proj)
+    @pytest.mark.parametrize(
+        "sets,expected_volume,expected_exercises",
+        [
+            # (exercise index, reps, weight) per set
+            ([(0, 10, 100.0)], 1000.0, 1),  # 10 reps * 100.0 kg
+            ([(0, 10, 100.0), (0, 8, 80.0), (0, 12, 90.0)], 2720.0, 1),  # Sums reps * weight
+            ([(0, 10, 100.0), (1, 10, 100.0), (0, 10, 100.0)], 3000.0, 2),  # Only unique exercises
+        ],
+        ids=["single_set", "volume_calculation", "unique_exercises"],
+    )
+    def test_calculate_weekly_metrics_single_workout(
+        self, test_db, service, sample_user_id, sets, expected_volume, expected_exercises
+    ):
+        """Calculates volume and unique exercise count for one workout."""
+        workout = _workout(sample_user_id)
+        exercise_ids = [uuid4(), uuid4()]
+        set_projections = [
+            _set(
+                workout.workout_id,
+                exercise_ids[exercise_index],
+                reps,
+                weight,
+                completed_at=MONDAY + timedelta(minutes=i * 10),
+            )
+            for i, (exercise_index, reps, weight) in enumerate(sets)
+        ]
+        test_db.add_all([workout, *set_projections])
         test_db.commit()
 
-        metrics = service.calculate_weekly_metrics(sample_user_id, week_start)
+        metrics = service.calculate_weekly_metrics(sample_user_id, WEEK_START)
 
         assert metrics.user_id == sample_user_id
-        assert metrics.week_start == week_start
+        assert metrics.week_start == WEEK_START
         assert metrics.total_workouts == 1
-        assert metrics.total_volume == 1000.0  # 10 reps * 100.0 kg
-        assert metrics.exercises_count == 1
+        assert metrics.total_volume == expected_volume
+        assert metrics.exercises_count == expected_exercises
 
-    def test_calculate_weekly_metrics_multiple_workouts(self, test_db, sample_user_id):
+    def test_calculate_weekly_metrics_multiple_workouts(self, test_db, service, sample_user_id):
         """Aggregates multiple workouts."""
-        service = MetricsService(test_db)
-
-        workout1_id = uuid4()
-        workout2_id = uuid4()
         exercise1_id = uuid4()
         exercise2_id = uuid4()
-        set1_id = uuid4()
-        set2_id = uuid4()
-        set3_id = uuid4()
-
-        monday = datetime(2024, 1, 1, 10, 0, 0)  # Monday
-        week_start = get_week_start(monday)
 
-        # Create two workouts
-        workout1 = WorkoutProjection(
-            workout_id=workout1_id,
-            user_id=sample_user_id,
-            started_at=monday,
-            ended_at=monday + timedelta(hours=1),
-            status="completed",
-        )
-        workout2 = WorkoutProjection(
-            workout_id=workout2_id,
-            user_id=sample_user_id,
-            started_at=monday + timedelta(days=1),
-            ended_at=monday + timedelta(days=1, hours=1),
-            status="completed",
-        )
-        test_db.add(workout1)
-        test_db.add(workout2)
-        test_db.commit()
-
-        # Create sets
-        set1 = SetProjection(
-            set_id=set1_id,
-            workout_id=workout1_id,
-            exercise_id=exercise1_id,
-            reps=10,
-            weight=100.0,
-            completed_at=monday,
-        )
-        set2 = SetProjection(
-            set_id=set2_id,
-            workout_id=workout1_id,
-            exercise_id=exercise2_id,
-            reps=8,
-            weight=80.0,
-            completed_at=monday,
-        )
-        set3 = SetProjection(
-            set_id=set3_id,
-            workout_id=workout2_id,
-            exercise_id=exercise1_id,
-            reps=12,
-            weight=90.0,
-            completed_at=monday + timedelta(days=1),
-        )
-        test_db.add(set1)
-        test_db.add(set2)
-        test_db.add(set3)
+        # Create two workouts and their sets
+        workout1 = _workout(sample_user_id)
+        workout2 = _workout(sample_user_id, TUESDAY)
+        set1 = _set(workout1.workout_id, exercise1_id, 10, 100.0)
+        set2 = _set(workout1.workout_id, exercise2_id, 8, 80.0)
+        set3 = _set(workout2.workout_id, exercise1_id, 12, 90.0, completed_at=TUESDAY)
+        # Plain multi-row INSERTs (no unit-of-work bookkeeping); every PK is set explicitly
+        test_db.bulk_save_objects([workout1, workout2, set1, set2, set3])
         test_db.commit()
 
-        metrics = service.calculate_weekly_metrics(sample_user_id, week_start)
+        metrics = service.calculate_weekly_metrics(sample_user_id, WEEK_START)
 
         assert metrics.total_workouts == 2
-        assert metrics.total_volume == 2560.0  # (10*100) + (8*80) + (12*90)
+        assert metrics.total_volume == 2720.0  # (10*100) + (8*80) + (12*90)
         assert metrics.exercises_count == 2  # exercise1_id and exercise2_id
 
-    def test_calculate_weekly_metrics_no_workouts(self, test_db, sample_user_id):
-        """Returns zero metrics for empty week."""
-        service = MetricsService(test_db)
+    @pytest.mark.parametrize("scenario", ["empty", "boundary", "update"])
+    def test_calculate_weekly_metrics_scenarios(self, test_db, service, sample_user_id, scenario):
+        """Totals for an empty week, a week between other weeks, and an existing record."""
+        expected = _seed_scenario(test_db, sample_user_id, scenario)
 
-        monday = datetime(2024, 1, 1, 10, 0, 0)
-        week_start = get_week_start(monday)
-
-        metrics = service.calculate_weekly_metrics(sample_user_id, week_start)
+        metrics = service.calculate_weekly_metrics(sample_user_id, WEEK_START)
 
         assert metrics.user_id == sample_user_id
-        assert metrics.week_start == week_start
-        assert metrics.total_workouts == 0
-        assert metrics.total_volume == 0.0
-        assert metrics.exercises_count == 0
-
-    def test_calculate_weekly_metrics_volume_calculation(self, test_db, sample_user_id):
-        """Correctly sums reps * weight."""
-        service = MetricsService(test_db)
-
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        monday = datetime(2024, 1, 1, 10, 0, 0)
-        week_start = get_week_start(monday)
-
-        workout = WorkoutProjection(
-            workout_id=workout_id,
-            user_id=sample_user_id,
-            started_at=monday,
-            ended_at=monday + timedelta(hours=1),
-            status="completed",
-        )
-        test_db.add(workout)
-        test_db.commit()
-
-        # Create multiple sets
-        for i, (reps, weight) in enumerate([(10, 100.0), (8, 80.0), (12, 90.0)]):
-            set_proj = SetProjection(
-                set_id=uuid4(),
-                workout_id=workout_id,
-                exercise_id=exercise_id,
-                reps=reps,
-                weight=weight,
-                completed_at=monday + timedelta(minutes=i * 10),
-            )
-            test_db.add(set_proj)
-        test_db.commit()
-
-        metrics = service.calculate_weekly_metrics(sample_user_id, week_start)
-
-        expected_volume = (10 * 100.0) + (8 * 80.0) + (12 * 90.0)  # 2560.0
-        assert metrics.total_volume == expected_volume
-
-    def test_calculate_weekly_metrics_unique_exercises(self, test_db, sample_user_id):
-        """Counts unique exercises correctly."""
-        service = MetricsService(test_db)
-
-        workout_id = uuid4()
-        exercise1_id = uuid4()
-        exercise2_id = uuid4()
-        monday = datetime(2024, 1, 1, 10, 0, 0)
-        week_start = get_week_start(monday)
-
-        workout = WorkoutProjection(
-            workout_id=workout_id,
-            user_id=sample_user_id,
-            started_at=monday,
-            ended_at=monday + timedelta(hours=1),
-            status="completed",
-        )
-        test_db.add(workout)
-        test_db.commit()
-
-        # Create sets with same exercise multiple times
-        for exercise_id in [exercise1_id, exercise2_id, exercise1_id]:
-            set_proj = SetProjection(
-                set_id=uuid4(),
-                workout_id=workout_id,
-                exercise_id=exercise_id,
-                reps=10,
-                weight=100.0,
-                completed_at=monday,
-            )
-            test_db.add(set_proj)
-        test_db.commit()
-
-        metrics = service.calculate_weekly_metrics(sample_user_id, week_start)
-
-        assert metrics.exercises_count == 2  # Only unique exercises
-
-    def test_calculate_weekly_metrics_week_boundaries(self, test_db, sample_user_id):
-        """Only includes workouts in week range."""
-        service = MetricsService(test_db)
-
-        workout1_id = uuid4()
-        workout2_id = uuid4()
-        exercise_id = uuid4()
-
-        monday = datetime(2024, 1, 1, 10, 0, 0)  # Monday
-        week_start = get_week_start(monday)
-        previous_sunday = monday - timedelta(days=1)  # Sunday before
-        next_monday = monday + timedelta(days=7)  # Next Monday
-
-        # Workout in previous week (should be excluded)
-        workout1 = WorkoutProjection(
-            workout_id=workout1_id,
-            user_id=sample_user_id,
-            started_at=previous_sunday,
-            ended_at=previous_sunday + timedelta(hours=1),
-            status="completed",
-        )
-        # Workout in current week (should be included)
-        workout2 = WorkoutProjection(
-            workout_id=workout2_id,
-            user_id=sample_user_id,
-            started_at=monday + timedelta(days=2),
-            ended_at=monday + timedelta(days=2, hours=1),
-            status="completed",
-        )
-        # Workout in next week (should be excluded)
-        workout3 = WorkoutProjection(
-            workout_id=uuid4(),
-            user_id=sample_user_id,
-            started_at=next_monday,
-            ended_at=next_monday + timedelta(hours=1),
-            status="completed",
-        )
-
-        test_db.add(workout1)
-        test_db.add(workout2)
-        test_db.add(workout3)
-        test_db.commit()
-
-        # Add sets only to workout2
-        set_proj = SetProjection(
-            set_id=uuid4(),
-            workout_id=workout2_id,
-            exercise_id=exercise_id,
-            reps=10,
-            weight=100.0,
-            completed_at=monday + timedelta(days=2),
-        )
-        test_db.add(set_proj)
-        test_db.commit()
-
-        metrics = service.calculate_weekly_metrics(sample_user_id, week_start)
-
-        assert metrics.total_workouts == 1  # Only workout2
-        assert metrics.total_volume == 1000.0
-
-    def test_calculate_weekly_metrics_updates_existing(self, test_db, sample_user_id):
-        """Updates existing metrics record."""
-        service = MetricsService(test_db)
-
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        monday = datetime(2024, 1, 1, 10, 0, 0)
-        week_start = get_week_start(monday)
-
-        # Create existing metrics
-        existing_metrics = WeeklyMetrics(
-            user_id=sample_user_id,
-            week_start=week_start,
-            total_workouts=1,
-            total_volume=500.0,
-            exercises_count=1,
-        )
-        test_db.add(existing_metrics)
-        test_db.commit()
-
-        # Create new workout
-        workout = WorkoutProjection(
-            workout_id=workout_id,
-            user_id=sample_user_id,
-            started_at=monday,
-            ended_at=monday + timedelta(hours=1),
-            status="completed",
-        )
-        test_db.add(workout)
-        test_db.commit()
-
-        set_proj = SetProjection(
-            set_id=uuid4(),
-            workout_id=workout_id,
-            exercise_id=exercise_id,
-            reps=10,
-            weight=100.0,
-            completed_at=monday,
-        )
-        test_db.add(set_proj)
-        test_db.commit()
-
-        metrics = service.calculate_weekly_metrics(sample_user_id, week_start)
-
-        # Should update existing record
-        assert metrics.id == existing_metrics.id
-        assert metrics.total_workouts == 1
-        assert metrics.total_volume == 1000.0
+        assert metrics.week_start == WEEK_START
+        assert metrics.total_workouts == expected["workouts"]
+        assert metrics.total_volume == expected["volume"]
+        assert metrics.exercises_count == expected["exercises"]
+        if "metrics_id" in expected:
+            # Should update existing record
+            assert metrics.id == expected["metrics_id"]
 
 
 class TestRebuildWeeklyMetrics:
     """Tests for rebuild_weekly_metrics method."""
 
-    def test_rebuild_weekly_metrics_multiple_weeks(self, test_db, sample_user_id):
+    def test_rebuild_weekly_metrics_multiple_weeks(self, test_db, service, sample_user_id):
         """Rebuilds metrics for all weeks."""
-        service = MetricsService(test_db)
-
         # Create workouts in different weeks
-        monday1 = datetime(2024, 1, 1, 10, 0, 0)  # Week 1 Monday
-        monday2 = datetime(2024, 1, 8, 10, 0, 0)  # Week 2 Monday
-
-        workout1_id = uuid4()
-        workout2_id = uuid4()
         exercise_id = uuid4()
 
-        workout1 = WorkoutProjection(
-            workout_id=workout1_id,
-            user_id=sample_user_id,
-            started_at=monday1,
-            ended_at=monday1 + timedelta(hours=1),
-            status="completed",
-        )
-        workout2 = WorkoutProjection(
-            workout_id=workout2_id,
-            user_id=sample_user_id,
-            started_at=monday2,
-            ended_at=monday2 + timedelta(hours=1),
-            status="completed",
-        )
-        test_db.add(workout1)
-        test_db.add(workout2)
-        test_db.commit()
-
-        set1 = SetProjection(
-            set_id=uuid4(),
-            workout_id=workout1_id,
-            exercise_id=exercise_id,
-            reps=10,
-            weight=100.0,
-            completed_at=monday1,
-        )
-        set2 = SetProjection(
-            set_id=uuid4(),
-            workout_id=workout2_id,
-            exercise_id=exercise_id,
-            reps=8,
-            weight=80.0,
-            completed_at=monday2,
-        )
-        test_db.add(set1)
-        test_db.add(set2)
+        workout1 = _workout(sample_user_id, MONDAY)
+        workout2 = _workout(sample_user_id, NEXT_MONDAY)
+        set1 = _set(workout1.workout_id, exercise_id, 10, 100.0, completed_at=MONDAY)
+        set2 = _set(workout2.workout_id, exercise_id, 8, 80.0, completed_at=NEXT_MONDAY)
+        test_db.bulk_save_objects([workout1, workout2, set1, set2])
         test_db.commit()
 
         service.rebuild_weekly_metrics(sample_user_id)
 
-        # Check metrics for both weeks
-        week1_metrics = (
-            test_db.query(WeeklyMetrics)
-            .filter(
-                WeeklyMetrics.user_id == sample_user_id,
-                WeeklyMetrics.week_start == get_week_start(monday1),
+        # Check metrics for both weeks (one query, indexed by week_start)
+        week1_start = WEEK_START
+        week2_start = get_week_start(NEXT_MONDAY)
+        # Column rows only - the rebuild writes bulk mappings, nothing to hydrate
+        metrics_by_week = {
+            metrics.week_start: metrics
+            for metrics in test_db.query(
+                WeeklyMetrics.week_start,
+                WeeklyMetrics.total_workouts,
+                WeeklyMetrics.total_volume,
             )
-            .first()
-        )
-        week2_metrics = (
-            test_db.query(WeeklyMetrics)
             .filter(
                 WeeklyMetrics.user_id == sample_user_id,
-                WeeklyMetrics.week_start == get_week_start(monday2),
+                WeeklyMetrics.week_start.in_([week1_start, week2_start]),
             )
-            .first()
-        )
+            .all()
+        }
+        week1_metrics = metrics_by_week.get(week1_start)
+        week2_metrics = metrics_by_week.get(week2_start)
 
         assert week1_metrics is not None
         assert week1_metrics.total_workouts == 1
@@ -429,56 +234,35 @@ class TestRebuildWeeklyMetrics:
         assert week2_metrics.total_workouts == 1
         assert week2_metrics.total_volume == 640.0
 
-    def test_rebuild_weekly_metrics_updates_existing(self, test_db, sample_user_id):
+    def test_rebuild_weekly_metrics_updates_existing(self, test_db, service, sample_user_id):
         """Updates existing metrics records."""
-        service = MetricsService(test_db)
-
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        monday = datetime(2024, 1, 1, 10, 0, 0)
-        week_start = get_week_start(monday)
-
         # Create existing metrics
         existing_metrics = WeeklyMetrics(
             user_id=sample_user_id,
-            week_start=week_start,
+            week_start=WEEK_START,
             total_workouts=0,
             total_volume=0.0,
             exercises_count=0,
         )
-        test_db.add(existing_metrics)
-        test_db.commit()
 
         # Create workout
-        workout = WorkoutProjection(
-            workout_id=workout_id,
-            user_id=sample_user_id,
-            started_at=monday,
-            ended_at=monday + timedelta(hours=1),
-            status="completed",
-        )
-        test_db.add(workout)
-        test_db.commit()
-
-        set_proj = SetProjection(
-            set_id=uuid4(),
-            workout_id=workout_id,
-            exercise_id=exercise_id,
-            reps=10,
-            weight=100.0,
-            completed_at=monday,
-        )
-        test_db.add(set_proj)
+        workout = _workout(sample_user_id)
+        set_proj = _set(workout.workout_id, uuid4(), 10, 100.0)
+        test_db.add_all([existing_metrics, workout, set_proj])
         test_db.commit()
 
         service.rebuild_weekly_metrics(sample_user_id)
 
         # Should update existing record
         updated_metrics = (
-            test_db.query(WeeklyMetrics)
+            test_db.query(
+                WeeklyMetrics.id,
+                WeeklyMetrics.total_workouts,
+                WeeklyMetrics.total_volume,
+            )
             .filter(
                 WeeklyMetrics.user_id == sample_user_id,
-                WeeklyMetrics.week_start == week_start,
+                WeeklyMetrics.week_start == WEEK_START,
             )
             .first()
         )
@@ -487,23 +271,49 @@ class TestRebuildWeeklyMetrics:
         assert updated_metrics.total_workouts == 1
         assert updated_metrics.total_volume == 1000.0
 
+    def test_rebuild_weekly_metrics_bulk_all_users(self, test_db, service, sample_user_id):
+        """Rebuilds metrics for every user in one pass."""
+        other_user_id = uuid4()
+        exercise_id = uuid4()
+
+        workout1 = _workout(sample_user_id)
+        # Workout without sets still counts towards total_workouts
+        workout2 = _workout(sample_user_id, WEDNESDAY)
+        workout3 = _workout(other_user_id)
+        test_db.bulk_save_objects(
+            [workout1, workout2, workout3]
+            + [
+                _set(workout_id, exercise_id, reps, weight)
+                for workout_id, reps, weight in [
+                    (workout1.workout_id, 10, 100.0),
+                    (workout1.workout_id, 8, 100.0),
+                    (workout3.workout_id, 5, 50.0),
+                ]
+            ]
+        )
+        test_db.commit()
+
+        service.rebuild_weekly_metrics_bulk()
+
+        user_metrics = service.get_weekly_metrics(sample_user_id, date(2024, 1, 1))
+        other_metrics = service.get_weekly_metrics(other_user_id, date(2024, 1, 1))
+
+        assert user_metrics.total_workouts == 2
+        assert user_metrics.total_volume == 1800.0
+        assert user_metrics.exercises_count == 1
+        assert other_metrics.total_workouts == 1
+        assert other_metrics.total_volume == 250.0
+
 
 class TestGetWeeklyMetrics:
     """Tests for get_weekly_metrics method."""
 
-    def test_get_weekly_metrics_current_week(self, test_db, sample_user_id):
+    def test_get_weekly_metrics_current_week(self, test_db, service, sample_user_id):
         """Returns current week metrics."""
-        service = MetricsService(test_db)
-
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        monday = datetime(2024, 1, 1, 10, 0, 0)
-        week_start = get_week_start(monday)
-
         # Create metrics
         metrics = WeeklyMetrics(
             user_id=sample_user_id,
-            week_start=week_start,
+            week_start=WEEK_START,
             total_workouts=1,
             total_volume=1000.0,
             exercises_count=1,
@@ -512,22 +322,17 @@ class TestGetWeeklyMetrics:
         test_db.commit()
 
         # Mock current week to be the same
-        result = service.get_weekly_metrics(sample_user_id, week_start)
+        result = service.get_weekly_metrics(sample_user_id, WEEK_START)
 
         assert result is not None
         assert result.user_id == sample_user_id
-        assert result.week_start == week_start
+        assert result.week_start == WEEK_START
 
-    def test_get_weekly_metrics_specific_week(self, test_db, sample_user_id):
+    def test_get_weekly_metrics_specific_week(self, test_db, service, sample_user_id):
         """Returns specific week metrics."""
-        service = MetricsService(test_db)
-
-        monday = datetime(2024, 1, 1, 10, 0, 0)
-        week_start = get_week_start(monday)
-
         metrics = WeeklyMetrics(
             user_id=sample_user_id,
-            week_start=week_start,
+            week_start=WEEK_START,
             total_workouts=2,
             total_volume=2000.0,
             exercises_count=2,
@@ -535,19 +340,13 @@ class TestGetWeeklyMetrics:
         test_db.add(metrics)
         test_db.commit()
 
-        result = service.get_weekly_metrics(sample_user_id, week_start)
+        result = service.get_weekly_metrics(sample_user_id, WEEK_START)
 
         assert result is not None
         assert result.total_workouts == 2
 
-    def test_get_weekly_metrics_not_found(self, test_db, sample_user_id):
+    def test_get_weekly_metrics_not_found(self, service, sample_user_id):
         """Returns None when no metrics exist."""
-        service = MetricsService(test_db)
-
-        monday = datetime(2024, 1, 1, 10, 0, 0)
-        week_start = get_week_start(monday)
-
-        result = service.get_weekly_metrics(sample_user_id, week_start)
+        result = service.get_weekly_metrics(sample_user_id, WEEK_START)
 
         assert result is None
-
@@ -4,375 +4,236 @@ Unit tests for WorkoutProjectionBuilder service.
 Tests event replay and projection building logic.
 """
 
-from uuid import uuid4
-from datetime import datetime, timezone
+from itertools import count
+from uuid import UUID
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import delete, func, insert, select
 
 from app.services.projection_service import WorkoutProjectionBuilder
 from app.models.events import Event
-from app.models.projections import WorkoutProjection, SetProjection
+from app.models.projections import WorkoutProjection, SetProjection, ProjectionCheckpoint, WeeklyMetrics
 from app.domain.events import EventType
 
 
-class TestRebuildProjections:
-    """Tests for rebuild_projections method."""
+# Fixed workout timestamps (payload strings serialized once at import)
+STARTED_AT = datetime(2024, 1, 1, 10, 0, 0, tzinfo=timezone.utc)
+ENDED_AT = datetime(2024, 1, 1, 11, 0, 0, tzinfo=timezone.utc)
+STARTED_AT_ISO = STARTED_AT.isoformat()
+ENDED_AT_ISO = ENDED_AT.isoformat()
 
-    def test_rebuild_projections_empty_events(self, test_db):
-        """Handles empty event log."""
-        builder = WorkoutProjectionBuilder(test_db)
-        builder.rebuild_projections()
+# Deterministic ids for test data (unique within the run, no os.urandom per id)
+_ids = count(1)
 
-        workouts = test_db.query(WorkoutProjection).all()
-        sets = test_db.query(SetProjection).all()
 
-        assert len(workouts) == 0
-        assert len(sets) == 0
+def _uuid():
+    """Next counter-backed UUID."""
+    return UUID(int=next(_ids))
 
-    def test_rebuild_projections_workout_started_only(self, test_db, sample_user_id, sample_device_id):
-        """Creates in_progress workout."""
-        builder = WorkoutProjectionBuilder(test_db)
 
-        workout_id = uuid4()
-        started_at = datetime.now(timezone.utc)
+def _started_payload(workout_id, started_at=STARTED_AT_ISO):
+    """WorkoutStarted payload."""
+    return {"workout_id": str(workout_id), "started_at": started_at}
 
-        # Create WorkoutStarted event
-        event = Event(
-            event_id=uuid4(),
-            user_id=sample_user_id,
-            device_id=sample_device_id,
-            event_type=EventType.WORKOUT_STARTED,
-            payload={"workout_id": str(workout_id), "started_at": started_at.isoformat()},
-            sequence_number=1,
-        )
-        test_db.add(event)
-        test_db.commit()
 
-        builder.rebuild_projections()
+def _ended_payload(workout_id, ended_at=ENDED_AT_ISO):
+    """WorkoutEnded payload."""
+    return {"workout_id": str(workout_id), "ended_at": ended_at}
 
-        workouts = test_db.query(WorkoutProjection).all()
-        assert len(workouts) == 1
-        assert workouts[0].workout_id == workout_id
-        assert workouts[0].user_id == sample_user_id
-        assert workouts[0].status == "in_progress"
-        assert workouts[0].ended_at is None
 
-    def test_rebuild_projections_complete_workout(self, test_db, sample_user_id, sample_device_id):
-        """Creates completed workout with sets."""
-        builder = WorkoutProjectionBuilder(test_db)
+def _set_payload(workout_id, exercise_id, set_id, reps, weight):
+    """SetCompleted payload completed at STARTED_AT."""
+    return {
+        "workout_id": str(workout_id),
+        "exercise_id": str(exercise_id),
+        "set_id": str(set_id),
+        "reps": reps,
+        "weight": weight,
+        "completed_at": STARTED_AT_ISO,
+    }
 
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        set_id = uuid4()
-        started_at = datetime.now(timezone.utc)
-        ended_at = datetime.now(timezone.utc)
 
-        # Create events
-        events = [
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_STARTED,
-                payload={"workout_id": str(workout_id), "started_at": started_at.isoformat()},
-                sequence_number=1,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.SET_COMPLETED,
-                payload={
-                    "workout_id": str(workout_id),
-                    "exercise_id": str(exercise_id),
-                    "set_id": str(set_id),
-                    "reps": 10,
-                    "weight": 100.0,
-                    "completed_at": started_at.isoformat(),
-                },
-                sequence_number=2,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_ENDED,
-                payload={"workout_id": str(workout_id), "ended_at": ended_at.isoformat()},
-                sequence_number=3,
-            ),
-        ]
+def _two_completed_workouts(make_event_row):
+    """Two started-and-ended workouts without sets."""
+    workout1_id = _uuid()
+    workout2_id = _uuid()
+    return [
+        make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout1_id), 1),
+        make_event_row(EventType.WORKOUT_ENDED, _ended_payload(workout1_id), 2),
+        make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout2_id), 3),
+        make_event_row(EventType.WORKOUT_ENDED, _ended_payload(workout2_id), 4),
+    ]
 
-        for event in events:
-            test_db.add(event)
-        test_db.commit()
 
-        builder.rebuild_projections()
+def _orphaned_set(make_event_row):
+    """SetCompleted without a WorkoutStarted."""
+    return [make_event_row(EventType.SET_COMPLETED, _set_payload(_uuid(), _uuid(), _uuid(), 10, 100.0), 1)]
 
-        workouts = test_db.query(WorkoutProjection).all()
-        sets = test_db.query(SetProjection).all()
 
-        assert len(workouts) == 1
-        assert workouts[0].status == "completed"
-        assert workouts[0].ended_at is not None
+def _sets_out_of_order(make_event_row):
+    """One workout whose events are listed out of sequence order."""
+    workout_id = _uuid()
+    exercise_id = _uuid()
+    return [
+        make_event_row(EventType.SET_COMPLETED, _set_payload(workout_id, exercise_id, _uuid(), 8, 80.0), 3),
+        make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout_id), 1),
+        make_event_row(EventType.SET_COMPLETED, _set_payload(workout_id, exercise_id, _uuid(), 10, 100.0), 2),
+        make_event_row(EventType.WORKOUT_ENDED, _ended_payload(workout_id), 4),
+    ]
 
-        assert len(sets) == 1
-        assert sets[0].workout_id == workout_id
-        assert sets[0].exercise_id == exercise_id
-        assert sets[0].reps == 10
-        assert sets[0].weight == 100.0
 
-    def test_rebuild_projections_multiple_workouts(self, test_db, sample_user_id, sample_device_id):
-        """Handles multiple workouts correctly."""
-        builder = WorkoutProjectionBuilder(test_db)
+def _completed_workout_with_set(make_event_row):
+    """One completed workout with a single set."""
+    workout_id = _uuid()
+    return [
+        make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout_id), 1),
+        make_event_row(EventType.SET_COMPLETED, _set_payload(workout_id, _uuid(), _uuid(), 10, 100.0), 2),
+        make_event_row(EventType.WORKOUT_ENDED, _ended_payload(workout_id), 3),
+    ]
 
-        workout1_id = uuid4()
-        workout2_id = uuid4()
-        started_at = datetime.now(timezone.utc)
-        ended_at = datetime.now(timezone.utc)
 
-        # Create events for two workouts
-        events = [
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_STARTED,
-                payload={"workout_id": str(workout1_id), "started_at": started_at.isoformat()},
-                sequence_number=1,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_ENDED,
-                payload={"workout_id": str(workout1_id), "ended_at": ended_at.isoformat()},
-                sequence_number=2,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_STARTED,
-                payload={"workout_id": str(workout2_id), "started_at": started_at.isoformat()},
-                sequence_number=3,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_ENDED,
-                payload={"workout_id": str(workout2_id), "ended_at": ended_at.isoformat()},
-                sequence_number=4,
-            ),
-        ]
+@pytest.fixture
+def builder(test_db):
+    """WorkoutProjectionBuilder bound to the test session."""
+    return WorkoutProjectionBuilder(test_db)
 
-        for event in events:
-            test_db.add(event)
-        test_db.commit()
 
-        builder.rebuild_projections()
+@pytest.fixture
+def make_event_row(sample_user_id, sample_device_id):
+    """Factory for events table rows (dicts) from the sample user and device."""
 
-        workouts = test_db.query(WorkoutProjection).all()
-        assert len(workouts) == 2
-
-        workout_ids = {w.workout_id for w in workouts}
-        assert workout1_id in workout_ids
-        assert workout2_id in workout_ids
-
-    def test_rebuild_projections_skips_orphaned_sets(self, test_db, sample_user_id, sample_device_id):
-        """Skips sets without workout."""
-        builder = WorkoutProjectionBuilder(test_db)
-
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        set_id = uuid4()
-        started_at = datetime.now(timezone.utc)
-
-        # Create SetCompleted event without WorkoutStarted
-        event = Event(
-            event_id=uuid4(),
-            user_id=sample_user_id,
-            device_id=sample_device_id,
-            event_type=EventType.SET_COMPLETED,
-            payload={
-                "workout_id": str(workout_id),
-                "exercise_id": str(exercise_id),
-                "set_id": str(set_id),
-                "reps": 10,
-                "weight": 100.0,
-                "completed_at": started_at.isoformat(),
-            },
-            sequence_number=1,
-        )
-        test_db.add(event)
-        test_db.commit()
+    def _make_event_row(event_type, payload, sequence_number):
+        return {
+            "event_id": _uuid(),
+            "user_id": sample_user_id,
+            "device_id": sample_device_id,
+            "event_type": event_type,
+            "payload": payload,
+            "sequence_number": sequence_number,
+        }
 
-        builder.rebuild_projections()
+    return _make_event_row
 
-        workouts = test_db.query(WorkoutProjection).all()
-        sets = test_db.query(SetProjection).all()
 
-        assert len(workouts) == 0
-        assert len(sets) == 0  # Orphaned set should be skipped
+@pytest.fixture
+def make_event(make_event_row):
+    """Factory for unsaved Events, for calls that take Event instances."""
 
-    def test_rebuild_projections_orders_by_sequence(self, test_db, sample_user_id, sample_device_id):
-        """Events processed in correct order."""
-        builder = WorkoutProjectionBuilder(test_db)
+    def _make_event(event_type, payload, sequence_number):
+        return Event(**make_event_row(event_type, payload, sequence_number))
 
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        set1_id = uuid4()
-        set2_id = uuid4()
-        started_at = datetime.now(timezone.utc)
-        ended_at = datetime.now(timezone.utc)
+    return _make_event
 
-        # Create events out of order
-        events = [
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.SET_COMPLETED,
-                payload={
-                    "workout_id": str(workout_id),
-                    "exercise_id": str(exercise_id),
-                    "set_id": str(set2_id),
-                    "reps": 8,
-                    "weight": 80.0,
-                    "completed_at": started_at.isoformat(),
-                },
-                sequence_number=3,  # Higher sequence
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_STARTED,
-                payload={"workout_id": str(workout_id), "started_at": started_at.isoformat()},
-                sequence_number=1,  # Lower sequence
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.SET_COMPLETED,
-                payload={
-                    "workout_id": str(workout_id),
-                    "exercise_id": str(exercise_id),
-                    "set_id": str(set1_id),
-                    "reps": 10,
-                    "weight": 100.0,
-                    "completed_at": started_at.isoformat(),
-                },
-                sequence_number=2,  # Middle sequence
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_ENDED,
-                payload={"workout_id": str(workout_id), "ended_at": ended_at.isoformat()},
-                sequence_number=4,  # Highest sequence
-            ),
-        ]
 
-        for event in events:
-            test_db.add(event)
-        test_db.commit()
+class TestRebuildProjections:
+    """Tests for rebuild_projections method."""
 
+    def test_rebuild_projections_empty_events(self, test_db, builder):
+        """Handles empty event log."""
         builder.rebuild_projections()
 
-        workouts = test_db.query(WorkoutProjection).all()
-        sets = test_db.query(SetProjection).all()
+        # Both counts in one round-trip; scalar subqueries, since counting two
+        # tables in one FROM would count their cross join
+        workouts_count, sets_count = test_db.execute(
+            select(
+                select(func.count()).select_from(WorkoutProjection).scalar_subquery(),
+                select(func.count()).select_from(SetProjection).scalar_subquery(),
+            )
+        ).one()
+
+        assert workouts_count == 0
+        assert sets_count == 0
+
+    def test_rebuild_projections_workout_started_only(self, test_db, builder, make_event_row, sample_user_id):
+        """Creates in_progress workout."""
+        workout_id = _uuid()
+
+        # Create WorkoutStarted event
+        event = make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout_id), 1)
+        # Core executemany of plain rows - no Event instances or unit of work
+        test_db.execute(insert(Event), [event])
+        test_db.commit()
 
-        assert len(workouts) == 1
-        assert workouts[0].status == "completed"
-        assert len(sets) == 2  # Both sets should be included
+        builder.rebuild_projections()
 
-    def test_rebuild_projections_rebuilds_metrics(self, test_db, sample_user_id, sample_device_id):
-        """Calls metrics rebuild after projections."""
-        builder = WorkoutProjectionBuilder(test_db)
+        workout = test_db.query(WorkoutProjection).one()
+        assert workout.workout_id == workout_id
+        assert workout.user_id == sample_user_id
+        assert workout.status == "in_progress"
+        assert workout.ended_at is None
 
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        set_id = uuid4()
-        started_at = datetime.now(timezone.utc)
-        ended_at = datetime.now(timezone.utc)
+    def test_rebuild_projections_complete_workout(self, test_db, builder, make_event_row):
+        """Creates completed workout with sets."""
+        workout_id = _uuid()
+        exercise_id = _uuid()
+        set_id = _uuid()
 
-        # Create complete workout
+        # Create events
         events = [
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_STARTED,
-                payload={"workout_id": str(workout_id), "started_at": started_at.isoformat()},
-                sequence_number=1,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.SET_COMPLETED,
-                payload={
-                    "workout_id": str(workout_id),
-                    "exercise_id": str(exercise_id),
-                    "set_id": str(set_id),
-                    "reps": 10,
-                    "weight": 100.0,
-                    "completed_at": started_at.isoformat(),
-                },
-                sequence_number=2,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_ENDED,
-                payload={"workout_id": str(workout_id), "ended_at": ended_at.isoformat()},
-                sequence_number=3,
-            ),
+            make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout_id), 1),
+            make_event_row(EventType.SET_COMPLETED, _set_payload(workout_id, exercise_id, set_id, 10, 100.0), 2),
+            make_event_row(EventType.WORKOUT_ENDED, _ended_payload(workout_id), 3),
         ]
 
-        for event in events:
-            test_db.add(event)
+        test_db.execute(insert(Event), events)
+        test_db.commit()
+
+        builder.rebuild_projections()
+
+        workout = test_db.query(WorkoutProjection).one()
+        assert workout.status == "completed"
+        assert workout.ended_at is not None
+
+        set_projection = test_db.query(SetProjection).one()
+        assert set_projection.workout_id == workout_id
+        assert set_projection.exercise_id == exercise_id
+        assert set_projection.reps == 10
+        assert set_projection.weight == 100.0
+
+    @pytest.mark.parametrize(
+        "events_factory,expected_sets,expected_status",
+        [
+            (_two_completed_workouts, 0, "completed"),
+            (_orphaned_set, 0, None),  # Orphaned set should be skipped
+            (_sets_out_of_order, 2, "completed"),  # Both sets should be included
+            (_completed_workout_with_set, 1, "completed"),  # Metrics rebuild must not raise
+        ],
+        ids=["multiple_workouts", "orphaned_set", "out_of_order", "rebuilds_metrics"],
+    )
+    def test_rebuild_projections_replay(
+        self, test_db, builder, make_event_row, events_factory, expected_sets, expected_status
+    ):
+        """Replays each event log into one projection per started workout."""
+        events = events_factory(make_event_row)
+        test_db.execute(insert(Event), events)
         test_db.commit()
 
-        # Rebuild should not raise exception (metrics rebuild is called)
         builder.rebuild_projections()
 
-        # Verify projections were created
         workouts = test_db.query(WorkoutProjection).all()
-        assert len(workouts) == 1
+        sets = test_db.query(SetProjection).all()
 
-    def test_rebuild_projections_clears_existing(self, test_db, sample_user_id, sample_device_id):
-        """Clears existing projections before rebuilding."""
-        builder = WorkoutProjectionBuilder(test_db)
+        started_ids = {
+            UUID(event["payload"]["workout_id"])
+            for event in events
+            if event["event_type"] == EventType.WORKOUT_STARTED
+        }
+        assert {w.workout_id for w in workouts} == started_ids
+        assert all(w.status == expected_status for w in workouts)
+        assert len(sets) == expected_sets
 
-        workout_id = uuid4()
-        started_at = datetime.now(timezone.utc)
-        ended_at = datetime.now(timezone.utc)
+    def test_rebuild_projections_clears_existing(self, test_db, builder, make_event_row):
+        """Clears existing projections before rebuilding."""
+        workout_id = _uuid()
 
         # Create initial workout
         events = [
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_STARTED,
-                payload={"workout_id": str(workout_id), "started_at": started_at.isoformat()},
-                sequence_number=1,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_ENDED,
-                payload={"workout_id": str(workout_id), "ended_at": ended_at.isoformat()},
-                sequence_number=2,
-            ),
+            make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout_id), 1),
+            make_event_row(EventType.WORKOUT_ENDED, _ended_payload(workout_id), 2),
         ]
 
-        for event in events:
-            test_db.add(event)
+        test_db.execute(insert(Event), events)
         test_db.commit()
 
         # First rebuild
@@ -381,7 +242,7 @@ class TestRebuildProjections:
         assert workouts_first == 1
 
         # Delete the event
-        test_db.query(Event).delete()
+        test_db.execute(delete(Event))
         test_db.commit()
 
         # Second rebuild should clear existing
@@ -389,81 +250,203 @@ class TestRebuildProjections:
         workouts_second = test_db.query(WorkoutProjection).count()
         assert workouts_second == 0
 
+    def test_rebuild_projections_keep_completed_reuses_snapshot(self, test_db, builder, make_event_row):
+        """Keeps completed workouts as-is and replays only open ones."""
+        completed_id = _uuid()
+        open_id = _uuid()
+
+        events = [
+            make_event_row(EventType.WORKOUT_STARTED, _started_payload(completed_id), 1),
+            make_event_row(EventType.WORKOUT_ENDED, _ended_payload(completed_id, STARTED_AT_ISO), 2),
+            make_event_row(EventType.WORKOUT_STARTED, _started_payload(open_id), 3),
+        ]
+        test_db.execute(insert(Event), events)
+        test_db.commit()
+
+        builder.rebuild_projections()
+
+        # Events of the completed workout are gone, but its snapshot is kept
+        test_db.execute(delete(Event).where(Event.sequence_number < 3))
+        test_db.commit()
+
+        builder.rebuild_projections(keep_completed=True)
+
+        workouts = {w.workout_id: w for w in test_db.query(WorkoutProjection).all()}
+        assert set(workouts) == {completed_id, open_id}
+        assert workouts[completed_id].status == "completed"
+        assert workouts[open_id].status == "in_progress"
+
+    def test_rebuild_projections_catch_up_applies_only_new_events(self, test_db, builder, make_event_row):
+        """Catch-up applies events past the checkpoint without truncating."""
+        workout_id = _uuid()
+
+        test_db.execute(
+            insert(Event), [make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout_id), 1)]
+        )
+        test_db.commit()
+
+        builder.rebuild_projections()
+        checkpoint = test_db.query(ProjectionCheckpoint).one()
+        assert checkpoint.last_sequence_number == 1
+
+        test_db.execute(insert(Event), 
+            [make_event_row(EventType.WORKOUT_ENDED, _ended_payload(workout_id, STARTED_AT_ISO), 2)]
+        )
+        test_db.commit()
+
+        builder.rebuild_projections(force=False)
+
+        assert test_db.query(WorkoutProjection).one().status == "completed"
+        checkpoint = test_db.query(ProjectionCheckpoint).one()
+        assert checkpoint.last_sequence_number == 2
+
+    def test_rebuild_projections_catch_up_in_chunks(self, test_db, builder, make_event_row, monkeypatch):
+        """Catch-up applied one event per chunk matches a single-chunk catch-up."""
+        monkeypatch.setattr("app.services.projection_service.CATCH_UP_CHUNK_SIZE", 1)
+
+        workout_id = _uuid()
+        payloads = [
+            (EventType.WORKOUT_STARTED, _started_payload(workout_id)),
+            (EventType.SET_COMPLETED, _set_payload(workout_id, _uuid(), _uuid(), 5, 100.0)),
+            (EventType.WORKOUT_ENDED, _ended_payload(workout_id, STARTED_AT_ISO)),
+        ]
+        test_db.execute(insert(Event), 
+            [
+                make_event_row(event_type, payload, sequence_number)
+                for sequence_number, (event_type, payload) in enumerate(payloads, start=1)
+            ]
+        )
+        test_db.commit()
+
+        builder.rebuild_projections(force=False)
+
+        workout = test_db.query(WorkoutProjection).one()
+        assert workout.status == "completed"
+        assert test_db.query(SetProjection).count() == 1
+        assert test_db.query(ProjectionCheckpoint).one().last_sequence_number == 3
+
 
 class TestUpdateProjections:
     """Tests for update_projections method."""
 
-    def test_update_projections_incremental(self, test_db, sample_user_id, sample_device_id):
-        """Updates projections from new events."""
-        builder = WorkoutProjectionBuilder(test_db)
-
-        workout_id = uuid4()
-        exercise_id = uuid4()
-        set_id = uuid4()
-        started_at = datetime.now(timezone.utc)
-        ended_at = datetime.now(timezone.utc)
+    def test_update_projections_incremental(self, test_db, builder, make_event_row, sample_user_id):
+        """Updates projections from only the new events (no full replay)."""
+        workout_id = _uuid()
 
         # Create initial events
-        initial_events = [
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_STARTED,
-                payload={"workout_id": str(workout_id), "started_at": started_at.isoformat()},
-                sequence_number=1,
-            ),
+        initial_rows = [
+            make_event_row(EventType.WORKOUT_STARTED, _started_payload(workout_id), 1),
         ]
 
-        for event in initial_events:
-            test_db.add(event)
+        test_db.execute(insert(Event), initial_rows)
         test_db.commit()
 
         # Initial rebuild
         builder.rebuild_projections()
-        workouts = test_db.query(WorkoutProjection).all()
-        assert len(workouts) == 1
-        assert workouts[0].status == "in_progress"
+        assert test_db.query(WorkoutProjection).one().status == "in_progress"
 
         # Add more events
-        new_events = [
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.SET_COMPLETED,
-                payload={
-                    "workout_id": str(workout_id),
-                    "exercise_id": str(exercise_id),
-                    "set_id": str(set_id),
-                    "reps": 10,
-                    "weight": 100.0,
-                    "completed_at": started_at.isoformat(),
-                },
-                sequence_number=2,
-            ),
-            Event(
-                event_id=uuid4(),
-                user_id=sample_user_id,
-                device_id=sample_device_id,
-                event_type=EventType.WORKOUT_ENDED,
-                payload={"workout_id": str(workout_id), "ended_at": ended_at.isoformat()},
-                sequence_number=3,
-            ),
+        new_rows = [
+            make_event_row(EventType.SET_COMPLETED, _set_payload(workout_id, _uuid(), _uuid(), 10, 100.0), 2),
+            make_event_row(EventType.WORKOUT_ENDED, _ended_payload(workout_id), 3),
         ]
 
-        for event in new_events:
-            test_db.add(event)
+        test_db.execute(insert(Event), new_rows)
         test_db.commit()
 
-        # Update projections (currently just calls rebuild)
-        all_events = test_db.query(Event).all()
-        builder.update_projections(all_events)
+        # Only the delta is applied on top of the existing in_progress projection
+        builder.update_projections([Event(**row) for row in new_rows], sample_user_id)
 
-        workouts = test_db.query(WorkoutProjection).all()
-        sets = test_db.query(SetProjection).all()
+        assert test_db.query(WorkoutProjection).one().status == "completed"
+        assert test_db.query(SetProjection).count() == 1
+
+    def test_update_projections_start_and_end_in_same_batch(self, test_db, builder, make_event, sample_user_id):
+        """Folds WorkoutStarted and WorkoutEnded for one workout into a completed row."""
+        workout_id = _uuid()
+
+        events = [
+            make_event(EventType.WORKOUT_STARTED, _started_payload(workout_id), 1),
+            make_event(EventType.WORKOUT_ENDED, _ended_payload(workout_id), 2),
+        ]
+
+        builder.update_projections(events, sample_user_id)
 
-        assert len(workouts) == 1
-        assert workouts[0].status == "completed"
-        assert len(sets) == 1
+        workout = test_db.query(WorkoutProjection).one()
+        assert workout.status == "completed"
+        assert workout.started_at.replace(tzinfo=None) == STARTED_AT.replace(tzinfo=None)
+        assert workout.ended_at.replace(tzinfo=None) == ENDED_AT.replace(tzinfo=None)
+
+    def test_update_projections_preserves_completed_status(self, test_db, builder, make_event, sample_user_id):
+        """Replayed WorkoutStarted does not reset a completed workout."""
+        workout_id = _uuid()
+
+        builder.update_projections(
+            [
+                make_event(EventType.WORKOUT_ENDED, _ended_payload(workout_id), 1),
+            ],
+            sample_user_id,
+        )
+
+        builder.update_projections(
+            [
+                make_event(EventType.WORKOUT_STARTED, _started_payload(workout_id), 2),
+                make_event(EventType.SET_COMPLETED, _set_payload(workout_id, _uuid(), _uuid(), 10, 100.0), 3),
+            ],
+            sample_user_id,
+        )
+
+        workout = test_db.query(WorkoutProjection).one()
+        assert workout.status == "completed"
+        assert workout.started_at.replace(tzinfo=None) == STARTED_AT.replace(tzinfo=None)
+        assert workout.ended_at is not None
+        assert test_db.query(SetProjection).one().reps == 10
+
+    def test_update_projections_recomputes_only_affected_weeks(self, test_db, builder, make_event, sample_user_id):
+        """Leaves weekly metrics of untouched weeks alone."""
+        old_week = date(2023, 12, 25)
+        test_db.add(
+            WeeklyMetrics(
+                user_id=sample_user_id,
+                week_start=old_week,
+                total_workouts=99,
+                total_volume=1.0,
+                exercises_count=1,
+            )
+        )
+        test_db.commit()
+
+        workout_id = _uuid()
+        started_at = datetime(2024, 1, 3, 10, 0, 0, tzinfo=timezone.utc).isoformat()  # Wednesday
+        builder.update_projections(
+            [
+                make_event(EventType.WORKOUT_STARTED, _started_payload(workout_id, started_at), 1),
+                make_event(EventType.WORKOUT_ENDED, _ended_payload(workout_id, started_at), 2),
+            ],
+            sample_user_id,
+        )
+
+        metrics = {m.week_start: m for m in test_db.query(WeeklyMetrics).all()}
+        assert metrics[old_week].total_workouts == 99
+        assert metrics[date(2024, 1, 1)].total_workouts == 1
+
+    def test_update_projections_workout_moved_to_another_week(self, test_db, builder, make_event, sample_user_id):
+        """Moves a workout's metrics out of its old week when started_at changes week."""
+        workout_id = _uuid()
+        first_week_start = datetime(2024, 1, 2, 10, 0, 0, tzinfo=timezone.utc).isoformat()
+        builder.update_projections(
+            [
+                make_event(EventType.WORKOUT_STARTED, _started_payload(workout_id, first_week_start), 1),
+                make_event(EventType.WORKOUT_ENDED, _ended_payload(workout_id, first_week_start), 2),
+            ],
+            sample_user_id,
+        )
+
+        second_week_start = datetime(2024, 1, 10, 10, 0, 0, tzinfo=timezone.utc).isoformat()
+        builder.update_projections(
+            [make_event(EventType.WORKOUT_STARTED, _started_payload(workout_id, second_week_start), 3)],
+            sample_user_id,
+        )
 
+        metrics = {m.week_start: m for m in test_db.query(WeeklyMetrics).all()}
+        assert date(2024, 1, 1) not in metrics
+        assert metrics[date(2024, 1, 8)].total_workouts == 1
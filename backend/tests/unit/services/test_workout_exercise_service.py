@@ -0,0 +1,111 @@
+"""
+Unit tests for WorkoutExerciseService.
+
+Tests the exercise history context sent along with real-time questions.
+"""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.models.projections import WorkoutProjection, SetProjection
+from app.services.workout_exercise_service import WorkoutExerciseService
+
+
+EXERCISE_NAME = "Bench Press"
+
+
+def _noon(days_ago):
+    """Noon the given number of days ago (a few sets later is still the same date)."""
+    return (datetime.now() - timedelta(days=days_ago)).replace(
+        hour=12, minute=0, second=0, microsecond=0
+    )
+
+
+@pytest.fixture
+def service(test_db):
+    """WorkoutExerciseService bound to the test session."""
+    return WorkoutExerciseService(test_db)
+
+
+@pytest.fixture
+def add_workout(test_db, sample_user_id):
+    """Factory for a projected workout with sets; set i completes i minutes after the start."""
+
+    def _add_workout(days_ago, sets, status="completed"):
+        started_at = _noon(days_ago)
+        workout = WorkoutProjection(
+            workout_id=uuid4(),
+            user_id=sample_user_id,
+            started_at=started_at,
+            status=status,
+        )
+        test_db.add(workout)
+        test_db.add_all(
+            SetProjection(
+                workout_id=workout.workout_id,
+                exercise_id=exercise_id,
+                reps=reps,
+                weight=weight,
+                completed_at=started_at + timedelta(minutes=minute),
+            )
+            for minute, (exercise_id, reps, weight) in enumerate(sets, start=1)
+        )
+        test_db.flush()
+        return workout
+
+    return _add_workout
+
+
+class TestGetExerciseContext:
+    """Tests for WorkoutExerciseService._get_exercise_context."""
+
+    def test_no_history_returns_none(self, service, sample_user_id):
+        """Returns None when the user has no completed workouts."""
+        assert service._get_exercise_context(sample_user_id, uuid4(), EXERCISE_NAME) is None
+
+    def test_exercise_not_in_recent_workouts_returns_none(self, service, add_workout, sample_user_id):
+        """Returns None when recent workouts have no sets of this exercise."""
+        add_workout(1, [(uuid4(), 10, 100.0)])
+
+        assert service._get_exercise_context(sample_user_id, uuid4(), EXERCISE_NAME) is None
+
+    def test_three_newest_sets_newest_first(self, service, add_workout, sample_user_id):
+        """Lists only the 3 most recent sets, newest first."""
+        exercise_id = uuid4()
+        add_workout(2, [(exercise_id, 1, 50.0), (exercise_id, 2, 60.0)])
+        add_workout(1, [(exercise_id, 3, 70.0), (exercise_id, 4, 80.0)])
+
+        context = service._get_exercise_context(sample_user_id, exercise_id, EXERCISE_NAME)
+
+        lines = context.split("\n")
+        assert lines[0] == f"User's recent {EXERCISE_NAME} performance:"
+        assert [line.split(": ", 1)[1] for line in lines[1:]] == [
+            "4 reps at 80.0kg",
+            "3 reps at 70.0kg",
+            "2 reps at 60.0kg",
+        ]
+        assert lines[1].startswith(f"- {_noon(1).date().isoformat()}")
+
+    def test_only_five_most_recent_workouts(self, service, add_workout, sample_user_id):
+        """Ignores sets from completed workouts older than the 5 most recent."""
+        exercise_id = uuid4()
+        add_workout(6, [(exercise_id, 10, 100.0)])
+        for days_ago in range(1, 6):
+            add_workout(days_ago, [(uuid4(), 5, 50.0)])
+
+        assert service._get_exercise_context(sample_user_id, exercise_id, EXERCISE_NAME) is None
+
+    def test_skips_open_and_old_workouts(self, service, add_workout, sample_user_id):
+        """Ignores in-progress workouts and workouts outside the 30-day window."""
+        exercise_id = uuid4()
+        add_workout(0, [(exercise_id, 1, 10.0)], status="in_progress")
+        add_workout(31, [(exercise_id, 2, 20.0)])
+        add_workout(3, [(exercise_id, 3, 30.0)])
+
+        context = service._get_exercise_context(sample_user_id, exercise_id, EXERCISE_NAME)
+
+        assert context.split("\n")[1:] == [
+            f"- {_noon(3).date().isoformat()}: 3 reps at 30.0kg"
+        ]